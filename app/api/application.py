@@ -1,60 +1,107 @@
+import asyncio
+import os
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Query
 
-from app.core.podClient import PodClient
-from app.core.vulnerabilityClient import VulnerabilityClient
+from app.api.conditional import conditional
+from app.core.derivedStateClient import SUMMARIES
+from app.core.podClient import AsyncPodClient
+from app.core.snapshot import vulnerability_snapshot
+from app.core.versions import collection_versions
+from app.core.vulnerabilityClient import SEVERITIES, AsyncVulnerabilityClient
+from app.core.vulnerabilitySummaryClient import AsyncVulnerabilitySummaryClient
 
 router = APIRouter()
 
 
-def get_vulnerability_client() -> VulnerabilityClient:
-    """Dependency to get VulnerabilityClient instance."""
-    return VulnerabilityClient()
+async def get_vulnerability_client() -> AsyncVulnerabilityClient:
+    """Dependency to get AsyncVulnerabilityClient instance."""
+    return AsyncVulnerabilityClient()
 
 
-def get_pod_client() -> PodClient:
-    """Dependency to get PodClient instance."""
-    return PodClient()
+async def get_pod_client() -> AsyncPodClient:
+    """Dependency to get AsyncPodClient instance."""
+    return AsyncPodClient()
 
 
-@router.get("/sidebar", response_model=dict)
-def sidebar(
+async def get_summary_client() -> AsyncVulnerabilitySummaryClient:
+    """Dependency to get AsyncVulnerabilitySummaryClient instance."""
+    return AsyncVulnerabilitySummaryClient()
+
+
+async def summary_counts(
+    summary_db: AsyncVulnerabilitySummaryClient,
+    cluster: Optional[str] = None,
+    namespace: Optional[str] = None,
+):
+    """Materialised or in-memory severity counts, or None to query the reports.
+
+    Summaries are only read once a rebuild has covered every report and
+    while the change stream watcher keeps them current.
+    """
+    summaries = os.getenv("VULNERABILITY_SUMMARIES", "true").lower() == "true"
+    if summaries and collection_versions.current(SUMMARIES):
+        counts = await summary_db.get_severity_counts(
+            cluster=cluster, namespace=namespace
+        )
+        if counts is not None:
+            return counts
+    snapshot = vulnerability_snapshot.current()
+    if snapshot is not None:
+        return snapshot.severity_counts(cluster=cluster, namespace=namespace)
+    return None
+
+
+@router.get(
+    "/sidebar",
+    response_model=dict,
+    dependencies=[Depends(conditional("vulnerabilityreports"))],
+)
+async def sidebar(
     cluster: Optional[str] = Query(None),
     namespace: Optional[str] = Query(None),
-    vulnerability_db: VulnerabilityClient = Depends(get_vulnerability_client),
+    by_severity: bool = Query(False),
+    vulnerability_db: AsyncVulnerabilityClient = Depends(get_vulnerability_client),
+    summary_db: AsyncVulnerabilitySummaryClient = Depends(get_summary_client),
 ):
-    """List all vulnerabilities in the cluster."""
-    return {
-        "vulnerability_total": len(
-            vulnerability_db.get_all(cluster=cluster, namespace=namespace)
+    """Total number of vulnerabilities in the cluster."""
+    counts = await summary_counts(summary_db, cluster=cluster, namespace=namespace)
+    if counts is None:
+        counts = await vulnerability_db.count_vulnerabilities(
+            cluster=cluster, namespace=namespace, by_severity=by_severity
         )
-    }
+    response = {"vulnerability_total": counts["total"]}
+    if by_severity:
+        response["severity_counts"] = {
+            severity: counts[severity] for severity in SEVERITIES
+        }
+    return response
 
 
-@router.get("/dashboard", response_model=dict)
-def dashboard(
+@router.get(
+    "/dashboard",
+    response_model=dict,
+    dependencies=[Depends(conditional("vulnerabilityreports", "pods"))],
+)
+async def dashboard(
     cluster: Optional[str] = Query(None),
     namespace: Optional[str] = Query(None),
-    vulnerability_db: VulnerabilityClient = Depends(get_vulnerability_client),
-    pod_db: PodClient = Depends(get_pod_client),
+    vulnerability_db: AsyncVulnerabilityClient = Depends(get_vulnerability_client),
+    pod_db: AsyncPodClient = Depends(get_pod_client),
+    summary_db: AsyncVulnerabilitySummaryClient = Depends(get_summary_client),
 ):
-    """List all vulnerabilities in the cluster."""
-    items = vulnerability_db.get_all(cluster=cluster, namespace=namespace)
-
-    pods = pod_db.get_all(cluster=cluster, namespace=namespace)
-    return {
-        "severity_counts": {
-            "total": len(items),
-            "CRITICAL": len([item for item in items if item.severity == "CRITICAL"]),
-            "HIGH": len([item for item in items if item.severity == "HIGH"]),
-            "MEDIUM": len([item for item in items if item.severity == "MEDIUM"]),
-            "LOW": len([item for item in items if item.severity == "LOW"]),
-            "UNKNOWN": len([item for item in items if item.severity == "UNKNOWN"]),
-        },
-        "pods": {
-            "total": len(pods),
-            "namespaces": list(set([pod.namespace for pod in pods])),
-            "clusters": list(set([pod.cluster for pod in pods])),
-        },
-    }
+    """Severity totals and pod overview, aggregated inside MongoDB."""
+
+    async def severity_counts():
+        counts = await summary_counts(summary_db, cluster=cluster, namespace=namespace)
+        if counts is None:
+            counts = await vulnerability_db.get_severity_counts(
+                cluster=cluster, namespace=namespace
+            )
+        return counts
+
+    counts, pods = await asyncio.gather(
+        severity_counts(), pod_db.get_summary(cluster=cluster, namespace=namespace)
+    )
+    return {"severity_counts": counts, "pods": pods}
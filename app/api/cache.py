@@ -0,0 +1,21 @@
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from app.core.cache import query_cache
+
+router = APIRouter()
+
+
+@router.get("/", response_model=dict)
+async def cache_stats():
+    """Entries and hit/miss/eviction counters of the query cache, per collection."""
+    return query_cache.stats()
+
+
+@router.delete("/", response_model=dict)
+async def purge_cache(
+    scope: Optional[str] = Query(None, description="Collection, e.g. pods"),
+):
+    """Drop cached query results, for one collection or all of them."""
+    return {"purged": query_cache.invalidate(scope)}
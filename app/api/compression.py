@@ -0,0 +1,175 @@
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+class GzipCompressor:
+
+    """Gzip that flushes every streamed chunk, so NDJSON lines arrive as sent."""
+
+    content_encoding = "gzip"
+
+    def __init__(self, level: int = 6):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, *, more_body: bool) -> bytes:
+        mode = zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH
+        return self.compressor.compress(body) + self.compressor.flush(mode)
+
+
+class BrotliCompressor:
+    content_encoding = "br"
+
+    def __init__(self, level: int = 4):
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, body: bytes, *, more_body: bool) -> bytes:
+        tail = self.compressor.flush() if more_body else self.compressor.finish()
+        return self.compressor.process(body) + tail
+
+
+class ZstdCompressor:
+    content_encoding = "zstd"
+
+    def __init__(self, level: int = 3):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, body: bytes, *, more_body: bool) -> bytes:
+        mode = (
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            if more_body
+            else zstandard.COMPRESSOBJ_FLUSH_FINISH
+        )
+        return self.compressor.compress(body) + self.compressor.flush(mode)
+
+
+COMPRESSORS = {"gzip": GzipCompressor}
+if brotli is not None:
+    COMPRESSORS["br"] = BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS["zstd"] = ZstdCompressor
+
+
+def negotiate(accept_encoding: str, encodings) -> str:
+    """The encoding to use for ``Accept-Encoding``, or None for identity.
+
+    The client's highest q-value wins; ties go to the earliest of
+    ``encodings``, the server's order of preference.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        accepted[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _skip(headers: Headers) -> bool:
+    """Whether a response must go out as is: already encoded or an event stream."""
+    content_type = headers.get("Content-Type", "")
+    return "Content-Encoding" in headers or content_type.startswith("text/event-stream")
+
+
+class CompressionMiddleware:
+
+    """Compress responses of at least ``minimum_size`` bytes.
+
+    Uses the best encoding both sides support out of ``encodings``: zstd and
+    brotli when their packages are installed, gzip always. Streaming
+    responses are compressed chunk by chunk. Responses that already carry a
+    ``Content-Encoding`` or are event streams are left alone.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        encodings=("zstd", "br", "gzip"),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = [
+            encoding.strip()
+            for encoding in encodings
+            if encoding.strip() in COMPRESSORS
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+        encoding = negotiate(accept_encoding, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        # The start message waits for the first body chunk, which decides
+        # whether the response is compressed at all
+        start = None
+        compressor = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None:
+                # Already decided; compress the rest the same way
+                if compressor is not None and message["type"] == "http.response.body":
+                    more_body = message.get("more_body", False)
+                    body = compressor.compress(
+                        message.get("body", b""), more_body=more_body
+                    )
+                    message = {**message, "body": body}
+                await send(message)
+                return
+
+            pending, start = start, None
+            headers = MutableHeaders(raw=list(pending["headers"]))
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if (
+                message["type"] != "http.response.body"
+                or _skip(headers)
+                or (not more_body and len(body) < self.minimum_size)
+            ):
+                await send(pending)
+                await send(message)
+                return
+
+            compressor = COMPRESSORS[encoding]()
+            body = compressor.compress(body, more_body=more_body)
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await send({**pending, "headers": headers.raw})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response
+
+from app.core.versions import collection_versions
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an ``If-None-Match`` header."""
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag.removeprefix("W/")
+        for candidate in candidates
+    )
+
+
+def conditional(*collections: str):
+    """Dependency answering ``If-None-Match`` from the ``collections`` versions.
+
+    The ETag covers the versions of the collections a route reads and its
+    path and query parameters. A client that already has the current version
+    gets a 304 before the route queries or serialises anything. Routes that
+    return a ready ``Response`` have to copy the returned ETag onto it.
+    """
+
+    async def check(request: Request, response: Response) -> Optional[str]:
+        key = f"{request.url.path}?{sorted(request.query_params.multi_items())}"
+        token = collection_versions.token(collections, key)
+        if token is None:
+            return None
+
+        etag = f'W/"{token}"'
+        if etag_matches(request.headers.get("If-None-Match", ""), etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return etag
+
+    return check
@@ -2,33 +2,46 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.core.exposedsecretClient import ExposedsecretClient
+from app.api.responses import (
+    FIELDS_DESCRIPTION,
+    fields_include,
+    model_response,
+    parse_fields,
+)
+from app.core.exposedsecretClient import AsyncExposedsecretClient
 from app.models.exposedsecret import ExposedSecret
 
 router = APIRouter()
 
 
-def get_exposedsecret_client() -> ExposedsecretClient:
-    """Dependency to get ExposedsecretClient instance."""
-    return ExposedsecretClient()
+async def get_exposedsecret_client() -> AsyncExposedsecretClient:
+    """Dependency to get AsyncExposedsecretClient instance."""
+    return AsyncExposedsecretClient()
 
 
 @router.get("/", response_model=List[ExposedSecret])
-def list_exposedsecrets(
+async def list_exposedsecrets(
     namespace: Optional[str] = Query(None),
     cluster: Optional[str] = Query(None),
-    db: ExposedsecretClient = Depends(get_exposedsecret_client),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncExposedsecretClient = Depends(get_exposedsecret_client),
 ):
     """List all exposed secrets in the cluster."""
-    return db.get_all(namespace=namespace, cluster=cluster)
+    fields = parse_fields(ExposedSecret, fields)
+    exposedsecrets = await db.get_all(
+        namespace=namespace, cluster=cluster, fields=fields
+    )
+    return model_response(
+        List[ExposedSecret], exposedsecrets, include=fields_include(fields)
+    )
 
 
 @router.get("/{uid}", response_model=ExposedSecret)
-def show_exposedsecret(
-    uid: str, db: ExposedsecretClient = Depends(get_exposedsecret_client)
+async def show_exposedsecret(
+    uid: str, db: AsyncExposedsecretClient = Depends(get_exposedsecret_client)
 ):
     """Show a specific exposed secret by uid."""
-    exposedsecret = db.get_by_uid(uid)
+    exposedsecret = await db.get_by_uid(uid)
     if exposedsecret is None:
         raise HTTPException(status_code=404, detail="Exposed secret not found")
     return exposedsecret
@@ -0,0 +1,37 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.imageClient import AsyncImageClient
+from app.models.image import Image, ImageVulnerabilities
+
+router = APIRouter()
+
+
+async def get_image_client() -> AsyncImageClient:
+    """Dependency to get AsyncImageClient instance."""
+    return AsyncImageClient()
+
+
+@router.get("/", response_model=List[Image])
+async def list_images(
+    namespace: Optional[str] = Query(None),
+    cluster: Optional[str] = Query(None),
+    db: AsyncImageClient = Depends(get_image_client),
+):
+    """List scanned images with their pods and severity counts."""
+    return await db.get_images(namespace=namespace, cluster=cluster)
+
+
+@router.get("/vulnerabilities", response_model=ImageVulnerabilities)
+async def show_image_vulnerabilities(
+    repository: str = Query(..., description="e.g. library/nginx"),
+    tag: Optional[str] = Query(None),
+    digest: Optional[str] = Query(None),
+    db: AsyncImageClient = Depends(get_image_client),
+):
+    """Show the vulnerabilities of one image, listed once for all its pods."""
+    image = await db.get_image(repository, tag=tag, digest=digest)
+    if image is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return image
@@ -0,0 +1,144 @@
+import json
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pymongo.errors import PyMongoError
+
+from app.core.cache import query_cache
+from app.core.ingestionClient import (
+    RESOURCES,
+    AsyncIngestionClient,
+    InvalidObjectError,
+    ingestion_stats,
+)
+from app.core.snapshot import vulnerability_snapshot
+
+router = APIRouter()
+
+# Line numbers of invalid lines listed in a response; the rest are only counted
+MAX_INVALID_LINES = 100
+
+
+async def get_ingestion_client(
+    cluster: Optional[str] = Query(None, description="Defaults to CLUSTER_NAME"),
+) -> AsyncIngestionClient:
+    """Dependency to get AsyncIngestionClient instance."""
+    return AsyncIngestionClient(cluster=cluster)
+
+
+async def ndjson_lines(stream, max_length: int = None):
+    """Split a byte stream into lines as the chunks arrive.
+
+    Only new chunks are searched for newlines and a line is joined once, when
+    it ends, so long lines cost linear time. A line of more than
+    ``max_length`` bytes is dropped as it arrives and yielded as None.
+    """
+    pieces, length = [], 0
+    async for chunk in stream:
+        start = 0
+        end = chunk.find(b"\n")
+        while end != -1:
+            length += end - start
+            if max_length and length > max_length:
+                yield None
+            else:
+                pieces.append(chunk[start:end])
+                yield b"".join(pieces)
+            pieces, length = [], 0
+            start = end + 1
+            end = chunk.find(b"\n", start)
+        length += len(chunk) - start
+        if not max_length or length <= max_length:
+            pieces.append(chunk[start:])
+        else:
+            pieces = []
+    if length:
+        yield None if max_length and length > max_length else b"".join(pieces)
+
+
+@router.get("/", response_model=dict)
+async def ingestion_counters():
+    """Objects written, skipped as unchanged and deleted, per collection."""
+    return ingestion_stats.stats()
+
+
+@router.post("/{kind}", response_model=dict)
+async def ingest(
+    kind: str,
+    request: Request,
+    batch_size: Optional[int] = Query(
+        None, ge=1, le=10000, description="Defaults to INGESTION_BATCH_SIZE"
+    ),
+    db: AsyncIngestionClient = Depends(get_ingestion_client),
+):
+    """Upsert newline-delimited JSON objects, e.g. trivy-operator reports.
+
+    Each line is one object as the Kubernetes API returns it, such as an item
+    of ``kubectl get vulnerabilityreports -A -o json``. Objects are written
+    every ``batch_size`` lines with one unordered ``bulk_write``; lines that
+    are not valid objects or longer than ``INGESTION_MAX_LINE_BYTES`` are
+    skipped and counted, with the first line numbers listed, and so are
+    reports whose content is unchanged. Batches written before a database
+    error stay written.
+    """
+    if kind not in RESOURCES:
+        raise HTTPException(status_code=404, detail=f"Unknown kind: {kind}")
+    batch_size = batch_size or int(os.getenv("INGESTION_BATCH_SIZE", "500"))
+    max_length = int(os.getenv("INGESTION_MAX_LINE_BYTES", str(16 * 1024 * 1024)))
+
+    batches, invalid_lines, invalid, received = [], [], 0, 0
+
+    async def flush():
+        nonlocal received
+        try:
+            results = await db.flush()
+        except PyMongoError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Database error after {len(batches)} batches: {e}",
+            ) from e
+        counts = results.get(kind, {"written": 0, "skipped": 0, "deleted": 0})
+        batches.append({"received": received, **counts})
+        received = 0
+
+    def skip(line_number):
+        nonlocal invalid
+        invalid += 1
+        if len(invalid_lines) < MAX_INVALID_LINES:
+            invalid_lines.append(line_number)
+
+    line_number = 0
+    try:
+        async for line in ndjson_lines(request.stream(), max_length):
+            line_number += 1
+            if line is None:
+                skip(line_number)
+                continue
+            if not line.strip():
+                continue
+            try:
+                db.queue(kind, json.loads(line))
+            except (ValueError, InvalidObjectError):
+                skip(line_number)
+                continue
+            received += 1
+            if received >= batch_size:
+                await flush()
+        if received:
+            await flush()
+    finally:
+        if any(batch["written"] or batch["deleted"] for batch in batches):
+            # Without the change stream watcher nothing else notices the writes
+            query_cache.invalidate(kind)
+            if kind == "vulnerabilityreports":
+                vulnerability_snapshot.mark_stale()
+
+    return {
+        "kind": kind,
+        "batches": batches,
+        "written": sum(batch["written"] for batch in batches),
+        "skipped": sum(batch["skipped"] for batch in batches),
+        "invalid": invalid,
+        "invalid_lines": invalid_lines,
+    }
@@ -0,0 +1,85 @@
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    exposed_registry,
+    http_request_duration,
+    http_requests_in_progress,
+    http_response_size,
+)
+
+router = APIRouter()
+
+# Label for requests no route matches, so unknown paths add no series
+UNMATCHED = "unmatched"
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route ``scope`` is dispatched to.
+
+    Templates such as ``/vulnerabilities/by-id/{vulnerability_id}`` keep one
+    series per route rather than per requested URL.
+    """
+    app = scope.get("app")
+    partial = UNMATCHED
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial == UNMATCHED:
+            # Path matches but the method does not: answered with a 405
+            partial = route.path
+    return partial
+
+
+class MetricsMiddleware:
+
+    """Record latency, in-flight requests and response sizes per route.
+
+    Latency runs until the last body chunk is sent, so streamed responses
+    such as NDJSON exports are timed in full. Added after the compression
+    middleware, it sees the bytes that go on the wire.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        status, size = 500, 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
+        in_progress = http_requests_in_progress.labels(method=method, route=route)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            http_request_duration.labels(
+                method=method, route=route, status=status
+            ).observe(time.perf_counter() - started)
+            http_response_size.labels(method=method, route=route).observe(size)
+
+
+@router.get("", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in the text exposition format."""
+    return Response(generate_latest(exposed_registry()), media_type=CONTENT_TYPE_LATEST)
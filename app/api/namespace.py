@@ -2,21 +2,26 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query
 
-from app.core.namespaceClient import NamespaceClient
+from app.api.conditional import conditional
+from app.core.namespaceClient import AsyncNamespaceClient
 from app.models.namespace import Namespace
 
 router = APIRouter()
 
 
-def get_namespace_client() -> NamespaceClient:
-    """Dependency to get NamespaceClient instance."""
-    return NamespaceClient()
+async def get_namespace_client() -> AsyncNamespaceClient:
+    """Dependency to get AsyncNamespaceClient instance."""
+    return AsyncNamespaceClient()
 
 
-@router.get("/", response_model=List[Namespace])
-def list_namespaces(
+@router.get(
+    "/",
+    response_model=List[Namespace],
+    dependencies=[Depends(conditional("namespaces"))],
+)
+async def list_namespaces(
     cluster: Optional[str] = Query(None),
-    db: NamespaceClient = Depends(get_namespace_client),
+    db: AsyncNamespaceClient = Depends(get_namespace_client),
 ):
     """List all Kubernetes namespaces in the cluster."""
-    return db.get_all(cluster=cluster)
+    return await db.get_all(cluster=cluster)
@@ -0,0 +1,61 @@
+import os
+from functools import lru_cache
+
+from fastapi import HTTPException, Response
+from pydantic import TypeAdapter
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. vulnerabilityID,severity"
+
+
+def fast_json_enabled() -> bool:
+    return os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+
+@lru_cache(maxsize=None)
+def _adapter(annotation) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def parse_fields(model, fields: str = None, allowed=None):
+    """The ``fields=`` query parameter as a sorted tuple of ``model`` fields.
+
+    ``allowed`` narrows the fields to those a route actually fills in.
+    Returns None when no fields were requested; unknown fields are a 400.
+    """
+    if not fields:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(names - set(allowed or model.model_fields))
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return tuple(sorted(names)) or None
+
+
+def fields_include(fields):
+    """``include`` trimming every model of a list to ``fields``."""
+    return {"__all__": set(fields)} if fields else None
+
+
+def model_response(annotation, content, include=None, headers=None):
+    """Serialise ``content`` as ``annotation`` with a cached ``TypeAdapter``.
+
+    With ``FAST_JSON_RESPONSES=true`` the content is validated and dumped by
+    a cached ``TypeAdapter`` and returned as a ready ``Response``, skipping
+    FastAPI's per-request ``response_model`` handling; the route keeps its
+    ``response_model`` for the OpenAPI schema. Validation turns plain dicts,
+    such as the report listings of ``/vulnerabilities/``, into models with
+    their defaults, as ``response_model`` would, and lets built models pass.
+    Responses trimmed with ``include`` (``fields=``) always take this path.
+    ``headers`` are set on that ready ``Response``, which does not get the
+    headers that dependencies set.
+    """
+    if include is None and not fast_json_enabled():
+        return content
+    adapter = _adapter(annotation)
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(content), include=include),
+        media_type="application/json",
+        headers=headers,
+    )
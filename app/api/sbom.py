@@ -2,31 +2,40 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.core.sbomClient import SbomClient
+from app.api.responses import (
+    FIELDS_DESCRIPTION,
+    fields_include,
+    model_response,
+    parse_fields,
+)
+from app.core.sbomClient import AsyncSbomClient
 from app.models.sbom import SBOM
 
 router = APIRouter()
 
 
-def get_sbom_client() -> SbomClient:
-    """Dependency to get SbomClient instance."""
-    return SbomClient()
+async def get_sbom_client() -> AsyncSbomClient:
+    """Dependency to get AsyncSbomClient instance."""
+    return AsyncSbomClient()
 
 
 @router.get("/", response_model=List[SBOM])
-def list_sbom(
+async def list_sbom(
     namespace: Optional[str] = Query(None),
     cluster: Optional[str] = Query(None),
-    db: SbomClient = Depends(get_sbom_client),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSbomClient = Depends(get_sbom_client),
 ):
     """List all sbom in the cluster."""
-    return db.get_all(namespace=namespace, cluster=cluster)
+    fields = parse_fields(SBOM, fields)
+    sboms = await db.get_all(namespace=namespace, cluster=cluster, fields=fields)
+    return model_response(List[SBOM], sboms, include=fields_include(fields))
 
 
 @router.get("/{uid}", response_model=SBOM)
-def show_sbom(uid: str, db: SbomClient = Depends(get_sbom_client)):
+async def show_sbom(uid: str, db: AsyncSbomClient = Depends(get_sbom_client)):
     """Show a specific SBOM by uid."""
-    sbom = db.get_by_uid(uid)
+    sbom = await db.get_by_uid(uid)
     if sbom is None:
         raise HTTPException(status_code=404, detail="SBOM not found")
     return sbom
@@ -2,7 +2,7 @@ from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.core.userClient import UserClient
+from app.core.userClient import AsyncUserClient
 from app.models.user import (
     BulkUserRequest,
     CreateUserRequest,
@@ -14,9 +14,9 @@ from app.models.user import (
 router = APIRouter()
 
 
-def get_user_client() -> UserClient:
-    """Dependency to get UserClient instance."""
-    return UserClient()
+async def get_user_client() -> AsyncUserClient:
+    """Dependency to get AsyncUserClient instance."""
+    return AsyncUserClient()
 
 
 # Response helper functions
@@ -39,7 +39,7 @@ def error_response(
 
 
 @router.get("/roles", response_model=Dict[str, Any])
-def get_roles(db: UserClient = Depends(get_user_client)):
+async def get_roles(db: AsyncUserClient = Depends(get_user_client)):
     """Get all available user roles with their permissions."""
     try:
         roles = db.get_roles()
@@ -54,10 +54,10 @@ def get_roles(db: UserClient = Depends(get_user_client)):
 
 
 @router.get("/stats", response_model=Dict[str, Any])
-def get_user_stats(db: UserClient = Depends(get_user_client)):
+async def get_user_stats(db: AsyncUserClient = Depends(get_user_client)):
     """Get user statistics."""
     try:
-        stats = db.get_stats()
+        stats = await db.get_stats()
         return success_response(stats)
     except Exception as e:
         raise HTTPException(
@@ -69,7 +69,7 @@ def get_user_stats(db: UserClient = Depends(get_user_client)):
 
 
 @router.get("/", response_model=Dict[str, Any])
-def list_users(
+async def list_users(
     role: Optional[str] = Query(None, description="Filter by role ID"),
     namespace: Optional[str] = Query(None, description="Filter by namespace access"),
     status: Optional[str] = Query(
@@ -78,11 +78,11 @@ def list_users(
     search: Optional[str] = Query(None, description="Search by email or fullname"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(50, ge=1, le=100, description="Items per page"),
-    db: UserClient = Depends(get_user_client),
+    db: AsyncUserClient = Depends(get_user_client),
 ):
     """List all users with optional filtering and pagination."""
     try:
-        users, total = db.get_all(
+        users, total = await db.get_all(
             role=role,
             namespace=namespace,
             status=status,
@@ -116,10 +116,10 @@ def list_users(
 
 
 @router.get("/{user_id}", response_model=Dict[str, Any])
-def get_user_by_id(user_id: str, db: UserClient = Depends(get_user_client)):
+async def get_user_by_id(user_id: str, db: AsyncUserClient = Depends(get_user_client)):
     """Get user by ID."""
     try:
-        user = db.get_by_id(user_id)
+        user = await db.get_by_id(user_id)
 
         if not user:
             raise HTTPException(
@@ -139,20 +139,20 @@ def get_user_by_id(user_id: str, db: UserClient = Depends(get_user_client)):
 
 
 @router.post("/", status_code=201)
-def create_user(
-    user_request: CreateUserRequest, db: UserClient = Depends(get_user_client)
+async def create_user(
+    user_request: CreateUserRequest, db: AsyncUserClient = Depends(get_user_client)
 ):
     """Create a new user."""
     try:
         # Check if email already exists
-        if db.email_exists(user_request.email):
+        if await db.email_exists(user_request.email):
             raise HTTPException(
                 status_code=409,
                 detail=error_response("Conflict", "Email address already in use", 409),
             )
 
         # Create user
-        user = db.create(user_request.model_dump())
+        user = await db.create(user_request.model_dump())
 
         return success_response(user.model_dump(), "User created successfully")
 
@@ -172,15 +172,15 @@ def create_user(
 
 
 @router.put("/{user_id}", response_model=Dict[str, Any])
-def update_user(
+async def update_user(
     user_id: str,
     user_request: UpdateUserRequest,
-    db: UserClient = Depends(get_user_client),
+    db: AsyncUserClient = Depends(get_user_client),
 ):
     """Update an existing user."""
     try:
         # Check if user exists
-        existing_user = db.get_by_id(user_id)
+        existing_user = await db.get_by_id(user_id)
         if not existing_user:
             raise HTTPException(
                 status_code=404,
@@ -189,7 +189,7 @@ def update_user(
 
         # Check email conflict if email is being updated
         if user_request.email and user_request.email != existing_user.email:
-            if db.email_exists(user_request.email, exclude_user_id=user_id):
+            if await db.email_exists(user_request.email, exclude_user_id=user_id):
                 raise HTTPException(
                     status_code=409,
                     detail=error_response(
@@ -199,7 +199,7 @@ def update_user(
 
         # Update user
         update_data = user_request.model_dump(exclude_unset=True)
-        updated_user = db.update(user_id, update_data)
+        updated_user = await db.update(user_id, update_data)
 
         return success_response(updated_user.model_dump(), "User updated successfully")
 
@@ -219,11 +219,11 @@ def update_user(
 
 
 @router.delete("/{user_id}", response_model=Dict[str, Any])
-def delete_user(user_id: str, db: UserClient = Depends(get_user_client)):
+async def delete_user(user_id: str, db: AsyncUserClient = Depends(get_user_client)):
     """Delete a user."""
     try:
         # Check if user exists
-        user = db.get_by_id(user_id)
+        user = await db.get_by_id(user_id)
         if not user:
             raise HTTPException(
                 status_code=404,
@@ -232,7 +232,7 @@ def delete_user(user_id: str, db: UserClient = Depends(get_user_client)):
 
         # Check if user can be deleted (business rules)
         if user.role == "SysAdmin":
-            active_sysadmin_count = db.count_active_sysadmins()
+            active_sysadmin_count = await db.count_active_sysadmins()
             if active_sysadmin_count <= 1 and user.status == "active":
                 raise HTTPException(
                     status_code=409,
@@ -244,7 +244,7 @@ def delete_user(user_id: str, db: UserClient = Depends(get_user_client)):
                 )
 
         # Delete user
-        success = db.delete(user_id)
+        success = await db.delete(user_id)
         if not success:
             raise HTTPException(
                 status_code=500,
@@ -269,10 +269,10 @@ def delete_user(user_id: str, db: UserClient = Depends(get_user_client)):
 
 
 @router.patch("/{user_id}/activate", response_model=Dict[str, Any])
-def activate_user(user_id: str, db: UserClient = Depends(get_user_client)):
+async def activate_user(user_id: str, db: AsyncUserClient = Depends(get_user_client)):
     """Activate a user."""
     try:
-        user = db.activate_user(user_id)
+        user = await db.activate_user(user_id)
 
         if not user:
             raise HTTPException(
@@ -294,11 +294,11 @@ def activate_user(user_id: str, db: UserClient = Depends(get_user_client)):
 
 
 @router.patch("/{user_id}/deactivate", response_model=Dict[str, Any])
-def deactivate_user(user_id: str, db: UserClient = Depends(get_user_client)):
+async def deactivate_user(user_id: str, db: AsyncUserClient = Depends(get_user_client)):
     """Deactivate a user."""
     try:
         # Check if user exists and get current data
-        current_user = db.get_by_id(user_id)
+        current_user = await db.get_by_id(user_id)
         if not current_user:
             raise HTTPException(
                 status_code=404,
@@ -307,7 +307,7 @@ def deactivate_user(user_id: str, db: UserClient = Depends(get_user_client)):
 
         # Check if user can be deactivated (business rules)
         if current_user.role == "SysAdmin":
-            active_sysadmin_count = db.count_active_sysadmins()
+            active_sysadmin_count = await db.count_active_sysadmins()
             if active_sysadmin_count <= 1 and current_user.status == "active":
                 raise HTTPException(
                     status_code=409,
@@ -318,7 +318,7 @@ def deactivate_user(user_id: str, db: UserClient = Depends(get_user_client)):
                     ),
                 )
 
-        user = db.deactivate_user(user_id)
+        user = await db.deactivate_user(user_id)
 
         return success_response(user.model_dump(), "User deactivated successfully")
 
@@ -334,14 +334,14 @@ def deactivate_user(user_id: str, db: UserClient = Depends(get_user_client)):
 
 
 @router.put("/{user_id}/namespaces", response_model=Dict[str, Any])
-def update_user_namespaces(
+async def update_user_namespaces(
     user_id: str,
     namespace_request: UpdateNamespacesRequest,
-    db: UserClient = Depends(get_user_client),
+    db: AsyncUserClient = Depends(get_user_client),
 ):
     """Update user's namespaces."""
     try:
-        user = db.update_namespaces(user_id, namespace_request.namespaces)
+        user = await db.update_namespaces(user_id, namespace_request.namespaces)
 
         if not user:
             raise HTTPException(
@@ -369,10 +369,10 @@ def update_user_namespaces(
 
 
 @router.patch("/bulk", response_model=Dict[str, Dict[str, int]])
-def bulk_update_users(
+async def bulk_update_users(
     bulk_request: BulkUserRequest,
     user_updates: UpdateUserRequest,
-    db: UserClient = Depends(get_user_client),
+    db: AsyncUserClient = Depends(get_user_client),
 ):
     """Bulk update multiple users."""
     try:
@@ -384,7 +384,7 @@ def bulk_update_users(
                 detail=error_response("Bad Request", "No update data provided", 400),
             )
 
-        updated_count = db.bulk_update(bulk_request.userIds, update_data)
+        updated_count = await db.bulk_update(bulk_request.userIds, update_data)
 
         return success_response(
             {"updated": updated_count, "requested": len(bulk_request.userIds)},
@@ -403,18 +403,18 @@ def bulk_update_users(
 
 
 @router.delete("/bulk", response_model=Dict[str, Dict[str, int]])
-def bulk_delete_users(
-    bulk_request: BulkUserRequest, db: UserClient = Depends(get_user_client)
+async def bulk_delete_users(
+    bulk_request: BulkUserRequest, db: AsyncUserClient = Depends(get_user_client)
 ):
     """Bulk delete multiple users."""
     try:
         # Check if any of the users are SysAdmins that would leave the system without admins
-        sysadmin_count = db.count_active_sysadmins()
+        sysadmin_count = await db.count_active_sysadmins()
 
         # Count how many active sysadmins are in the deletion list
         sysadmins_to_delete = 0
         for user_id in bulk_request.userIds:
-            user = db.get_by_id(user_id)
+            user = await db.get_by_id(user_id)
             if user and user.role == "SysAdmin" and user.status == "active":
                 sysadmins_to_delete += 1
 
@@ -428,7 +428,7 @@ def bulk_delete_users(
                 ),
             )
 
-        deleted_count = db.bulk_delete(bulk_request.userIds)
+        deleted_count = await db.bulk_delete(bulk_request.userIds)
 
         return success_response(
             {"deleted": deleted_count, "requested": len(bulk_request.userIds)},
@@ -447,24 +447,24 @@ def bulk_delete_users(
 
 
 @router.get("/{user_id}/activity", response_model=Dict[str, List[Dict[str, Any]]])
-def get_user_activity(
+async def get_user_activity(
     user_id: str,
     limit: int = Query(
         50, ge=1, le=100, description="Number of activity records to return"
     ),
-    db: UserClient = Depends(get_user_client),
+    db: AsyncUserClient = Depends(get_user_client),
 ):
     """Get user activity logs."""
     try:
         # Check if user exists
-        user = db.get_by_id(user_id)
+        user = await db.get_by_id(user_id)
         if not user:
             raise HTTPException(
                 status_code=404,
                 detail=error_response("Not Found", "User not found", 404),
             )
 
-        activity = db.get_user_activity(user_id, limit)
+        activity = await db.get_user_activity(user_id, limit)
 
         return success_response(activity)
 
@@ -480,13 +480,13 @@ def get_user_activity(
 
 
 @router.post("/password-reset/request", response_model=Dict[str, Any])
-def request_password_reset(
-    reset_request: PasswordResetRequest, db: UserClient = Depends(get_user_client)
+async def request_password_reset(
+    reset_request: PasswordResetRequest, db: AsyncUserClient = Depends(get_user_client)
 ):
     """Request password reset for a user."""
     try:
         # Check if user exists
-        db.get_by_email(reset_request.email)
+        await db.get_by_email(reset_request.email)
 
         # Always return success for security (don't reveal if email exists)
         # In a real implementation, this would send an email with reset instructions
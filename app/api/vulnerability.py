@@ -1,46 +1,198 @@
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
-from app.core.vulnerabilityClient import VulnerabilityClient
-from app.models.vulnerability import Vulnerability
+from app.api.responses import (
+    FIELDS_DESCRIPTION,
+    fields_include,
+    model_response,
+    parse_fields,
+)
+from app.core.findingClient import AsyncFindingClient, findings_current
+from app.core.snapshot import vulnerability_snapshot
+from app.core.vulnerabilityClient import (
+    GROUP_FIELDS,
+    LIST_FIELDS,
+    AsyncVulnerabilityClient,
+    InvalidCursorError,
+)
+from app.models.vulnerability import GroupCount, Vulnerability, VulnerabilityPage
 
 router = APIRouter()
 
+# Lines are grouped into chunks of roughly this many characters per send
+STREAM_CHUNK_SIZE = 64 * 1024
 
-def get_vulnerability_client() -> VulnerabilityClient:
-    """Dependency to get VulnerabilityClient instance."""
-    return VulnerabilityClient()
+
+async def get_vulnerability_client() -> AsyncVulnerabilityClient:
+    """Dependency to get AsyncVulnerabilityClient instance."""
+    return AsyncVulnerabilityClient()
+
+
+async def get_finding_client() -> AsyncFindingClient:
+    """Dependency to get AsyncFindingClient instance."""
+    return AsyncFindingClient()
 
 
 @router.get("/", response_model=List[Vulnerability])
-def list_vulnerabilities(
+async def list_vulnerabilities(
+    namespace: Optional[str] = Query(None),
+    cluster: Optional[str] = Query(None),
+    severity: Optional[str] = Query(None),
+    fixed: Optional[bool] = Query(None, description="Only findings with(out) a fix"),
+    min_score: Optional[float] = Query(None, ge=0),
+    resource: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncVulnerabilityClient = Depends(get_vulnerability_client),
+):
+    """List all vulnerabilities in the cluster, one entry per report."""
+    fields = parse_fields(Vulnerability, fields, allowed=LIST_FIELDS)
+    vulnerabilities = await db.get_all(
+        namespace=namespace,
+        cluster=cluster,
+        severity=severity,
+        fixed=fixed,
+        min_score=min_score,
+        resource=resource,
+        fields=fields,
+    )
+    return model_response(
+        List[Vulnerability], vulnerabilities, include=fields_include(fields)
+    )
+
+
+@router.get("/flatten", response_model=VulnerabilityPage)
+async def list_vulnerabilities_flatten(
+    namespace: Optional[str] = Query(None),
+    cluster: Optional[str] = Query(None),
+    severity: Optional[str] = Query(None),
+    fixed: Optional[bool] = Query(None, description="Only findings with(out) a fix"),
+    min_score: Optional[float] = Query(None, ge=0),
+    resource: Optional[str] = Query(None),
+    limit: int = Query(1000, ge=1, le=10000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncVulnerabilityClient = Depends(get_vulnerability_client),
+    findings_db: AsyncFindingClient = Depends(get_finding_client),
+):
+    """List vulnerabilities in the cluster, one page at a time."""
+    fields = parse_fields(Vulnerability, fields)
+    filters = {
+        "namespace": namespace,
+        "cluster": cluster,
+        "severity": severity,
+        "fixed": fixed,
+        "min_score": min_score,
+        "resource": resource,
+    }
+    snapshot = vulnerability_snapshot.current()
+    try:
+        if snapshot is not None:
+            page = snapshot.page(limit=limit, cursor=cursor, **filters)
+        elif findings_current():
+            page = await findings_db.get_flattened_page(
+                **filters, limit=limit, cursor=cursor, fields=fields
+            )
+        else:
+            page = await db.get_flattened_page(
+                **filters, limit=limit, cursor=cursor, fields=fields
+            )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    include = {"items": fields_include(fields), "next_cursor": True} if fields else None
+    return model_response(VulnerabilityPage, page, include=include)
+
+
+@router.get("/flatten/stream")
+async def stream_vulnerabilities_flatten(
     namespace: Optional[str] = Query(None),
     cluster: Optional[str] = Query(None),
     severity: Optional[str] = Query(None),
-    db: VulnerabilityClient = Depends(get_vulnerability_client),
+    fixed: Optional[bool] = Query(None, description="Only findings with(out) a fix"),
+    min_score: Optional[float] = Query(None, ge=0),
+    resource: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncVulnerabilityClient = Depends(get_vulnerability_client),
 ):
-    """List all vulnerabilities in the cluster."""
-    return db.get_all(namespace=namespace, cluster=cluster, severity=severity)
+    """Stream all vulnerabilities in the cluster as newline-delimited JSON."""
+    fields = parse_fields(Vulnerability, fields)
+    include = set(fields) if fields else None
+
+    async def lines():
+        buffer, size = [], 0
+        async for vulnerability in db.iter_flattened(
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
+            fields=fields,
+        ):
+            line = vulnerability.model_dump_json(include=include) + "\n"
+            buffer.append(line)
+            size += len(line)
+            if size >= STREAM_CHUNK_SIZE:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
-@router.get("/flatten", response_model=List[Vulnerability])
-def list_vulnerabilities_flatten(
+@router.get("/groups", response_model=List[GroupCount])
+async def group_vulnerabilities(
+    by: str = Query(..., description=f"One of {', '.join(GROUP_FIELDS)}"),
     namespace: Optional[str] = Query(None),
     cluster: Optional[str] = Query(None),
     severity: Optional[str] = Query(None),
-    db: VulnerabilityClient = Depends(get_vulnerability_client),
+    fixed: Optional[bool] = Query(None, description="Only findings with(out) a fix"),
+    min_score: Optional[float] = Query(None, ge=0),
+    resource: Optional[str] = Query(None),
+    db: AsyncVulnerabilityClient = Depends(get_vulnerability_client),
+):
+    """Number of vulnerabilities per cluster, namespace, severity, ID or resource."""
+    if by not in GROUP_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Cannot group by: {by}")
+    filters = {
+        "namespace": namespace,
+        "cluster": cluster,
+        "severity": severity,
+        "fixed": fixed,
+        "min_score": min_score,
+        "resource": resource,
+    }
+    snapshot = vulnerability_snapshot.current()
+    if snapshot is not None:
+        return snapshot.group_counts(by, **filters)
+    return await db.get_group_counts(by, **filters)
+
+
+@router.get("/by-id/{vulnerability_id}", response_model=List[Vulnerability])
+async def list_affected(
+    vulnerability_id: str,
+    namespace: Optional[str] = Query(None),
+    cluster: Optional[str] = Query(None),
+    db: AsyncVulnerabilityClient = Depends(get_vulnerability_client),
+    findings_db: AsyncFindingClient = Depends(get_finding_client),
 ):
-    """List all vulnerabilities in the cluster."""
-    return db.get_flattened(namespace=namespace, cluster=cluster, severity=severity)
+    """List every pod/image affected by a vulnerability (e.g. a CVE ID)."""
+    if findings_current():
+        db = findings_db
+    affected = await db.get_affected(
+        vulnerability_id, namespace=namespace, cluster=cluster
+    )
+    return model_response(List[Vulnerability], affected)
 
 
 @router.get("/{uid}", response_model=List[Vulnerability])
-def show_vulnerability(
-    uid: str, db: VulnerabilityClient = Depends(get_vulnerability_client)
+async def show_vulnerability(
+    uid: str, db: AsyncVulnerabilityClient = Depends(get_vulnerability_client)
 ):
     """Show vulnerabilities for a specific UID."""
-    vulnerabilities = db.get_by_uid(uid)
+    vulnerabilities = await db.get_by_uid(uid)
     if not vulnerabilities:
         raise HTTPException(status_code=404, detail="Vulnerability not found")
     return vulnerabilities
@@ -1,32 +1,35 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.core.old_vulnerabilityClient import VulnerabilityClient
+from app.core.old_vulnerabilityClient import AsyncVulnerabilityClient
 from app.models.old_vulnerability import Vulnerability
 
 router = APIRouter()
 
 
-def get_vulnerability_client() -> VulnerabilityClient:
-    """Dependency to get VulnerabilityClient instance."""
-    return VulnerabilityClient()
+async def get_vulnerability_client() -> AsyncVulnerabilityClient:
+    """Dependency to get AsyncVulnerabilityClient instance."""
+    return AsyncVulnerabilityClient()
 
 
 @router.get("/", response_model=List[Vulnerability])
-def list_vulnerabilities(
+async def list_vulnerabilities(
     namespace: Optional[str] = Query(None),
     cluster: Optional[str] = Query(None),
     severity: Optional[str] = Query(None),
-    db: VulnerabilityClient = Depends(get_vulnerability_client),
+    db: AsyncVulnerabilityClient = Depends(get_vulnerability_client),
 ):
     """List all vulnerabilities in the cluster."""
-    return db.get_all(namespace=namespace, cluster=cluster, severity=severity)
+    return await db.get_all(namespace=namespace, cluster=cluster, severity=severity)
 
 
 @router.get("/{hash}", response_model=Vulnerability)
-def show_vulnerability(
-    hash: str, db: VulnerabilityClient = Depends(get_vulnerability_client)
+async def show_vulnerability(
+    hash: str, db: AsyncVulnerabilityClient = Depends(get_vulnerability_client)
 ):
     """Show a specific vulnerability by hash."""
-    return db.get_by_hash(hash)
+    vulnerability = await db.get_by_hash(hash)
+    if vulnerability is None:
+        raise HTTPException(status_code=404, detail="Vulnerability not found")
+    return vulnerability
@@ -0,0 +1,233 @@
+import asyncio
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+
+    """In-process LRU cache for client query results, with a TTL per entry.
+
+    Entries are grouped by scope (the collection they were read from) so that
+    a change to a collection only drops the results that depend on it. Memory
+    is bounded by the rows held across all entries: least recently used
+    entries are evicted once there are more than ``max_rows``, or more than
+    ``max_entries`` entries. Results with more than ``max_items`` rows are
+    not cached at all.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, max_items: int = 10000, max_rows: int = 100000
+    ):
+        self.max_entries = max_entries
+        self.max_items = max_items
+        self.max_rows = max_rows
+        self._entries = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._generations = {}
+
+    def _count(self, scope: str, event: str):
+        stats = self._stats.setdefault(
+            scope,
+            {
+                "hits": 0,
+                "misses": 0,
+                "coalesced": 0,
+                "evictions": 0,
+                "invalidations": 0,
+            },
+        )
+        stats[event] += 1
+
+    def get(self, scope: str, key):
+        """Return ``(True, value)`` for a fresh entry, ``(False, None)`` otherwise."""
+        with self._lock:
+            entry = self._entries.get((scope, key))
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove((scope, key))
+                self._count(scope, "misses")
+                return False, None
+
+            self._entries.move_to_end((scope, key))
+            self._count(scope, "hits")
+            return True, entry[1]
+
+    def record_coalesced(self, scope: str):
+        """Count a call that joined an in-flight query instead of running one."""
+        with self._lock:
+            self._count(scope, "coalesced")
+
+    def generation(self, scope: str) -> int:
+        """A counter bumped by every invalidation of ``scope``."""
+        with self._lock:
+            return self._generations.get(scope, 0)
+
+    def _remove(self, key):
+        self._rows -= self._entries.pop(key)[2]
+
+    def set(self, scope: str, key, value, ttl: float, generation: int = None):
+        """Store ``value``, unless ``scope`` was invalidated since ``generation``."""
+        # Lists hold one row per item, anything else such as counts is one row
+        rows = len(value) if isinstance(value, (list, tuple)) else 1
+        if rows > min(self.max_items, self.max_rows):
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generations.get(scope, 0):
+                return
+            if (scope, key) in self._entries:
+                self._remove((scope, key))
+            self._entries[(scope, key)] = (time.monotonic() + ttl, value, rows)
+            self._rows += rows
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                evicted = next(iter(self._entries))
+                self._remove(evicted)
+                self._count(evicted[0], "evictions")
+
+    def invalidate(self, scope: str = None):
+        """Drop every entry of ``scope``, or the whole cache; returns the count."""
+        with self._lock:
+            for name in [scope] if scope else {*self._generations, *self._stats}:
+                self._generations[name] = self._generations.get(name, 0) + 1
+            keys = [key for key in self._entries if scope in (None, key[0])]
+            for key in keys:
+                self._remove(key)
+                self._count(key[0], "invalidations")
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "rows": self._rows,
+                "max_rows": self.max_rows,
+                "scopes": {scope: dict(stats) for scope, stats in self._stats.items()},
+            }
+
+    def reset(self):
+        """Empty the cache and its statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+            self._stats.clear()
+            self._generations.clear()
+
+
+class SingleFlight:
+
+    """Share one in-flight execution between concurrent identical calls.
+
+    The first caller for a key starts the query as a task; callers arriving
+    while it runs await the same task instead of querying again. The task is
+    shielded, so a caller that disconnects does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._flights = {}
+
+    async def run(self, key, factory, on_join=None):
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._flights[key] = task
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        elif on_join:
+            on_join()
+        return await asyncio.shield(task)
+
+
+query_cache = QueryCache(
+    max_entries=int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1024")),
+    max_items=int(os.getenv("QUERY_CACHE_MAX_ITEMS", "10000")),
+    max_rows=int(os.getenv("QUERY_CACHE_MAX_ROWS", "100000")),
+)
+single_flight = SingleFlight()
+
+
+def _call_key(signature, func, self, args, kwargs):
+    bound = signature.bind(self, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = tuple(
+        (name, value) for name, value in bound.arguments.items() if name != "self"
+    )
+    return (type(self).__name__, func.__name__, arguments)
+
+
+def coalesced(scope: str):
+    """Run concurrent identical calls of an async client method only once.
+
+    Use for results that are too large or too short-lived to cache; cached
+    methods are coalesced already.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            # A call made after an invalidation must not join an older query
+            generation = query_cache.generation(scope)
+            key = (scope, generation, _call_key(signature, func, self, args, kwargs))
+            return await single_flight.run(
+                key,
+                lambda: func(self, *args, **kwargs),
+                on_join=functools.partial(query_cache.record_coalesced, scope),
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def cached(scope: str, ttl: float = None):
+    """Cache the result of an async client method in ``query_cache``.
+
+    The key is the client class, the method and its normalised arguments, so
+    ``get_all(cluster="a")`` and ``get_all(None, "a")`` share an entry. Misses
+    are coalesced: concurrent callers of the same key share one query, also
+    when the cache itself is disabled, unless the scope was invalidated
+    between their calls.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        async def fill(self, key, generation, args, kwargs):
+            value = await func(self, *args, **kwargs)
+            entry_ttl = (
+                ttl if ttl is not None else float(os.getenv("QUERY_CACHE_TTL", "30"))
+            )
+            query_cache.set(scope, key, value, entry_ttl, generation=generation)
+            return value
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            key = _call_key(signature, func, self, args, kwargs)
+            on_join = functools.partial(query_cache.record_coalesced, scope)
+            # Read before joining, so that a call made after an invalidation
+            # never shares a query started before it
+            generation = query_cache.generation(scope)
+            flight = (scope, generation, key)
+
+            if os.getenv("QUERY_CACHE_ENABLED", "true").lower() != "true":
+                return await single_flight.run(
+                    flight, lambda: func(self, *args, **kwargs), on_join
+                )
+
+            hit, value = query_cache.get(scope, key)
+            if hit:
+                return value
+            return await single_flight.run(
+                flight, lambda: fill(self, key, generation, args, kwargs), on_join
+            )
+
+        return wrapper
+
+    return decorator
@@ -1,11 +1,144 @@
+import asyncio
 import os
+import threading
 
-from pymongo import MongoClient
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import AsyncMongoClient, MongoClient
+
+
+class ConnectionManager:
+
+    """Owns the process-wide MongoClient and its connection pool.
+
+    The clients are created lazily on first use (or eagerly from the FastAPI
+    lifespan) and shared by every ``DatabaseClient`` and
+    ``AsyncDatabaseClient`` in the process.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._async_client = None
+        self._async_loop = None
+        self._lock = threading.Lock()
+        self._event_listeners = []
+
+    @staticmethod
+    def get_uri() -> str:
+        return os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+
+    @staticmethod
+    def get_pool_options() -> dict:
+        """Pool settings, configurable through the environment."""
+        return {
+            "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "100")),
+            "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+            "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000")),
+            "waitQueueTimeoutMS": int(
+                os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "10000")
+            ),
+        }
+
+    def add_event_listener(self, listener):
+        """Monitor the clients created from now on with ``listener``."""
+        self._event_listeners.append(listener)
+
+    def get_client_options(self) -> dict:
+        options = self.get_pool_options()
+        if self._event_listeners:
+            options["event_listeners"] = list(self._event_listeners)
+        return options
+
+    @property
+    def client(self) -> MongoClient:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = MongoClient(
+                        self.get_uri(), **self.get_client_options()
+                    )
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncMongoClient:
+        # An AsyncMongoClient is bound to the event loop it is first used on,
+        # so a client seen from another loop is replaced rather than reused.
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        with self._lock:
+            if self._async_client is not None and loop is not None:
+                if self._async_loop is None:
+                    self._async_loop = loop
+                elif self._async_loop is not loop:
+                    self._async_client = None
+
+            if self._async_client is None:
+                self._async_client = AsyncMongoClient(
+                    self.get_uri(), **self.get_client_options()
+                )
+                self._async_loop = loop
+        return self._async_client
+
+    def connect(self) -> MongoClient:
+        """Create the shared client if it does not exist yet."""
+        return self.client
+
+    async def aconnect(self) -> AsyncMongoClient:
+        """Create the shared async client on the running event loop."""
+        return self.async_client
+
+    def close(self):
+        """Close the shared client; a later access creates a fresh one."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    async def aclose(self):
+        """Close both shared clients."""
+        self.close()
+        with self._lock:
+            async_client, self._async_client = self._async_client, None
+            self._async_loop = None
+        if async_client is not None:
+            await async_client.close()
+
+
+connection_manager = ConnectionManager()
+
+
+def lazy_documents(collection):
+    """``collection`` returning ``RawBSONDocument`` when MONGODB_RAW_BSON is true.
+
+    Raw documents keep the BSON bytes off the wire and only decode a
+    subdocument when it is read, so fields a formatter never touches are
+    never turned into Python objects.
+    """
+    if os.getenv("MONGODB_RAW_BSON", "false").lower() != "true":
+        return collection
+    return collection.with_options(
+        codec_options=CodecOptions(document_class=RawBSONDocument)
+    )
+
+
+def fields_projection(projection: dict, field_paths: dict, fields=None, required=()):
+    """Projection for the model ``fields`` a caller asked for, or ``projection``.
+
+    ``field_paths`` maps every model field to the document paths it is read
+    from; ``required`` paths are always fetched, e.g. for paging.
+    """
+    if not fields:
+        return projection
+    paths = [path for field in fields for path in field_paths[field]]
+    return {"_id": 0, **{path: 1 for path in (*required, *paths)}}
 
 
 class DatabaseClient:
     def __init__(self):
-        self.client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+        self.client = connection_manager.client
 
     def get_namespace_collection(self):
         return self.client[os.getenv("MONGODB_DB", "trivy")]["namespaces"]
@@ -20,4 +153,22 @@ class DatabaseClient:
         return self.client[os.getenv("MONGODB_DB", "shield")]["vulnerabilities"]
 
     def close(self):
-        self.client.close()
+        # The pool is shared by all clients and closed by the application
+        # lifespan, so individual clients only drop their reference.
+        self.client = None
+
+
+class AsyncDatabaseClient:
+
+    """Base class for the asyncio clients, backed by the shared AsyncMongoClient.
+
+    Subclasses mix in the matching synchronous client so that collection
+    lookups, query building and formatting are shared, and only override the
+    methods that perform I/O.
+    """
+
+    def __init__(self):
+        self.client = connection_manager.async_client
+
+    def close(self):
+        self.client = None
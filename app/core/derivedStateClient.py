@@ -0,0 +1,82 @@
+import os
+from datetime import datetime
+
+from app.core.databaseClient import AsyncDatabaseClient, DatabaseClient
+
+STATE_COLLECTION = "derived_state"
+# The document holding the change stream resume token of the watchers
+RESUME_TOKEN_ID = "watcher"
+# Collections derived from the reports, each with its own build marker
+SUMMARIES = "vulnerability_summaries"
+HASHES = "vulnerability_hashes"
+FINDINGS = "findings"
+
+
+class DerivedStateClient(DatabaseClient):
+
+    """Build markers of the derived collections and the watcher's resume token.
+
+    A derived collection is only complete once a rebuild has gone through
+    every report: the rebuild drops its marker when it starts and writes it
+    when it finishes. The watcher keeps it in step from then on and drops
+    every marker when changes may have been missed, i.e. when it opens a
+    change stream without a resume token to continue from.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+    def get_collection(self):
+        return self.client[os.getenv("MONGODB_DB", "shield")][STATE_COLLECTION]
+
+    def mark_built(self, name: str):
+        self.get_collection().replace_one(
+            {"_id": name}, {"_id": name, "builtAt": datetime.utcnow()}, upsert=True
+        )
+
+    def clear_built(self, name: str = None):
+        """Drop the marker of ``name``, or of every derived collection."""
+        query = {"_id": name} if name else {"builtAt": {"$exists": True}}
+        self.get_collection().delete_many(query)
+
+    def get_built(self):
+        """Names of the derived collections that were completely rebuilt."""
+        documents = self.get_collection().find({"builtAt": {"$exists": True}})
+        return {document["_id"] for document in documents}
+
+    def get_resume_token(self):
+        document = self.get_collection().find_one({"_id": RESUME_TOKEN_ID})
+        return document["token"] if document else None
+
+    def save_resume_token(self, token):
+        self.get_collection().replace_one(
+            {"_id": RESUME_TOKEN_ID},
+            {"_id": RESUME_TOKEN_ID, "token": token},
+            upsert=True,
+        )
+
+
+class AsyncDerivedStateClient(AsyncDatabaseClient, DerivedStateClient):
+    async def mark_built(self, name: str):
+        await self.get_collection().replace_one(
+            {"_id": name}, {"_id": name, "builtAt": datetime.utcnow()}, upsert=True
+        )
+
+    async def clear_built(self, name: str = None):
+        query = {"_id": name} if name else {"builtAt": {"$exists": True}}
+        await self.get_collection().delete_many(query)
+
+    async def get_built(self):
+        documents = self.get_collection().find({"builtAt": {"$exists": True}})
+        return {document["_id"] async for document in documents}
+
+    async def get_resume_token(self):
+        document = await self.get_collection().find_one({"_id": RESUME_TOKEN_ID})
+        return document["token"] if document else None
+
+    async def save_resume_token(self, token):
+        await self.get_collection().replace_one(
+            {"_id": RESUME_TOKEN_ID},
+            {"_id": RESUME_TOKEN_ID, "token": token},
+            upsert=True,
+        )
@@ -1,29 +1,50 @@
 import os
 
-from app.core.databaseClient import DatabaseClient
+from pymongo import ASCENDING, IndexModel
+
+from app.core.databaseClient import (
+    AsyncDatabaseClient,
+    DatabaseClient,
+    fields_projection,
+    lazy_documents,
+)
 from app.models.exposedsecret import ExposedSecret
 
 
 class ExposedsecretClient(DatabaseClient):
+    INDEXES = [
+        IndexModel([("_cluster", ASCENDING), ("_namespace", ASCENDING)]),
+        IndexModel([("_uid", ASCENDING)], unique=True),
+    ]
+    # The report itself is never rendered, only the fields ``_format`` reads
+    PROJECTION = {"_id": 0, "_uid": 1, "_namespace": 1, "_cluster": 1}
+    FIELD_PATHS = {
+        "uid": ("_uid",),
+        "namespace": ("_namespace",),
+        "cluster": ("_cluster",),
+    }
+
     def __init__(self):
         super().__init__()
 
     def get_collection(self):
         return self.client[os.getenv("MONGODB_DB", "shield")]["exposedsecretreports"]
 
-    def get_all(self, namespace: str = None, cluster: str = None):
+    def get_all(self, namespace: str = None, cluster: str = None, fields: tuple = None):
         query = {}
         if namespace:
             query["_namespace"] = namespace
         if cluster:
             query["_cluster"] = cluster
 
-        items = self.get_collection().find(query, {"_id": 0})
+        projection = fields_projection(self.PROJECTION, self.FIELD_PATHS, fields)
+        items = lazy_documents(self.get_collection()).find(query, projection)
         formatted_items = (self._format(item) for item in items)
         return [item for item in formatted_items if item is not None]
 
     def get_by_uid(self, uid: str):
-        item = self.get_collection().find_one({"_uid": uid}, {"_id": 0})
+        collection = lazy_documents(self.get_collection())
+        item = collection.find_one({"_uid": uid}, self.PROJECTION)
         return self._format(item)
 
     def _format(self, item):
@@ -35,3 +56,26 @@ class ExposedsecretClient(DatabaseClient):
             namespace=item.get("_namespace", ""),
             cluster=item.get("_cluster", ""),
         )
+
+
+class AsyncExposedsecretClient(AsyncDatabaseClient, ExposedsecretClient):
+    async def get_all(
+        self, namespace: str = None, cluster: str = None, fields: tuple = None
+    ):
+        query = {}
+        if namespace:
+            query["_namespace"] = namespace
+        if cluster:
+            query["_cluster"] = cluster
+
+        projection = fields_projection(self.PROJECTION, self.FIELD_PATHS, fields)
+        collection = lazy_documents(self.get_collection())
+        formatted_items = [
+            self._format(item) async for item in collection.find(query, projection)
+        ]
+        return [item for item in formatted_items if item is not None]
+
+    async def get_by_uid(self, uid: str):
+        collection = lazy_documents(self.get_collection())
+        item = await collection.find_one({"_uid": uid}, self.PROJECTION)
+        return self._format(item)
@@ -0,0 +1,312 @@
+import os
+from datetime import datetime
+
+from pymongo import ASCENDING, IndexModel, ReplaceOne
+
+from app.core.cache import cached, coalesced
+from app.core.databaseClient import AsyncDatabaseClient, DatabaseClient
+from app.core.derivedStateClient import FINDINGS, DerivedStateClient
+from app.core.versions import collection_versions
+from app.core.vulnerabilityClient import (
+    FLATTEN_PROJECTION,
+    _decode_cursor,
+    _encode_cursor,
+    flatten_report,
+)
+from app.core.vulnerabilityHashClient import finding_hash
+from app.models.vulnerability import Vulnerability, VulnerabilityPage
+
+# Findings in the order /vulnerabilities/flatten pages through them
+PAGE_SORT = [("report_uid", ASCENDING), ("position", ASCENDING)]
+# Everything a Vulnerability is built from, plus the report for cursors
+PROJECTION = {
+    "_id": 0,
+    "report_id": 0,
+    "position": 0,
+    "hash": 0,
+    "fixed": 0,
+    "updatedAt": 0,
+}
+
+
+def findings_enabled() -> bool:
+    return os.getenv("VULNERABILITY_FINDINGS", "false").lower() == "true"
+
+
+def findings_current() -> bool:
+    """Whether to read from ``findings``: enabled, rebuilt and kept in step."""
+    return findings_enabled() and collection_versions.current(FINDINGS)
+
+
+class FindingClient(DatabaseClient):
+
+    """One document per finding, flattened when its report is written.
+
+    Every document holds the fields of the ``Vulnerability`` that
+    ``flatten_report`` builds, plus the report (``report_id``,
+    ``report_uid``), its ``position`` in the report, its stable ``hash``
+    and ``fixed``. Filters, sorting and paging therefore run on indexes
+    instead of unwinding the report arrays. Entries are kept in step by
+    the change stream watcher and rebuilt with ``make rebuild-findings``;
+    they are only read once such a rebuild has covered every report.
+    Entries are upserted by report and position, so applying a change
+    twice, as every replica's watcher does, leaves one copy.
+    """
+
+    INDEXES = [
+        IndexModel(PAGE_SORT),
+        IndexModel([("report_id", ASCENDING), ("position", ASCENDING)], unique=True),
+        IndexModel([("namespace", ASCENDING), *PAGE_SORT]),
+        IndexModel([("cluster", ASCENDING), *PAGE_SORT]),
+        IndexModel([("severity", ASCENDING), *PAGE_SORT]),
+        IndexModel([("vulnerabilityID", ASCENDING), ("cluster", ASCENDING)]),
+        IndexModel([("hash", ASCENDING)]),
+        IndexModel([("updatedAt", ASCENDING)]),
+    ]
+
+    def __init__(self):
+        super().__init__()
+
+    def get_collection(self):
+        return self.client[os.getenv("MONGODB_DB", "shield")]["findings"]
+
+    def get_reports_collection(self):
+        return self.client[os.getenv("MONGODB_DB", "shield")]["vulnerabilityreports"]
+
+    def get_state_client(self):
+        return DerivedStateClient()
+
+    def _documents(self, report, updated_at: datetime = None):
+        updated_at = updated_at or datetime.utcnow()
+        findings = flatten_report(report) or []
+        return [
+            {
+                **finding.model_dump(exclude={"vulnerabilities"}),
+                "report_id": report["_id"],
+                "report_uid": finding.uid,
+                "position": position,
+                "hash": finding_hash(
+                    finding.vulnerabilityID, finding.pod_id, finding.resource
+                ),
+                "fixed": bool(finding.fixedVersion),
+                "updatedAt": updated_at,
+            }
+            for position, finding in enumerate(findings)
+        ]
+
+    def _writes(self, report, updated_at: datetime = None):
+        """Upserts of the findings of ``report`` and the filter of its leftovers."""
+        documents = self._documents(report, updated_at)
+        upserts = [
+            ReplaceOne(
+                {"report_id": report["_id"], "position": position},
+                document,
+                upsert=True,
+            )
+            for position, document in enumerate(documents)
+        ]
+        leftovers = {"report_id": report["_id"], "position": {"$gte": len(documents)}}
+        return upserts, leftovers
+
+    def sync_report(self, report, updated_at: datetime = None):
+        """Replace the findings of ``report`` with its current ones."""
+        collection = self.get_collection()
+        upserts, leftovers = self._writes(report, updated_at)
+        if upserts:
+            collection.bulk_write(upserts, ordered=False)
+        collection.delete_many(leftovers)
+        return len(upserts)
+
+    def remove_report(self, report_id):
+        return self.get_collection().delete_many({"report_id": report_id}).deleted_count
+
+    def rebuild(self):
+        """Reflatten every report and drop the findings of reports that are gone."""
+        state = self.get_state_client()
+        state.clear_built(FINDINGS)
+        started = datetime.utcnow()
+        total = 0
+        projection = {**FLATTEN_PROJECTION, "_id": 1}
+        for report in self.get_reports_collection().find({}, projection):
+            total += self.sync_report(report, updated_at=started)
+        self.get_collection().delete_many({"updatedAt": {"$lt": started}})
+        state.mark_built(FINDINGS)
+        return total
+
+    def apply_change(self, change):
+        """Keep the findings in step with one change stream event."""
+        report_id = change["documentKey"]["_id"]
+        if change["operationType"] == "delete":
+            self.remove_report(report_id)
+        elif change.get("fullDocument"):
+            self.sync_report(change["fullDocument"])
+
+    def _build_query(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+    ):
+        query = {}
+        if namespace:
+            query["namespace"] = namespace
+        if cluster:
+            query["cluster"] = cluster
+        if severity:
+            query["severity"] = severity
+        if fixed is not None:
+            query["fixed"] = fixed
+        if min_score is not None:
+            query["score"] = {"$gte": min_score}
+        if resource:
+            query["resource"] = resource
+        return query
+
+    def _page_queries(self, query, cursor: str = None):
+        """Queries a page is read from, in order, with the matches each skips.
+
+        A cursor is a report ``_uid`` and the number of its matching findings
+        already returned, as for the report-based pages: the rest of that
+        report comes first, then the reports after it.
+        """
+        after = _decode_cursor(cursor) if cursor else None
+        if not after:
+            return after, [(query, 0)]
+        uid, index = after
+        return after, [
+            ({**query, "report_uid": uid}, index),
+            ({**query, "report_uid": {"$gt": uid}}, 0),
+        ]
+
+    def _projection(self, fields: tuple = None):
+        if not fields:
+            return PROJECTION
+        # ``uid`` is always set, as on the report-based pages
+        return {"_id": 0, "report_uid": 1, "uid": 1, **{field: 1 for field in fields}}
+
+    def _format_page(self, documents, after, limit: int):
+        """A page from up to ``limit + 1`` findings in page order."""
+        items = [Vulnerability(**document) for document in documents[:limit]]
+        if len(documents) <= limit:
+            return VulnerabilityPage(items=items)
+
+        uid = documents[limit]["report_uid"]
+        index = sum(
+            1 for document in documents[:limit] if document["report_uid"] == uid
+        )
+        if after and after[0] == uid:
+            index += after[1]
+        return VulnerabilityPage(items=items, next_cursor=_encode_cursor(uid, index))
+
+    def get_flattened_page(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+        limit: int = 1000,
+        cursor: str = None,
+        fields: tuple = None,
+    ):
+        query = self._build_query(
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
+        )
+        after, queries = self._page_queries(query, cursor)
+        documents = []
+        for page_query, skip in queries:
+            remaining = limit + 1 - len(documents)
+            if remaining <= 0:
+                break
+            documents.extend(
+                self.get_collection()
+                .find(page_query, self._projection(fields))
+                .sort(PAGE_SORT)
+                .skip(skip)
+                .limit(remaining)
+            )
+        return self._format_page(documents, after, limit)
+
+    def get_affected(
+        self, vulnerability_id: str, namespace: str = None, cluster: str = None
+    ):
+        query = self._build_query(namespace=namespace, cluster=cluster)
+        query["vulnerabilityID"] = vulnerability_id
+        documents = self.get_collection().find(query, PROJECTION).sort(PAGE_SORT)
+        return [Vulnerability(**document) for document in documents]
+
+
+class AsyncFindingClient(AsyncDatabaseClient, FindingClient):
+    async def sync_report(self, report, updated_at: datetime = None):
+        collection = self.get_collection()
+        upserts, leftovers = self._writes(report, updated_at)
+        if upserts:
+            await collection.bulk_write(upserts, ordered=False)
+        await collection.delete_many(leftovers)
+        return len(upserts)
+
+    async def remove_report(self, report_id):
+        result = await self.get_collection().delete_many({"report_id": report_id})
+        return result.deleted_count
+
+    async def apply_change(self, change):
+        report_id = change["documentKey"]["_id"]
+        if change["operationType"] == "delete":
+            await self.remove_report(report_id)
+        elif change.get("fullDocument"):
+            await self.sync_report(change["fullDocument"])
+
+    @coalesced("vulnerabilityreports")
+    async def get_flattened_page(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+        limit: int = 1000,
+        cursor: str = None,
+        fields: tuple = None,
+    ):
+        query = self._build_query(
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
+        )
+        after, queries = self._page_queries(query, cursor)
+        documents = []
+        for page_query, skip in queries:
+            remaining = limit + 1 - len(documents)
+            if remaining <= 0:
+                break
+            found = (
+                self.get_collection()
+                .find(page_query, self._projection(fields))
+                .sort(PAGE_SORT)
+                .skip(skip)
+                .limit(remaining)
+            )
+            documents.extend(await found.to_list())
+        return self._format_page(documents, after, limit)
+
+    @cached("vulnerabilityreports")
+    async def get_affected(
+        self, vulnerability_id: str, namespace: str = None, cluster: str = None
+    ):
+        query = self._build_query(namespace=namespace, cluster=cluster)
+        query["vulnerabilityID"] = vulnerability_id
+        documents = self.get_collection().find(query, PROJECTION).sort(PAGE_SORT)
+        return [Vulnerability(**document) async for document in documents]
@@ -0,0 +1,148 @@
+from app.core.cache import cached
+from app.core.databaseClient import AsyncDatabaseClient
+from app.core.vulnerabilityClient import SEVERITIES, VulnerabilityClient
+from app.models.image import Image, ImageVulnerabilities
+
+
+class ImageClient(VulnerabilityClient):
+
+    """Vulnerability reports grouped per image instead of per container.
+
+    Trivy writes one report per workload container, so an image running in
+    many pods repeats the same findings; here they are returned once per
+    image together with the pods that run it.
+    """
+
+    def _image_query(
+        self,
+        repository: str = None,
+        tag: str = None,
+        digest: str = None,
+        namespace: str = None,
+        cluster: str = None,
+    ):
+        query = self._build_query(namespace=namespace, cluster=cluster)
+        if repository:
+            query["data.report.artifact.repository"] = repository
+        if tag:
+            query["data.report.artifact.tag"] = tag
+        if digest:
+            query["data.report.artifact.digest"] = digest
+        return query
+
+    def _images_pipeline(self, query, with_vulnerabilities: bool = False):
+        """Group reports by image; findings are counted once per image."""
+        counts = {
+            severity: {
+                "$size": {
+                    "$filter": {
+                        "input": "$vulnerabilities",
+                        "cond": {"$eq": ["$$this.severity", severity]},
+                    }
+                }
+            }
+            for severity in SEVERITIES
+        }
+        project = {"pods": 1, "total": {"$size": "$vulnerabilities"}, **counts}
+        if with_vulnerabilities:
+            project["vulnerabilities"] = 1
+
+        return [
+            {"$match": query},
+            {
+                "$group": {
+                    "_id": {
+                        "repository": "$data.report.artifact.repository",
+                        "tag": "$data.report.artifact.tag",
+                        "digest": "$data.report.artifact.digest",
+                    },
+                    "pods": {
+                        "$addToSet": {
+                            "cluster": "$_cluster",
+                            "namespace": "$_namespace",
+                            "pod_id": "$data.metadata.uid",
+                        }
+                    },
+                    # Reports of the same image carry the same findings
+                    "vulnerabilities": {
+                        "$first": {"$ifNull": ["$data.report.vulnerabilities", []]}
+                    },
+                }
+            },
+            {"$project": project},
+            {"$sort": {"_id.repository": 1, "_id.tag": 1, "_id.digest": 1}},
+        ]
+
+    def _format_image(self, group, with_vulnerabilities: bool = False):
+        image = {
+            key: group["_id"].get(key) or "" for key in ("repository", "tag", "digest")
+        }
+        pods = sorted(
+            (
+                {
+                    key: str(pod.get(key) or "")
+                    for key in ("cluster", "namespace", "pod_id")
+                }
+                for pod in group.get("pods", [])
+            ),
+            key=lambda pod: (pod["cluster"], pod["namespace"], pod["pod_id"]),
+        )
+        severity_counts = {
+            "total": group.get("total", 0),
+            **{severity: group.get(severity, 0) for severity in SEVERITIES},
+        }
+        if not with_vulnerabilities:
+            return Image(**image, pods=pods, severity_counts=severity_counts)
+
+        report = {
+            "data": {
+                "report": {
+                    "artifact": {"repository": image["repository"]},
+                    "vulnerabilities": group.get("vulnerabilities", []),
+                }
+            }
+        }
+        return ImageVulnerabilities(
+            **image,
+            pods=pods,
+            severity_counts=severity_counts,
+            vulnerabilities=self._format_flatten(report),
+        )
+
+    def get_images(self, namespace: str = None, cluster: str = None):
+        pipeline = self._images_pipeline(
+            self._image_query(namespace=namespace, cluster=cluster)
+        )
+        return [
+            self._format_image(group)
+            for group in self.get_collection().aggregate(pipeline)
+        ]
+
+    def get_image(self, repository: str, tag: str = None, digest: str = None):
+        """Findings of one image, or None; the first match wins if ambiguous."""
+        query = self._image_query(repository=repository, tag=tag, digest=digest)
+        pipeline = self._images_pipeline(query, with_vulnerabilities=True)
+        pipeline.append({"$limit": 1})
+        for group in self.get_collection().aggregate(pipeline):
+            return self._format_image(group, with_vulnerabilities=True)
+        return None
+
+
+class AsyncImageClient(AsyncDatabaseClient, ImageClient):
+    @cached("vulnerabilityreports")
+    async def get_images(self, namespace: str = None, cluster: str = None):
+        pipeline = self._images_pipeline(
+            self._image_query(namespace=namespace, cluster=cluster)
+        )
+        cursor = await self.get_collection().aggregate(pipeline)
+        return [self._format_image(group) for group in await cursor.to_list()]
+
+    async def get_image(self, repository: str, tag: str = None, digest: str = None):
+        query = self._image_query(repository=repository, tag=tag, digest=digest)
+        pipeline = self._images_pipeline(query, with_vulnerabilities=True)
+        pipeline.append({"$limit": 1})
+        cursor = await self.get_collection().aggregate(pipeline)
+        groups = await cursor.to_list()
+        return (
+            self._format_image(groups[0], with_vulnerabilities=True) if groups else None
+        )
@@ -0,0 +1,90 @@
+"""Index registry for the MongoDB collections used by the clients.
+
+Every client declares the indexes its queries rely on in ``INDEXES``; the
+helpers below create them and report which ones are missing or never used.
+"""
+
+import pymongo
+from pymongo.errors import ConnectionFailure, PyMongoError
+
+from app.core.exposedsecretClient import ExposedsecretClient
+from app.core.findingClient import FindingClient, findings_enabled
+from app.core.namespaceClient import NamespaceClient
+from app.core.podClient import PodClient
+from app.core.sbomClient import SbomClient
+from app.core.userClient import UserClient
+from app.core.vulnerabilityClient import VulnerabilityClient
+from app.core.vulnerabilityHashClient import VulnerabilityHashClient
+from app.core.vulnerabilitySummaryClient import VulnerabilitySummaryClient
+
+INDEXED_CLIENTS = (
+    ExposedsecretClient,
+    NamespaceClient,
+    PodClient,
+    SbomClient,
+    UserClient,
+    VulnerabilityClient,
+    VulnerabilityHashClient,
+    VulnerabilitySummaryClient,
+)
+
+
+def indexed_clients() -> tuple:
+    """The clients whose collections are in use, optional ones included."""
+    if findings_enabled():
+        return (*INDEXED_CLIENTS, FindingClient)
+    return INDEXED_CLIENTS
+
+
+def declared_index_names(client_cls) -> list[str]:
+    return [model.document["name"] for model in client_cls.INDEXES]
+
+
+def ensure_indexes(clients=None, timeout: float = None) -> dict:
+    """Create the declared indexes, collection by collection.
+
+    Creating an index that already exists is a no-op, so this is safe to run on
+    every startup. A failure (e.g. duplicates under a unique index) is recorded
+    for that collection and does not stop the others; an unreachable server
+    raises ``ConnectionFailure``, after at most ``timeout`` seconds overall
+    when one is given.
+    """
+    results = {}
+    with pymongo.timeout(timeout):
+        for client_cls in clients or indexed_clients():
+            collection = client_cls().get_collection()
+            try:
+                created = collection.create_indexes(client_cls.INDEXES)
+                results[collection.name] = {"indexes": created}
+            except ConnectionFailure:
+                raise
+            except PyMongoError as e:
+                results[collection.name] = {"error": str(e)}
+    return results
+
+
+def index_report(clients=None) -> dict:
+    """Declared indexes that are missing and existing indexes that are unused.
+
+    Usage comes from ``$indexStats``, whose counters reset when mongod
+    restarts, so an "unused" index has not been used since then.
+    """
+    report = {}
+    for client_cls in clients or indexed_clients():
+        collection = client_cls().get_collection()
+        existing = {index["name"] for index in collection.list_indexes()}
+        usage = {
+            stats["name"]: stats["accesses"]["ops"]
+            for stats in collection.aggregate([{"$indexStats": {}}])
+        }
+        report[collection.name] = {
+            "missing": [
+                name
+                for name in declared_index_names(client_cls)
+                if name not in existing
+            ],
+            "unused": sorted(
+                name for name, ops in usage.items() if ops == 0 and name != "_id_"
+            ),
+        }
+    return report
@@ -0,0 +1,345 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+from contextlib import suppress
+
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import PyMongoError
+
+from app.core.databaseClient import AsyncDatabaseClient, DatabaseClient
+
+TRIVY_GROUP = "aquasecurity.github.io"
+
+Resource = namedtuple("Resource", "group version plural document key cluster")
+
+
+class InvalidObjectError(ValueError):
+    pass
+
+
+def report_digest(report, cluster: str, namespace: str) -> str:
+    """Digest of a report's content and of where it is filed.
+
+    ``updateTimestamp`` changes with every rescan, also when the findings
+    do not, so it is left out.
+    """
+    content = {key: value for key, value in report.items() if key != "updateTimestamp"}
+    raw = json.dumps(
+        [cluster, namespace, content],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def report_document(body, cluster: str):
+    """Trivy-operator reports are stored whole under ``data``."""
+    metadata = body.get("metadata", {})
+    namespace = metadata.get("namespace", "")
+    return {
+        "_uid": metadata.get("uid", ""),
+        "_cluster": cluster,
+        "_namespace": namespace,
+        "_digest": report_digest(body.get("report") or {}, cluster, namespace),
+        "data": body,
+    }
+
+
+def namespace_document(body, cluster: str):
+    metadata = body.get("metadata", {})
+    return {
+        "_uid": metadata.get("uid", ""),
+        "_cluster": cluster,
+        "_name": metadata.get("name", ""),
+        "data": body,
+    }
+
+
+def pod_document(body, cluster: str):
+    """Pods are stored flat, with the kind of their owning workload."""
+    metadata = body.get("metadata", {})
+    owners = metadata.get("ownerReferences") or []
+    return {
+        "name": metadata.get("name", ""),
+        "namespace": metadata.get("namespace", ""),
+        "kind": owners[0].get("kind", "") if owners else body.get("kind", "Pod"),
+        "cluster": cluster,
+    }
+
+
+DIGEST_PROJECTION = {"_id": 0, "_uid": 1, "_digest": 1}
+
+# Ingested resources, keyed by the collection their documents are written to;
+# ``key`` are the document fields an upsert or deletion matches on and
+# ``cluster`` the field holding the cluster name.
+RESOURCES = {
+    "vulnerabilityreports": Resource(
+        TRIVY_GROUP,
+        "v1alpha1",
+        "vulnerabilityreports",
+        report_document,
+        ("_uid",),
+        "_cluster",
+    ),
+    "sbomreports": Resource(
+        TRIVY_GROUP, "v1alpha1", "sbomreports", report_document, ("_uid",), "_cluster"
+    ),
+    "exposedsecretreports": Resource(
+        TRIVY_GROUP,
+        "v1alpha1",
+        "exposedsecretreports",
+        report_document,
+        ("_uid",),
+        "_cluster",
+    ),
+    "pods": Resource(
+        "", "v1", "pods", pod_document, ("cluster", "namespace", "name"), "cluster"
+    ),
+    "namespaces": Resource(
+        "", "v1", "namespaces", namespace_document, ("_uid",), "_cluster"
+    ),
+}
+
+
+class IngestionStats:
+
+    """Written, skipped and deleted objects per collection, since start."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, kind: str, written: int = 0, skipped: int = 0, deleted: int = 0):
+        with self._lock:
+            counts = self._counts.setdefault(
+                kind, {"written": 0, "skipped": 0, "deleted": 0}
+            )
+            counts["written"] += written
+            counts["skipped"] += skipped
+            counts["deleted"] += deleted
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {kind: dict(counts) for kind, counts in self._counts.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+ingestion_stats = IngestionStats()
+
+
+class IngestionClient(DatabaseClient):
+
+    """Buffers Kubernetes objects and writes them in batches.
+
+    ``queue`` turns an object into the document shape the read clients
+    expect and keeps only the latest operation per object, so an object
+    that changes several times between flushes is written once. ``flush``
+    sends everything queued as one unordered ``bulk_write`` per collection.
+    Reports whose stored ``_digest`` already matches are skipped, so a
+    rescan with unchanged findings writes nothing and triggers no change
+    stream event. Replacements and deletions are idempotent, so a failed
+    flush puts its operations back (unless newer ones were queued) and the
+    next flush retries them.
+    """
+
+    def __init__(self, cluster: str = None):
+        super().__init__()
+        self.cluster = cluster or os.getenv("CLUSTER_NAME", "default")
+        self._pending = {}
+
+    def get_collection(self, kind: str):
+        return self.client[os.getenv("MONGODB_DB", "shield")][kind]
+
+    def _document(self, kind: str, body):
+        """The document of ``body`` and the key it is matched on."""
+        resource = RESOURCES[kind]
+        if not isinstance(body, dict):
+            raise InvalidObjectError(f"Expected an object, got {type(body).__name__}")
+        document = resource.document(body, self.cluster)
+        key = {field: document[field] for field in resource.key}
+        missing = [field for field, value in key.items() if not value]
+        if missing:
+            raise InvalidObjectError(f"Missing {', '.join(missing)}")
+        return document, key
+
+    def queue(self, kind: str, body, deleted: bool = False):
+        """Queue the upsert, or with ``deleted`` the removal, of ``body``.
+
+        Raises ``InvalidObjectError`` for objects without the metadata that
+        identifies them, which would otherwise all overwrite one document.
+        """
+        document, key = self._document(kind, body)
+        queued = (key, None if deleted else document)
+        self._pending.setdefault(kind, {})[tuple(key.values())] = queued
+
+    def _stored_query(self, kind: str):
+        resource = RESOURCES[kind]
+        projection = {"_id": 0, **{field: 1 for field in resource.key}}
+        return {resource.cluster: self.cluster}, projection
+
+    def stored_keys(self, kind: str):
+        """Keys of the documents stored for this cluster."""
+        query, projection = self._stored_query(kind)
+        fields = RESOURCES[kind].key
+        return {
+            tuple(document.get(field) for field in fields)
+            for document in self.get_collection(kind).find(query, projection)
+        }
+
+    def reconcile(self, kind: str, stored, listed) -> int:
+        """Queue the removal of stored objects the cluster no longer lists.
+
+        Catches deletions made while no events were received. ``stored``
+        comes from ``stored_keys`` and must be read before the objects are
+        listed, so objects created in between are not removed. Operations
+        queued meanwhile are newer and win. Returns the number of removals.
+        """
+        fields = RESOURCES[kind].key
+        current = set()
+        for body in listed:
+            with suppress(InvalidObjectError):
+                current.add(tuple(self._document(kind, body)[1].values()))
+
+        queued = self._pending.setdefault(kind, {})
+        removed = 0
+        for key in stored - current:
+            if key not in queued:
+                queued[key] = (dict(zip(fields, key, strict=True)), None)
+                removed += 1
+        return removed
+
+    def pending(self) -> int:
+        """Number of objects waiting for the next flush."""
+        return sum(len(operations) for operations in self._pending.values())
+
+    def _take(self):
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def _requeue(self, pending):
+        for kind, operations in pending.items():
+            queued = self._pending.setdefault(kind, {})
+            for key, operation in operations.items():
+                queued.setdefault(key, operation)
+
+    def _digest_query(self, queued):
+        """Query for the stored digests of the queued reports, or None."""
+        uids = [
+            document["_uid"]
+            for _, document in queued.values()
+            if document is not None and "_digest" in document
+        ]
+        return {"_uid": {"$in": uids}} if uids else None
+
+    def _stored_digests(self, kind: str, queued):
+        query = self._digest_query(queued)
+        if query is None:
+            return {}
+        documents = self.get_collection(kind).find(query, DIGEST_PROJECTION)
+        return {document["_uid"]: document.get("_digest") for document in documents}
+
+    def _operations(self, queued, stored):
+        """Bulk operations for ``queued``, leaving out unchanged reports."""
+        operations, counts = [], {"written": 0, "skipped": 0, "deleted": 0}
+        for key, document in queued.values():
+            if document is None:
+                operations.append(DeleteOne(key))
+                counts["deleted"] += 1
+            elif "_digest" in document and (
+                stored.get(document["_uid"]) == document["_digest"]
+            ):
+                counts["skipped"] += 1
+            else:
+                operations.append(ReplaceOne(key, document, upsert=True))
+                counts["written"] += 1
+        return operations, counts
+
+    def flush(self):
+        """Write the queued operations; returns the counts per collection."""
+        pending = self._take()
+        results = {}
+        try:
+            for kind in list(pending):
+                stored = self._stored_digests(kind, pending[kind])
+                operations, counts = self._operations(pending[kind], stored)
+                if operations:
+                    self.get_collection(kind).bulk_write(operations, ordered=False)
+                del pending[kind]
+                ingestion_stats.record(kind, **counts)
+                results[kind] = counts
+        except PyMongoError:
+            self._requeue(pending)
+            raise
+        return results
+
+
+class AsyncIngestionClient(AsyncDatabaseClient, IngestionClient):
+    def __init__(self, cluster: str = None):
+        super().__init__()
+        self.cluster = cluster or os.getenv("CLUSTER_NAME", "default")
+        self._pending = {}
+        # One flush at a time, so an older write never lands after a newer one
+        self._flushing = asyncio.Lock()
+
+    async def stored_keys(self, kind: str):
+        query, projection = self._stored_query(kind)
+        fields = RESOURCES[kind].key
+        return {
+            tuple(document.get(field) for field in fields)
+            async for document in self.get_collection(kind).find(query, projection)
+        }
+
+    async def _stored_digests(self, kind: str, queued):
+        query = self._digest_query(queued)
+        if query is None:
+            return {}
+        return {
+            document["_uid"]: document.get("_digest")
+            async for document in self.get_collection(kind).find(
+                query, DIGEST_PROJECTION
+            )
+        }
+
+    async def flush(self):
+        async with self._flushing:
+            pending = self._take()
+            results = {}
+            try:
+                for kind in list(pending):
+                    stored = await self._stored_digests(kind, pending[kind])
+                    operations, counts = self._operations(pending[kind], stored)
+                    if operations:
+                        await self.get_collection(kind).bulk_write(
+                            operations, ordered=False
+                        )
+                    del pending[kind]
+                    ingestion_stats.record(kind, **counts)
+                    results[kind] = counts
+            except PyMongoError:
+                self._requeue(pending)
+                raise
+            return results
+
+    async def run(self, interval: float = None):
+        """Flush every ``interval`` seconds until cancelled."""
+        interval = interval or float(os.getenv("INGESTION_FLUSH_INTERVAL", "2"))
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self.flush()
+                except PyMongoError as e:
+                    print(f"Warning: could not write ingested objects: {e}")
+        finally:
+            # Write what is left on shutdown
+            try:
+                await self.flush()
+            except PyMongoError as e:
+                print(f"Warning: dropped {self.pending()} ingested objects: {e}")
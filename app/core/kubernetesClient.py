@@ -0,0 +1,93 @@
+import base64
+import ssl
+import tempfile
+
+import aiohttp
+
+# Only metadata identifies an object, so skip the rest of every item
+METADATA_ONLY = (
+    "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,"
+    "application/json"
+)
+
+
+def _pem(data) -> bytes:
+    """PEM from a kubeconfig ``*-data`` field, which may still be base64."""
+    data = data.encode() if isinstance(data, str) else data
+    return data if data.lstrip().startswith(b"-----") else base64.b64decode(data)
+
+
+class KubernetesClient:
+
+    """Lists objects from the Kubernetes API.
+
+    Takes the connection of a ``kopf.ConnectionInfo``, so it talks to the
+    cluster the operator watches with the same credentials. Lists are read
+    in pages of ``page_size`` objects and carry only their metadata.
+    """
+
+    def __init__(self, connection, page_size: int = 500):
+        self.connection = connection
+        self.page_size = page_size
+
+    def _ssl(self):
+        connection = self.connection
+        if not connection.server.startswith("https") or connection.insecure:
+            # Plain http, or TLS without verification
+            return False
+        context = ssl.create_default_context(cafile=connection.ca_path)
+        if connection.ca_data:
+            context.load_verify_locations(cadata=_pem(connection.ca_data).decode())
+        if connection.certificate_path or connection.certificate_data:
+            # load_cert_chain only reads files, so inline credentials are written
+            # to temporary ones for the duration of the call
+            with (
+                tempfile.NamedTemporaryFile() as certificate,
+                tempfile.NamedTemporaryFile() as key,
+            ):
+                if connection.certificate_data:
+                    certificate.write(_pem(connection.certificate_data))
+                    certificate.flush()
+                if connection.private_key_data:
+                    key.write(_pem(connection.private_key_data))
+                    key.flush()
+                context.load_cert_chain(
+                    connection.certificate_path or certificate.name,
+                    connection.private_key_path or key.name,
+                )
+        return context
+
+    def _headers(self):
+        headers = {"Accept": METADATA_ONLY}
+        if self.connection.token:
+            scheme = self.connection.scheme or "Bearer"
+            headers["Authorization"] = f"{scheme} {self.connection.token}"
+        return headers
+
+    @staticmethod
+    def path(resource) -> str:
+        """The list path of ``resource``, e.g. ``/api/v1/pods``."""
+        if resource.group:
+            return f"/apis/{resource.group}/{resource.version}/{resource.plural}"
+        return f"/api/{resource.version}/{resource.plural}"
+
+    async def list(self, resource):
+        """Every object of ``resource``, across all namespaces."""
+        auth = None
+        if self.connection.username and not self.connection.token:
+            auth = aiohttp.BasicAuth(
+                self.connection.username, self.connection.password or ""
+            )
+        url = self.connection.server.rstrip("/") + self.path(resource)
+        items, params = [], {"limit": str(self.page_size)}
+        context = self._ssl()
+        async with aiohttp.ClientSession(headers=self._headers(), auth=auth) as session:
+            while True:
+                async with session.get(url, params=params, ssl=context) as response:
+                    response.raise_for_status()
+                    page = await response.json()
+                items.extend(page.get("items") or [])
+                token = (page.get("metadata") or {}).get("continue")
+                if not token:
+                    return items
+                params["continue"] = token
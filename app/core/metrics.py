@@ -0,0 +1,162 @@
+import os
+import threading
+from collections import OrderedDict
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from pymongo import monitoring
+
+# Seconds; the Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Bytes, 256 B to 16 MiB
+SIZE_BUCKETS = tuple(256 * 4**power for power in range(9))
+# Seconds; most commands answer well within a millisecond or two
+COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 5)
+
+
+def _collection(event) -> str:
+    """The collection a command runs against, "" for database commands."""
+    command = event.command
+    if event.command_name == "getMore":
+        return command.get("collection", "")
+    target = command.get(event.command_name)
+    return target if isinstance(target, str) else ""
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+
+    """Times every MongoDB command per collection and command name.
+
+    Only started events carry the command, so its collection is held by
+    request id until the command succeeds or fails. A command whose outcome
+    is never reported is dropped, oldest first, once ``max_pending`` are held.
+    """
+
+    # Handshakes and heartbeats, not queries
+    IGNORED = frozenset({"hello", "ismaster", "isMaster", "ping", "endSessions"})
+
+    def __init__(
+        self, duration: Histogram, failures: Counter, max_pending: int = 10000
+    ):
+        self.duration = duration
+        self.failures = failures
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._started = OrderedDict()
+
+    def _key(self, event):
+        return event.connection_id, event.request_id
+
+    def started(self, event):
+        if event.command_name in self.IGNORED:
+            return
+        with self._lock:
+            self._started[self._key(event)] = _collection(event)
+            while len(self._started) > self.max_pending:
+                self._started.popitem(last=False)
+
+    def _finished(self, event):
+        with self._lock:
+            collection = self._started.pop(self._key(event), None)
+        if collection is None:
+            return None
+        labels = {"collection": collection, "command": event.command_name}
+        self.duration.labels(**labels).observe(event.duration_micros / 1e6)
+        return labels
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        labels = self._finished(event)
+        if labels is not None:
+            self.failures.labels(**labels).inc()
+
+
+class ThreadpoolCollector(Collector):
+
+    """Busy and total worker threads running sync endpoints and dependencies.
+
+    Read from the AnyIO default limiter at scrape time, so it reports the
+    process answering the scrape.
+    """
+
+    def _family(self):
+        return GaugeMetricFamily(
+            "threadpool_threads",
+            "Worker threads running sync endpoints and dependencies, busy and in total.",
+            labels=["state"],
+        )
+
+    def describe(self):
+        # Registration must not read the limiter outside an event loop
+        yield self._family()
+
+    def collect(self):
+        # Imported here so the registry itself does not need an event loop library
+        from anyio import to_thread
+
+        limiter = to_thread.current_default_thread_limiter()
+        family = self._family()
+        family.add_metric(["busy"], limiter.borrowed_tokens)
+        family.add_metric(["capacity"], limiter.total_tokens)
+        yield family
+
+
+registry = CollectorRegistry()
+registry.register(ThreadpoolCollector())
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time to the end of the response body, per route template.",
+    ("method", "route", "status"),
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "Requests being handled, per route template.",
+    ("method", "route"),
+    registry=registry,
+    multiprocess_mode="livesum",
+)
+http_response_size = Histogram(
+    "http_response_size_bytes",
+    "Response body bytes as sent, after compression.",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS,
+    registry=registry,
+)
+mongodb_command_duration = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command round trips, per collection and command.",
+    ("collection", "command"),
+    buckets=COMMAND_BUCKETS,
+    registry=registry,
+)
+mongodb_command_failures = Counter(
+    "mongodb_command_failures",
+    "MongoDB commands that returned an error.",
+    ("collection", "command"),
+    registry=registry,
+)
+
+mongo_command_metrics = MongoCommandMetrics(
+    mongodb_command_duration, mongodb_command_failures
+)
+
+
+def exposed_registry() -> CollectorRegistry:
+    """The registry ``/metrics`` renders.
+
+    With several worker processes, ``PROMETHEUS_MULTIPROC_DIR`` names a
+    directory, empty at startup, the workers write their values to; the
+    values of every worker are then merged at scrape time.
+    """
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return registry
+    merged = CollectorRegistry()
+    multiprocess.MultiProcessCollector(merged)
+    merged.register(ThreadpoolCollector())
+    return merged
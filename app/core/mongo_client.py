@@ -3,6 +3,8 @@ import os
 from dotenv import load_dotenv
 from pymongo import MongoClient
 
+from app.core.databaseClient import connection_manager
+
 load_dotenv()
 
 
@@ -11,7 +13,12 @@ class MongoDBClient:
         self.uri = uri or os.getenv("MONGODB_URI", "mongodb://localhost:27017")
 
         self.db_name = db_name or os.getenv("MONGODB_DB", "shield")
-        self.client = MongoClient(self.uri)
+        # Only a caller-supplied URI gets a dedicated client, everything else
+        # reuses the application-wide pool.
+        self._owns_client = uri is not None
+        self.client = (
+            MongoClient(self.uri) if self._owns_client else connection_manager.client
+        )
         self.db = self.client[self.db_name]
 
     def get_collection(self, collection_name):
@@ -21,4 +28,5 @@ class MongoDBClient:
         return self.client
 
     def close(self):
-        self.client.close()
+        if self._owns_client:
+            self.client.close()
@@ -1,10 +1,18 @@
 import os
 
-from app.core.databaseClient import DatabaseClient
+from pymongo import ASCENDING, IndexModel
+
+from app.core.cache import cached
+from app.core.databaseClient import AsyncDatabaseClient, DatabaseClient
 from app.models.namespace import Namespace
 
 
 class NamespaceClient(DatabaseClient):
+    INDEXES = [
+        IndexModel([("_cluster", ASCENDING), ("_name", ASCENDING)]),
+        IndexModel([("_uid", ASCENDING)], unique=True),
+    ]
+
     def __init__(self):
         super().__init__()
 
@@ -29,3 +37,17 @@ class NamespaceClient(DatabaseClient):
             name=item.get("_name", ""),
             uid=item.get("_uid", ""),
         )
+
+
+class AsyncNamespaceClient(AsyncDatabaseClient, NamespaceClient):
+    @cached("namespaces", ttl=300)
+    async def get_all(self, cluster: str = None):
+        query = {}
+        if cluster:
+            query["_cluster"] = cluster
+
+        formatted_items = [
+            self._format_to_namespace(item)
+            async for item in self.get_collection().find(query, {"_id": 0})
+        ]
+        return [item for item in formatted_items if item is not None]
@@ -1,6 +1,13 @@
 import os
 
-from app.core.databaseClient import DatabaseClient
+from app.core.databaseClient import AsyncDatabaseClient, DatabaseClient
+from app.core.derivedStateClient import HASHES
+from app.core.versions import collection_versions
+from app.core.vulnerabilityHashClient import (
+    AsyncVulnerabilityHashClient,
+    VulnerabilityHashClient,
+    finding_hash,
+)
 from app.models.old_vulnerability import Vulnerability
 
 
@@ -11,6 +18,9 @@ class VulnerabilityClient(DatabaseClient):
     def get_collection(self):
         return self.client[os.getenv("MONGODB_DB", "shield")]["vulnerabilityreports"]
 
+    def get_hash_client(self):
+        return VulnerabilityHashClient()
+
     def get_all(self, namespace: str = None, cluster: str = None, severity: str = None):
         query = {}
         if namespace:
@@ -34,20 +44,56 @@ class VulnerabilityClient(DatabaseClient):
 
         return all_vulnerabilities
 
-    def get_by_hash(self, hash: str):
-        # Since hash is now generated from vulnerability data, we need to find the document
-        # and then search through its vulnerabilities
-        items = self.get_collection().find({}, {"_id": 0})
+    def _finding_projection(self, index: int):
+        """Report metadata plus only the finding at ``index``."""
+        return {
+            "_id": 0,
+            "_cluster": 1,
+            "_namespace": 1,
+            "data.metadata.uid": 1,
+            "data.report.artifact.repository": 1,
+            "data.report.vulnerabilities": {"$slice": [index, 1]},
+        }
+
+    def _match_hash(self, item, hash: str):
+        for vuln in self._format_to_vulnerability(item) or []:
+            if vuln.hash == hash:
+                return vuln
+        return None
 
-        for item in items:
-            vulnerabilities = self._format_to_vulnerability(item)
-            if isinstance(vulnerabilities, list):
-                for vuln in vulnerabilities:
-                    if vuln.hash == hash:
-                        return vuln
+    def _report_ids(self, entries):
+        return list(dict.fromkeys(entry["report_id"] for entry in entries))
 
+    def _scan(self, items, hash: str):
+        for item in items:
+            vuln = self._match_hash(item, hash)
+            if vuln is not None:
+                return vuln
         return None
 
+    def get_by_hash(self, hash: str):
+        """The finding with ``hash``, from the first report that still has it.
+
+        The hash lookup is used once it was completely rebuilt and while the
+        watcher keeps it in step; until then every report is scanned.
+        """
+        if not collection_versions.current(HASHES):
+            return self._scan(self.get_collection().find({}, {"_id": 0}), hash)
+        entries = self.get_hash_client().find_all(hash)
+        for entry in entries:
+            item = self.get_collection().find_one(
+                {"_id": entry["report_id"]}, self._finding_projection(entry["index"])
+            )
+            vuln = self._match_hash(item, hash)
+            if vuln is not None:
+                return vuln
+        if not entries:
+            return None
+
+        # The reports changed since they were hashed, look through all of them
+        query = {"_id": {"$in": self._report_ids(entries)}}
+        return self._scan(self.get_collection().find(query, {"_id": 0}), hash)
+
     def _format_to_vulnerability(self, item):
         if item is None:
             return None
@@ -76,12 +122,9 @@ class VulnerabilityClient(DatabaseClient):
 
         for vuln in vulnerabilities:
             # Create a hash for this specific vulnerability
-            import hashlib
-
-            hash_string = (
-                f"{vuln.get('vulnerabilityID', '')}-{pod_id}-{vuln.get('resource', '')}"
+            vuln_hash = finding_hash(
+                vuln.get("vulnerabilityID", ""), pod_id, vuln.get("resource", "")
             )
-            vuln_hash = hashlib.md5(hash_string.encode()).hexdigest()
 
             vulnerability_data = {
                 "fixedVersion": vuln.get("fixedVersion", ""),
@@ -110,3 +153,49 @@ class VulnerabilityClient(DatabaseClient):
                 continue
 
         return vulnerability_objects
+
+
+class AsyncVulnerabilityClient(AsyncDatabaseClient, VulnerabilityClient):
+    async def get_all(
+        self, namespace: str = None, cluster: str = None, severity: str = None
+    ):
+        query = {}
+        if namespace:
+            query["_namespace"] = namespace
+        if cluster:
+            query["_cluster"] = cluster
+        if severity:
+            query["data.report.vulnerabilities.severity"] = severity
+
+        all_vulnerabilities = []
+        async for item in self.get_collection().find(query, {"_id": 0}):
+            all_vulnerabilities.extend(self._format_to_vulnerability(item) or [])
+
+        return all_vulnerabilities
+
+    def get_hash_client(self):
+        return AsyncVulnerabilityHashClient()
+
+    async def _scan(self, items, hash: str):
+        async for item in items:
+            vuln = self._match_hash(item, hash)
+            if vuln is not None:
+                return vuln
+        return None
+
+    async def get_by_hash(self, hash: str):
+        if not collection_versions.current(HASHES):
+            return await self._scan(self.get_collection().find({}, {"_id": 0}), hash)
+        entries = await self.get_hash_client().find_all(hash)
+        for entry in entries:
+            item = await self.get_collection().find_one(
+                {"_id": entry["report_id"]}, self._finding_projection(entry["index"])
+            )
+            vuln = self._match_hash(item, hash)
+            if vuln is not None:
+                return vuln
+        if not entries:
+            return None
+
+        query = {"_id": {"$in": self._report_ids(entries)}}
+        return await self._scan(self.get_collection().find(query, {"_id": 0}), hash)
@@ -1,24 +1,40 @@
 import os
 
-from app.core.databaseClient import DatabaseClient
+from pymongo import ASCENDING, IndexModel
+
+from app.core.cache import cached
+from app.core.databaseClient import (
+    AsyncDatabaseClient,
+    DatabaseClient,
+    fields_projection,
+)
 from app.models.pod import Pod
 
 
 class PodClient(DatabaseClient):
+    INDEXES = [
+        IndexModel(
+            [("cluster", ASCENDING), ("namespace", ASCENDING), ("name", ASCENDING)]
+        ),
+    ]
+    # Document paths behind each Pod field, for ``fields=`` projections
+    FIELD_PATHS = {field: (field,) for field in Pod.model_fields}
+
     def __init__(self):
         super().__init__()
 
     def get_collection(self):
         return self.client[os.getenv("MONGODB_DB", "shield")]["pods"]
 
-    def get_all(self, namespace: str = None, cluster: str = None):
+    def get_all(self, namespace: str = None, cluster: str = None, fields: tuple = None):
         query = {}
         if namespace:
             query["namespace"] = namespace
         if cluster:
             query["cluster"] = cluster
 
-        items = self.get_collection().find(query, {"_id": 0})
+        projection = fields_projection({"_id": 0}, self.FIELD_PATHS, fields)
+        items = self.get_collection().find(query, projection)
         formatted_items = (self._format_to_pod(item) for item in items)
         return [item for item in formatted_items if item is not None]
 
@@ -40,6 +56,39 @@ class PodClient(DatabaseClient):
         formatted_items = (self._format_to_pod(item) for item in items)
         return [item for item in formatted_items if item is not None]
 
+    def _summary_pipeline(self, namespace: str = None, cluster: str = None):
+        """Count pods and collect distinct namespaces/clusters in one pass."""
+        query = {}
+        if namespace:
+            query["namespace"] = namespace
+        if cluster:
+            query["cluster"] = cluster
+
+        return [
+            {"$match": query},
+            {
+                "$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "namespaces": {"$addToSet": "$namespace"},
+                    "clusters": {"$addToSet": "$cluster"},
+                }
+            },
+        ]
+
+    def _format_summary(self, groups):
+        for group in groups:
+            return {
+                "total": group["total"],
+                "namespaces": group["namespaces"],
+                "clusters": group["clusters"],
+            }
+        return {"total": 0, "namespaces": [], "clusters": []}
+
+    def get_summary(self, namespace: str = None, cluster: str = None):
+        pipeline = self._summary_pipeline(namespace=namespace, cluster=cluster)
+        return self._format_summary(self.get_collection().aggregate(pipeline))
+
     def _format_to_pod(self, item):
         if item is None:
             return None
@@ -49,3 +98,45 @@ class PodClient(DatabaseClient):
             item["_id"] = str(item["_id"])
 
         return Pod(**item)
+
+
+class AsyncPodClient(AsyncDatabaseClient, PodClient):
+    @cached("pods")
+    async def get_all(
+        self, namespace: str = None, cluster: str = None, fields: tuple = None
+    ):
+        query = {}
+        if namespace:
+            query["namespace"] = namespace
+        if cluster:
+            query["cluster"] = cluster
+
+        projection = fields_projection({"_id": 0}, self.FIELD_PATHS, fields)
+        return await self._find(query, projection)
+
+    async def get_by_name(self, cluster: str, namespace: str, name: str):
+        item = await self.get_collection().find_one(
+            {"name": name, "namespace": namespace, "cluster": cluster}, {"_id": 0}
+        )
+        return self._format_to_pod(item)
+
+    async def get_by_namespace(self, cluster: str, namespace: str):
+        return await self._find({"namespace": namespace, "cluster": cluster})
+
+    async def get_by_cluster(self, cluster: str):
+        return await self._find({"cluster": cluster})
+
+    @cached("pods")
+    async def get_summary(self, namespace: str = None, cluster: str = None):
+        pipeline = self._summary_pipeline(namespace=namespace, cluster=cluster)
+        cursor = await self.get_collection().aggregate(pipeline)
+        return self._format_summary(await cursor.to_list())
+
+    async def _find(self, query: dict, projection: dict = None):
+        formatted_items = [
+            self._format_to_pod(item)
+            async for item in self.get_collection().find(
+                query, projection or {"_id": 0}
+            )
+        ]
+        return [item for item in formatted_items if item is not None]
@@ -0,0 +1,293 @@
+import asyncio
+import os
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from contextlib import suppress
+
+from pymongo.errors import PyMongoError
+
+from app.core.versions import collection_versions
+from app.core.vulnerabilityClient import (
+    SEVERITIES,
+    VulnerabilityClient,
+    _decode_cursor,
+    _encode_cursor,
+)
+from app.models.vulnerability import Vulnerability, VulnerabilityPage
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - optional dependency
+    numpy = None
+
+# Dictionary-encoded columns: every field a flattened finding fills in but
+# ``score``, which is kept as floats. ``group_counts`` groups by any of them.
+COLUMNS = tuple(
+    name
+    for name in Vulnerability.model_fields
+    if name not in ("score", "vulnerabilities")
+)
+
+
+def _column(typecode: str, values):
+    if numpy is not None:
+        return numpy.array(
+            values, dtype={"I": numpy.uint32, "d": numpy.float64, "b": bool}[typecode]
+        )
+    return array(typecode, values)
+
+
+class VulnerabilitySnapshot:
+
+    """The flattened findings of all reports, held in memory as columns.
+
+    Rows are the ``Vulnerability`` objects ``_format_flatten`` builds, in the
+    order ``/vulnerabilities/flatten`` pages through them (report ``_uid``,
+    then position in the report). Only columns are kept and a page rebuilds
+    its items from them. Fields other than ``score`` are dictionary encoded
+    with sorted dictionaries, so code order is value order. Filters
+    are computed as NumPy masks when NumPy is installed and with ``array``
+    columns and plain loops otherwise.
+    """
+
+    def __init__(self, rows):
+        values = {name: [] for name in COLUMNS}
+        scores = []
+        for row in rows:
+            for name, column in values.items():
+                value = getattr(row, name)
+                column.append(tuple(value) if isinstance(value, list) else value)
+            scores.append(row.score)
+
+        self.dictionaries = {}
+        self.codes = {}
+        for name, column in values.items():
+            dictionary = sorted(set(column))
+            lookup = {value: code for code, value in enumerate(dictionary)}
+            self.dictionaries[name] = dictionary
+            self.codes[name] = _column("I", [lookup[value] for value in column])
+        self.score = _column("d", scores)
+        self.fixed = _column("b", [bool(value) for value in values["fixedVersion"]])
+
+    @classmethod
+    def load(cls, client: VulnerabilityClient):
+        """Read every report, in ``_uid`` order, through ``client``."""
+        return cls(
+            row
+            for report in client._find_reports({}, [], sort=True)
+            for row in client._format_flatten(report) or []
+        )
+
+    def __len__(self):
+        """Number of findings in the snapshot."""
+        return len(self.score)
+
+    def _row(self, index) -> Vulnerability:
+        fields = {
+            name: self.dictionaries[name][self.codes[name][index]] for name in COLUMNS
+        }
+        fields["links"] = list(fields["links"])
+        return Vulnerability(**fields, score=float(self.score[index]))
+
+    def _code(self, name: str, value: str):
+        dictionary = self.dictionaries[name]
+        position = bisect_left(dictionary, value)
+        if position < len(dictionary) and dictionary[position] == value:
+            return position
+        return None
+
+    def _match(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+    ):
+        """Indices of the rows matching the same filters as the Mongo queries."""
+        equals = {
+            "namespace": namespace,
+            "cluster": cluster,
+            "severity": severity,
+            "resource": resource,
+        }
+        codes = {}
+        for name, value in equals.items():
+            if value:
+                codes[name] = self._code(name, value)
+                if codes[name] is None:
+                    return [] if numpy is None else numpy.array([], dtype=numpy.int64)
+
+        if numpy is not None:
+            mask = numpy.ones(len(self), dtype=bool)
+            for name, code in codes.items():
+                mask &= self.codes[name] == code
+            if fixed is not None:
+                mask &= self.fixed == fixed
+            if min_score is not None:
+                mask &= self.score >= min_score
+            return numpy.flatnonzero(mask)
+
+        indices = range(len(self))
+        for name, code in codes.items():
+            column = self.codes[name]
+            indices = [i for i in indices if column[i] == code]
+        if fixed is not None:
+            indices = [i for i in indices if self.fixed[i] == fixed]
+        if min_score is not None:
+            indices = [i for i in indices if self.score[i] >= min_score]
+        return list(indices)
+
+    def _ranks(self, indices):
+        """Position of each matched row among the matched findings of its report."""
+        uids = self.codes["uid"]
+        if numpy is not None:
+            codes = uids[indices]
+            positions = numpy.arange(len(indices))
+            starts = numpy.ones(len(indices), dtype=bool)
+            starts[1:] = codes[1:] != codes[:-1]
+            first = numpy.maximum.accumulate(numpy.where(starts, positions, 0))
+            return positions - first
+
+        ranks, previous, rank = [], None, 0
+        for i in indices:
+            rank = rank + 1 if uids[i] == previous else 0
+            previous = uids[i]
+            ranks.append(rank)
+        return ranks
+
+    def _start(self, indices, ranks, after):
+        """First matched position at or after the ``(uid, index)`` cursor."""
+        uid, index = after
+        code = bisect_left(self.dictionaries["uid"], uid)
+        exact = self._code("uid", uid) is not None
+        codes = self.codes["uid"]
+
+        if numpy is not None:
+            matched = codes[indices]
+            later = matched > code if exact else matched >= code
+            if exact:
+                later |= (matched == code) & (ranks >= index)
+            positions = numpy.flatnonzero(later)
+            return int(positions[0]) if len(positions) else len(indices)
+
+        for position, i in enumerate(indices):
+            if codes[i] > code or (
+                codes[i] == code and (not exact or ranks[position] >= index)
+            ):
+                return position
+        return len(indices)
+
+    def page(self, limit: int = 1000, cursor: str = None, **filters):
+        """A page of findings with the same cursors as ``get_flattened_page``."""
+        indices = self._match(**filters)
+        ranks = self._ranks(indices)
+        start = self._start(indices, ranks, _decode_cursor(cursor)) if cursor else 0
+
+        end = start + limit
+        items = [self._row(i) for i in indices[start:end]]
+        if end < len(indices):
+            next_uid = self.dictionaries["uid"][self.codes["uid"][indices[end]]]
+            return VulnerabilityPage(
+                items=items, next_cursor=_encode_cursor(next_uid, int(ranks[end]))
+            )
+        return VulnerabilityPage(items=items)
+
+    def _counts(self, name: str, indices):
+        dictionary = self.dictionaries[name]
+        if numpy is not None:
+            counts = numpy.bincount(
+                self.codes[name][indices], minlength=len(dictionary)
+            )
+            return {
+                dictionary[code]: int(count)
+                for code, count in enumerate(counts)
+                if count
+            }
+        column = self.codes[name]
+        return {
+            dictionary[code]: count
+            for code, count in Counter(column[i] for i in indices).items()
+        }
+
+    def severity_counts(self, namespace: str = None, cluster: str = None):
+        """Same shape as ``get_severity_counts``: total plus one key per severity."""
+        indices = self._match(namespace=namespace, cluster=cluster)
+        counts = self._counts("severity", indices)
+        return {
+            "total": len(indices),
+            **{severity: counts.get(severity, 0) for severity in SEVERITIES},
+        }
+
+    def group_counts(self, by: str, **filters):
+        """Findings per value of ``by``, most frequent first."""
+        counts = self._counts(by, self._match(**filters))
+        groups = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return [{"value": value, "count": count} for value, count in groups]
+
+
+class SnapshotManager:
+
+    """Keeps the process-wide snapshot fresh.
+
+    The snapshot is rebuilt every ``VULNERABILITY_SNAPSHOT_REFRESH`` seconds
+    and shortly after a report changes. Changes are only seen while the
+    change stream watcher runs, so the snapshot is only served then. A
+    changed report makes the current snapshot stale right away and the routes
+    read from MongoDB until the rebuild completes. A load during which
+    reports changed is still published, so steady churn cannot hold back
+    every load, and is rebuilt once the changes settle. Publishing a rebuild
+    bumps the version of the reports, so clients holding a response of the
+    stale load fetch again.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._changed = None
+
+    def current(self):
+        """The snapshot to serve from, or None to fall back to MongoDB."""
+        if not collection_versions.watching:
+            return None
+        return self._snapshot
+
+    def mark_stale(self):
+        self._snapshot = None
+        if self._changed is not None:
+            self._changed.set()
+
+    async def run(self, refresh: float = None, debounce: float = 5):
+        refresh = refresh or float(os.getenv("VULNERABILITY_SNAPSHOT_REFRESH", "300"))
+        self._changed = asyncio.Event()
+        rebuild = False
+        try:
+            while True:
+                self._changed.clear()
+                try:
+                    self._snapshot = await asyncio.to_thread(
+                        VulnerabilitySnapshot.load, VulnerabilityClient()
+                    )
+                except PyMongoError as e:
+                    print(f"Warning: could not build the vulnerability snapshot: {e}")
+                    self._snapshot = None
+                else:
+                    if rebuild:
+                        # Responses cached under the current version may
+                        # come from a load that missed the changes
+                        collection_versions.bump("vulnerabilityreports")
+
+                # Set already when reports changed during the load
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._changed.wait(), refresh)
+                rebuild = self._changed.is_set()
+                if rebuild:
+                    # Let a burst of report changes settle before rebuilding
+                    await asyncio.sleep(debounce)
+        finally:
+            self._snapshot = None
+            self._changed = None
+
+
+vulnerability_snapshot = SnapshotManager()
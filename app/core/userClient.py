@@ -3,8 +3,9 @@ from datetime import datetime
 from typing import List, Optional
 
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
-from app.core.databaseClient import DatabaseClient
+from app.core.databaseClient import AsyncDatabaseClient, DatabaseClient
 from app.models.user import Role, User, UserStats
 
 
@@ -12,6 +13,12 @@ class UserClient(DatabaseClient):
 
     """Client for managing users in MongoDB."""
 
+    INDEXES = [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("createdAt", DESCENDING)]),
+    ]
+
     def __init__(self):
         super().__init__()
 
@@ -29,24 +36,9 @@ class UserClient(DatabaseClient):
         limit: int = 50,
     ) -> tuple[List[User], int]:
         """Get all users with optional filtering and pagination."""
-        query = {}
-
-        # Build query filters
-        if role and role != "all":
-            query["role"] = role
-
-        if status and status != "all":
-            query["status"] = status
-
-        if namespace and namespace != "all":
-            query["namespaces"] = {"$in": [namespace]}
-
-        if search:
-            # Search in email and fullname (case-insensitive)
-            query["$or"] = [
-                {"email": {"$regex": search, "$options": "i"}},
-                {"fullname": {"$regex": search, "$options": "i"}},
-            ]
+        query = self._build_query(
+            role=role, namespace=namespace, status=status, search=search
+        )
 
         # Get total count for pagination
         total = self.get_collection().count_documents(query)
@@ -89,22 +81,7 @@ class UserClient(DatabaseClient):
 
     def create(self, user_data: dict) -> User:
         """Create a new user."""
-        # Generate unique ID
-        user_id = str(ObjectId())
-
-        # Prepare user document
-        user_doc = {
-            "id": user_id,
-            "email": user_data["email"].lower(),
-            "fullname": user_data["fullname"],
-            "role": user_data["role"],
-            "namespaces": user_data["namespaces"],
-            "createdAt": datetime.utcnow(),
-            "lastLogin": None,
-            "status": "active",
-            "mfaEnabled": False,
-            "oktaIntegration": False,
-        }
+        user_doc = self._build_user_document(user_data)
 
         # Insert into database
         self.get_collection().insert_one(user_doc.copy())
@@ -113,16 +90,11 @@ class UserClient(DatabaseClient):
 
     def update(self, user_id: str, update_data: dict) -> Optional[User]:
         """Update an existing user."""
-        # Remove None values and prepare update
-        update_fields = {k: v for k, v in update_data.items() if v is not None}
+        update_fields = self._build_update_fields(update_data)
 
         if not update_fields:
             return self.get_by_id(user_id)
 
-        # Convert email to lowercase if present
-        if "email" in update_fields:
-            update_fields["email"] = update_fields["email"].lower()
-
         # Update in database
         result = self.get_collection().update_one(
             {"id": user_id}, {"$set": update_fields}
@@ -159,16 +131,11 @@ class UserClient(DatabaseClient):
 
     def bulk_update(self, user_ids: List[str], update_data: dict) -> int:
         """Bulk update multiple users."""
-        # Remove None values
-        update_fields = {k: v for k, v in update_data.items() if v is not None}
+        update_fields = self._build_update_fields(update_data)
 
         if not update_fields:
             return 0
 
-        # Convert email to lowercase if present
-        if "email" in update_fields:
-            update_fields["email"] = update_fields["email"].lower()
-
         result = self.get_collection().update_many(
             {"id": {"$in": user_ids}}, {"$set": update_fields}
         )
@@ -182,39 +149,12 @@ class UserClient(DatabaseClient):
 
     def get_stats(self) -> UserStats:
         """Get user statistics."""
-        pipeline = [
-            {
-                "$group": {
-                    "_id": None,
-                    "total": {"$sum": 1},
-                    "active": {
-                        "$sum": {"$cond": [{"$eq": ["$status", "active"]}, 1, 0]}
-                    },
-                    "inactive": {
-                        "$sum": {"$cond": [{"$eq": ["$status", "inactive"]}, 1, 0]}
-                    },
-                }
-            }
-        ]
-
-        stats_result = list(self.get_collection().aggregate(pipeline))
+        stats_result = list(self.get_collection().aggregate(self._STATS_PIPELINE))
 
         # Get role statistics
-        role_pipeline = [{"$group": {"_id": "$role", "count": {"$sum": 1}}}]
+        role_stats = list(self.get_collection().aggregate(self._ROLE_PIPELINE))
 
-        role_stats = list(self.get_collection().aggregate(role_pipeline))
-        by_role = {item["_id"]: item["count"] for item in role_stats}
-
-        if stats_result:
-            stats = stats_result[0]
-            return UserStats(
-                total=stats["total"],
-                active=stats["active"],
-                inactive=stats["inactive"],
-                byRole=by_role,
-            )
-        else:
-            return UserStats(total=0, active=0, inactive=0, byRole={})
+        return self._format_stats(stats_result, role_stats)
 
     def get_user_activity(self, user_id: str, limit: int = 50) -> List[dict]:
         """Get user activity (placeholder for future implementation)."""
@@ -224,13 +164,7 @@ class UserClient(DatabaseClient):
         if not user:
             return []
 
-        return [
-            {
-                "timestamp": user.createdAt,
-                "action": "user_created",
-                "details": f"User {user.fullname} was created",
-            }
-        ]
+        return self._format_activity(user)
 
     def count_active_sysadmins(self) -> int:
         """Count active system administrators."""
@@ -293,6 +227,98 @@ class UserClient(DatabaseClient):
             ),
         ]
 
+    _STATS_PIPELINE = [
+        {
+            "$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "active": {"$sum": {"$cond": [{"$eq": ["$status", "active"]}, 1, 0]}},
+                "inactive": {
+                    "$sum": {"$cond": [{"$eq": ["$status", "inactive"]}, 1, 0]}
+                },
+            }
+        }
+    ]
+
+    _ROLE_PIPELINE = [{"$group": {"_id": "$role", "count": {"$sum": 1}}}]
+
+    def _build_query(
+        self,
+        role: Optional[str] = None,
+        namespace: Optional[str] = None,
+        status: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> dict:
+        """Build the users query from the list filters."""
+        query = {}
+
+        if role and role != "all":
+            query["role"] = role
+
+        if status and status != "all":
+            query["status"] = status
+
+        if namespace and namespace != "all":
+            query["namespaces"] = {"$in": [namespace]}
+
+        if search:
+            # Search in email and fullname (case-insensitive)
+            query["$or"] = [
+                {"email": {"$regex": search, "$options": "i"}},
+                {"fullname": {"$regex": search, "$options": "i"}},
+            ]
+
+        return query
+
+    def _build_user_document(self, user_data: dict) -> dict:
+        """Prepare a new user document with a generated ID."""
+        return {
+            "id": str(ObjectId()),
+            "email": user_data["email"].lower(),
+            "fullname": user_data["fullname"],
+            "role": user_data["role"],
+            "namespaces": user_data["namespaces"],
+            "createdAt": datetime.utcnow(),
+            "lastLogin": None,
+            "status": "active",
+            "mfaEnabled": False,
+            "oktaIntegration": False,
+        }
+
+    def _build_update_fields(self, update_data: dict) -> dict:
+        """Drop None values and normalise the email of an update."""
+        update_fields = {k: v for k, v in update_data.items() if v is not None}
+
+        if "email" in update_fields:
+            update_fields["email"] = update_fields["email"].lower()
+
+        return update_fields
+
+    def _format_stats(self, stats_result: list, role_stats: list) -> UserStats:
+        """Format the aggregation results to a UserStats model."""
+        by_role = {item["_id"]: item["count"] for item in role_stats}
+
+        if stats_result:
+            stats = stats_result[0]
+            return UserStats(
+                total=stats["total"],
+                active=stats["active"],
+                inactive=stats["inactive"],
+                byRole=by_role,
+            )
+        else:
+            return UserStats(total=0, active=0, inactive=0, byRole={})
+
+    def _format_activity(self, user: User) -> List[dict]:
+        """Format the activity entries of a user."""
+        return [
+            {
+                "timestamp": user.createdAt,
+                "action": "user_created",
+                "details": f"User {user.fullname} was created",
+            }
+        ]
+
     def _format_user(self, item: dict) -> User:
         """Format database item to User model."""
         return User(
@@ -307,3 +333,159 @@ class UserClient(DatabaseClient):
             mfaEnabled=item.get("mfaEnabled", False),
             oktaIntegration=item.get("oktaIntegration", False),
         )
+
+
+class AsyncUserClient(AsyncDatabaseClient, UserClient):
+
+    """Asyncio client for managing users in MongoDB."""
+
+    async def get_all(
+        self,
+        role: Optional[str] = None,
+        namespace: Optional[str] = None,
+        status: Optional[str] = None,
+        search: Optional[str] = None,
+        page: int = 1,
+        limit: int = 50,
+    ) -> tuple[List[User], int]:
+        """Get all users with optional filtering and pagination."""
+        query = self._build_query(
+            role=role, namespace=namespace, status=status, search=search
+        )
+
+        total = await self.get_collection().count_documents(query)
+
+        cursor = (
+            self.get_collection()
+            .find(query, {"_id": 0})
+            .sort("createdAt", -1)
+            .skip((page - 1) * limit)
+            .limit(limit)
+        )
+
+        users = [self._format_user(item) async for item in cursor]
+
+        return users, total
+
+    async def get_by_id(self, user_id: str) -> Optional[User]:
+        """Get user by ID."""
+        item = await self.get_collection().find_one({"id": user_id}, {"_id": 0})
+
+        if not item:
+            return None
+
+        return self._format_user(item)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """Get user by email."""
+        item = await self.get_collection().find_one(
+            {"email": email.lower()}, {"_id": 0}
+        )
+
+        if not item:
+            return None
+
+        return self._format_user(item)
+
+    async def create(self, user_data: dict) -> User:
+        """Create a new user."""
+        user_doc = self._build_user_document(user_data)
+
+        await self.get_collection().insert_one(user_doc.copy())
+
+        return self._format_user(user_doc)
+
+    async def update(self, user_id: str, update_data: dict) -> Optional[User]:
+        """Update an existing user."""
+        update_fields = self._build_update_fields(update_data)
+
+        if not update_fields:
+            return await self.get_by_id(user_id)
+
+        result = await self.get_collection().update_one(
+            {"id": user_id}, {"$set": update_fields}
+        )
+
+        if result.matched_count == 0:
+            return None
+
+        return await self.get_by_id(user_id)
+
+    async def delete(self, user_id: str) -> bool:
+        """Delete a user."""
+        result = await self.get_collection().delete_one({"id": user_id})
+        return result.deleted_count > 0
+
+    async def update_last_login(self, user_id: str) -> bool:
+        """Update user's last login timestamp."""
+        result = await self.get_collection().update_one(
+            {"id": user_id}, {"$set": {"lastLogin": datetime.utcnow()}}
+        )
+        return result.modified_count > 0
+
+    async def activate_user(self, user_id: str) -> Optional[User]:
+        """Activate a user."""
+        return await self.update(user_id, {"status": "active"})
+
+    async def deactivate_user(self, user_id: str) -> Optional[User]:
+        """Deactivate a user."""
+        return await self.update(user_id, {"status": "inactive"})
+
+    async def update_namespaces(
+        self, user_id: str, namespaces: List[str]
+    ) -> Optional[User]:
+        """Update user's namespaces."""
+        return await self.update(user_id, {"namespaces": namespaces})
+
+    async def bulk_update(self, user_ids: List[str], update_data: dict) -> int:
+        """Bulk update multiple users."""
+        update_fields = self._build_update_fields(update_data)
+
+        if not update_fields:
+            return 0
+
+        result = await self.get_collection().update_many(
+            {"id": {"$in": user_ids}}, {"$set": update_fields}
+        )
+
+        return result.modified_count
+
+    async def bulk_delete(self, user_ids: List[str]) -> int:
+        """Bulk delete multiple users."""
+        result = await self.get_collection().delete_many({"id": {"$in": user_ids}})
+        return result.deleted_count
+
+    async def get_stats(self) -> UserStats:
+        """Get user statistics."""
+        stats_cursor = await self.get_collection().aggregate(self._STATS_PIPELINE)
+        stats_result = await stats_cursor.to_list()
+
+        role_cursor = await self.get_collection().aggregate(self._ROLE_PIPELINE)
+        role_stats = await role_cursor.to_list()
+
+        return self._format_stats(stats_result, role_stats)
+
+    async def get_user_activity(self, user_id: str, limit: int = 50) -> List[dict]:
+        """Get user activity (placeholder for future implementation)."""
+        user = await self.get_by_id(user_id)
+        if not user:
+            return []
+
+        return self._format_activity(user)
+
+    async def count_active_sysadmins(self) -> int:
+        """Count active system administrators."""
+        return await self.get_collection().count_documents(
+            {"role": "SysAdmin", "status": "active"}
+        )
+
+    async def email_exists(
+        self, email: str, exclude_user_id: Optional[str] = None
+    ) -> bool:
+        """Check if email already exists."""
+        query = {"email": email.lower()}
+
+        if exclude_user_id:
+            query["id"] = {"$ne": exclude_user_id}
+
+        return await self.get_collection().count_documents(query) > 0
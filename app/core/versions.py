@@ -0,0 +1,72 @@
+import hashlib
+import threading
+import uuid
+
+
+class CollectionVersions:
+
+    """Change counters per collection, kept by the change stream watcher.
+
+    Tokens are only handed out while the watcher runs: without it a change
+    would go unnoticed and a stale token would keep matching. Every start
+    picks a new epoch, so tokens issued before a restart or a gap in
+    watching never match again.
+
+    The watcher also tracks which derived collections were completely
+    rebuilt, so readers know whether they can be trusted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._epoch = None
+        self._built = set()
+
+    def start(self, built=()):
+        """Start handing out tokens; called once the change stream is open."""
+        with self._lock:
+            self._epoch = uuid.uuid4().hex
+            self._versions.clear()
+            self._built = set(built)
+
+    def stop(self):
+        with self._lock:
+            self._epoch = None
+            self._built.clear()
+
+    def set_built(self, name: str, built: bool):
+        with self._lock:
+            if built:
+                self._built.add(name)
+            else:
+                self._built.discard(name)
+
+    def current(self, name: str) -> bool:
+        """Whether derived collection ``name`` is complete and kept in step."""
+        with self._lock:
+            return self._epoch is not None and name in self._built
+
+    @property
+    def watching(self) -> bool:
+        """Whether the watcher runs, so data derived from changes is current."""
+        with self._lock:
+            return self._epoch is not None
+
+    def bump(self, collection: str):
+        with self._lock:
+            self._versions[collection] = self._versions.get(collection, 0) + 1
+
+    def token(self, collections, key: str = ""):
+        """Version token of ``collections`` for a query ``key``, or None.
+
+        None means changes are not tracked and no token can be trusted.
+        """
+        with self._lock:
+            if self._epoch is None:
+                return None
+            versions = [(name, self._versions.get(name, 0)) for name in collections]
+            raw = repr((self._epoch, versions, key)).encode()
+        return hashlib.md5(raw).hexdigest()
+
+
+collection_versions = CollectionVersions()
@@ -1,50 +1,582 @@
+import base64
+import json
 import os
 
-from app.core.databaseClient import DatabaseClient
-from app.models.vulnerability import Vulnerability
+from pymongo import ASCENDING, IndexModel
+
+from app.core.cache import cached, coalesced
+from app.core.databaseClient import (
+    AsyncDatabaseClient,
+    DatabaseClient,
+    fields_projection,
+    lazy_documents,
+)
+from app.models.vulnerability import Vulnerability, VulnerabilityPage
+
+SEVERITIES = ("CRITICAL", "HIGH", "MEDIUM", "LOW", "UNKNOWN")
+
+# Report fields read by ``flatten_report``
+FINDING_FIELDS = (
+    "title",
+    "fixedVersion",
+    "installedVersion",
+    "lastModifiedDate",
+    "links",
+    "packagePURL",
+    "primaryLink",
+    "publishedDate",
+    "resource",
+    "score",
+    "severity",
+    "vulnerabilityID",
+)
+REPORT_FIELDS = {
+    "_id": 0,
+    "_uid": 1,
+    "_cluster": 1,
+    "_namespace": 1,
+    "data.metadata.uid": 1,
+    "data.report.artifact.repository": 1,
+}
+FLATTEN_PROJECTION = {
+    **REPORT_FIELDS,
+    **{f"data.report.vulnerabilities.{field}": 1 for field in FINDING_FIELDS},
+}
+# ``_format`` only lists the vulnerability IDs of a report
+LIST_PROJECTION = {**REPORT_FIELDS, "data.report.vulnerabilities.vulnerabilityID": 1}
+# The Vulnerability fields ``_format`` fills in
+LIST_FIELDS = ("uid", "target", "pod_id", "cluster", "namespace", "vulnerabilities")
+# Document paths behind each Vulnerability field, for ``fields=`` projections
+FIELD_PATHS = {
+    **{field: (f"data.report.vulnerabilities.{field}",) for field in FINDING_FIELDS},
+    "description": ("data.report.vulnerabilities.title",),
+    "uid": ("_uid",),
+    "cluster": ("_cluster",),
+    "namespace": ("_namespace",),
+    "pod_id": ("data.metadata.uid",),
+    "target": ("data.report.artifact.repository",),
+    "vulnerabilities": ("data.report.vulnerabilities.vulnerabilityID",),
+}
+# Pages are ordered by ``_uid`` and need every finding to count positions
+REQUIRED_PATHS = ("_uid", "data.report.vulnerabilities.vulnerabilityID")
+# Values findings can be grouped and counted by
+GROUP_FIELDS = {
+    "cluster": "$_cluster",
+    "namespace": "$_namespace",
+    "severity": "$data.report.vulnerabilities.severity",
+    "vulnerabilityID": "$data.report.vulnerabilities.vulnerabilityID",
+    "resource": "$data.report.vulnerabilities.resource",
+}
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def _encode_cursor(uid: str, index: int) -> str:
+    """Opaque position of a finding: report ``_uid`` plus index in the report."""
+    raw = json.dumps([uid, index], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        uid, index = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+    if not isinstance(uid, str) or not isinstance(index, int) or index < 0:
+        raise InvalidCursorError("Invalid cursor")
+    return uid, index
+
+
+def flatten_report(report):
+    """The findings of a stored report, one ``Vulnerability`` each."""
+    if report is None:
+        return None
+
+    uid = report.get("_uid", "")
+    if report is None:
+        return None
+
+    vulnerabilities = (
+        report.get("data", {}).get("report", {}).get("vulnerabilities", [])
+    )
+
+    if not vulnerabilities:
+        return []
+
+    cluster = report.get("_cluster", "")
+    namespace = report.get("_namespace", "")
+    pod_id = str(report.get("data", {}).get("metadata", {}).get("uid", ""))
+    target = (
+        report.get("data", {})
+        .get("report", {})
+        .get("artifact", {})
+        .get("repository", "")
+    )
+
+    vulnerability_objects = []
+    for vuln in vulnerabilities:
+        vulnerability_data = {
+            "title": vuln.get("title", ""),
+            "uid": uid,
+            "fixedVersion": vuln.get("fixedVersion", ""),
+            "installedVersion": vuln.get("installedVersion", ""),
+            "lastModifiedDate": vuln.get("lastModifiedDate", ""),
+            "links": vuln.get("links", []),
+            "packagePURL": vuln.get("packagePURL", ""),
+            "primaryLink": vuln.get("primaryLink", ""),
+            "publishedDate": vuln.get("publishedDate", ""),
+            "resource": vuln.get("resource", ""),
+            "score": vuln.get("score", 0.0),
+            "severity": vuln.get("severity", ""),
+            "target": target,
+            "vulnerabilityID": vuln.get("vulnerabilityID", ""),
+            "pod_id": pod_id,
+            "cluster": cluster,
+            "namespace": namespace,
+            "description": vuln.get("title", ""),
+        }
+        try:
+            vulnerability_objects.append(Vulnerability(**vulnerability_data))
+        except Exception as e:
+            print(f"Error creating vulnerability object: {e}")
+            continue
+
+    return vulnerability_objects
 
 
 class VulnerabilityClient(DatabaseClient):
+    INDEXES = [
+        IndexModel([("_cluster", ASCENDING), ("_namespace", ASCENDING)]),
+        IndexModel([("_uid", ASCENDING)], unique=True),
+        IndexModel([("data.report.vulnerabilities.severity", ASCENDING)]),
+        IndexModel([("data.report.vulnerabilities.vulnerabilityID", ASCENDING)]),
+        IndexModel(
+            [
+                ("data.report.artifact.repository", ASCENDING),
+                ("data.report.artifact.tag", ASCENDING),
+            ]
+        ),
+    ]
+
     def __init__(self):
         super().__init__()
 
     def get_collection(self):
         return self.client[os.getenv("MONGODB_DB", "shield")]["vulnerabilityreports"]
 
-    def _get_all(
-        self, namespace: str = None, cluster: str = None, severity: str = None
+    def _build_query(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
     ):
-        """Internal method to get all vulnerabilities based on filters."""
         query = {}
         if namespace:
             query["_namespace"] = namespace
         if cluster:
             query["_cluster"] = cluster
+
+        finding = {}
+        if severity:
+            finding["severity"] = severity
+        if fixed is not None:
+            finding["fixedVersion"] = {"$nin" if fixed else "$in": [None, ""]}
+        if min_score is not None:
+            finding["score"] = {"$gte": min_score}
+        if resource:
+            finding["resource"] = resource
+        if finding:
+            query["data.report.vulnerabilities"] = {"$elemMatch": finding}
+        return query
+
+    def _finding_conditions(
+        self,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+    ):
+        """``$filter`` conditions a single finding has to satisfy."""
+        conditions = []
         if severity:
-            query["data.report.vulnerabilities.severity"] = severity
+            conditions.append({"$eq": ["$$this.severity", severity]})
+        if fixed is not None:
+            fixed_version = {"$ifNull": ["$$this.fixedVersion", ""]}
+            conditions.append({"$gt" if fixed else "$eq": [fixed_version, ""]})
+        if min_score is not None:
+            conditions.append({"$gte": [{"$ifNull": ["$$this.score", 0]}, min_score]})
+        if resource:
+            conditions.append({"$eq": ["$$this.resource", resource]})
+        return conditions
+
+    def _findings_pipeline(
+        self,
+        query,
+        conditions,
+        sort: bool = False,
+        projection: dict = FLATTEN_PROJECTION,
+    ):
+        """Matching reports with their findings narrowed down to ``conditions``."""
+        pipeline = [{"$match": query}]
+        if sort:
+            pipeline.append({"$sort": {"_uid": 1}})
+        pipeline.append(
+            {
+                "$set": {
+                    "data.report.vulnerabilities": {
+                        "$filter": {
+                            "input": "$data.report.vulnerabilities",
+                            "cond": {"$and": conditions},
+                        }
+                    }
+                }
+            }
+        )
+        # Projected after filtering, as the conditions may read other fields
+        pipeline.append({"$project": projection})
+        return pipeline
+
+    def _find_reports(
+        self,
+        query,
+        conditions,
+        sort: bool = False,
+        projection: dict = FLATTEN_PROJECTION,
+    ):
+        """Cursor over the reports; findings are filtered in the database."""
+        collection = lazy_documents(self.get_collection())
+        if conditions:
+            pipeline = self._findings_pipeline(
+                query, conditions, sort=sort, projection=projection
+            )
+            return collection.aggregate(pipeline)
+
+        reports = collection.find(query, projection)
+        return reports.sort("_uid", 1) if sort else reports
+
+    def _get_all(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+        projection: dict = FLATTEN_PROJECTION,
+    ):
+        """Internal method to get all vulnerabilities based on filters."""
+        finding_filters = {
+            "severity": severity,
+            "fixed": fixed,
+            "min_score": min_score,
+            "resource": resource,
+        }
+        query = self._build_query(
+            namespace=namespace, cluster=cluster, **finding_filters
+        )
+        conditions = self._finding_conditions(**finding_filters)
+        return self._find_reports(query, conditions, projection=projection)
+
+    def _severity_counts_pipeline(self, namespace: str = None, cluster: str = None):
+        """Count findings per severity inside the database."""
+        return [
+            {"$match": self._build_query(namespace=namespace, cluster=cluster)},
+            {"$unwind": "$data.report.vulnerabilities"},
+            {
+                "$group": {
+                    "_id": "$data.report.vulnerabilities.severity",
+                    "count": {"$sum": 1},
+                }
+            },
+        ]
+
+    def _format_severity_counts(self, groups):
+        counts = {"total": 0, **{severity: 0 for severity in SEVERITIES}}
+        for group in groups:
+            counts["total"] += group["count"]
+            if group["_id"] in counts:
+                counts[group["_id"]] += group["count"]
+        return counts
+
+    def _count_pipeline(
+        self, namespace: str = None, cluster: str = None, by_severity: bool = False
+    ):
+        """Sum the vulnerability array sizes without unwinding the reports."""
+        findings = {"$ifNull": ["$data.report.vulnerabilities", []]}
+        group = {"_id": None, "total": {"$sum": {"$size": findings}}}
+        if by_severity:
+            for severity in SEVERITIES:
+                group[severity] = {
+                    "$sum": {
+                        "$size": {
+                            "$filter": {
+                                "input": findings,
+                                "cond": {"$eq": ["$$this.severity", severity]},
+                            }
+                        }
+                    }
+                }
+
+        return [
+            {"$match": self._build_query(namespace=namespace, cluster=cluster)},
+            {"$group": group},
+        ]
 
-        return self.get_collection().find(query, {"_id": 0})
+    def _format_count(self, groups, by_severity: bool = False):
+        counts = {"total": 0}
+        if by_severity:
+            counts.update({severity: 0 for severity in SEVERITIES})
+        for group in groups:
+            counts.update({key: group[key] for key in counts})
+        return counts
 
-    def get_all(self, namespace: str = None, cluster: str = None, severity: str = None):
+    def count_vulnerabilities(
+        self, namespace: str = None, cluster: str = None, by_severity: bool = False
+    ):
+        pipeline = self._count_pipeline(
+            namespace=namespace, cluster=cluster, by_severity=by_severity
+        )
+        return self._format_count(
+            self.get_collection().aggregate(pipeline), by_severity=by_severity
+        )
+
+    def get_severity_counts(self, namespace: str = None, cluster: str = None):
+        pipeline = self._severity_counts_pipeline(namespace=namespace, cluster=cluster)
+        return self._format_severity_counts(self.get_collection().aggregate(pipeline))
+
+    def _group_counts_pipeline(
+        self,
+        by: str,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+    ):
+        """Count the matching findings per value of ``by``, most frequent first."""
+        finding_filters = {
+            "severity": severity,
+            "fixed": fixed,
+            "min_score": min_score,
+            "resource": resource,
+        }
+        query = self._build_query(
+            namespace=namespace, cluster=cluster, **finding_filters
+        )
+        conditions = self._finding_conditions(**finding_filters)
+        pipeline = (
+            self._findings_pipeline(query, conditions)
+            if conditions
+            else [{"$match": query}]
+        )
+        return pipeline + [
+            {"$unwind": "$data.report.vulnerabilities"},
+            {
+                "$group": {
+                    "_id": {"$ifNull": [GROUP_FIELDS[by], ""]},
+                    "count": {"$sum": 1},
+                }
+            },
+            {"$sort": {"count": -1, "_id": 1}},
+        ]
+
+    def _format_group_counts(self, groups):
+        return [{"value": group["_id"], "count": group["count"]} for group in groups]
+
+    def get_group_counts(
+        self,
+        by: str,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+    ):
+        pipeline = self._group_counts_pipeline(
+            by,
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
+        )
+        return self._format_group_counts(self.get_collection().aggregate(pipeline))
+
+    def get_all(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+        fields: tuple = None,
+    ):
         all_vulnerabilities = []
         for item in self._get_all(
-            namespace=namespace, cluster=cluster, severity=severity
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
+            projection=fields_projection(
+                LIST_PROJECTION, FIELD_PATHS, fields, REQUIRED_PATHS
+            ),
         ):
             all_vulnerabilities.append(self._format(item))
         return all_vulnerabilities
 
     def get_flattened(
-        self, namespace: str = None, cluster: str = None, severity: str = None
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
     ):
         all_vulnerabilities = []
         for item in self._get_all(
-            namespace=namespace, cluster=cluster, severity=severity
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
         ):
             all_vulnerabilities.extend(self._format_flatten(item))
         return all_vulnerabilities
 
+    def iter_flattened(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+        fields: tuple = None,
+    ):
+        """Yield flattened vulnerabilities report by report from the cursor."""
+        for item in self._get_all(
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
+            projection=fields_projection(
+                FLATTEN_PROJECTION, FIELD_PATHS, fields, REQUIRED_PATHS
+            ),
+        ):
+            yield from self._format_flatten(item)
+
+    def _get_page(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+        cursor: str = None,
+        projection: dict = FLATTEN_PROJECTION,
+    ):
+        """Reports from the cursor position onwards, in ``_uid`` order."""
+        finding_filters = {
+            "severity": severity,
+            "fixed": fixed,
+            "min_score": min_score,
+            "resource": resource,
+        }
+        query = self._build_query(
+            namespace=namespace, cluster=cluster, **finding_filters
+        )
+        after = _decode_cursor(cursor) if cursor else None
+        if after:
+            query["_uid"] = {"$gte": after[0]}
+
+        conditions = self._finding_conditions(**finding_filters)
+        reports = self._find_reports(
+            query, conditions, sort=True, projection=projection
+        )
+        return reports, after
+
+    def _fill_page(self, items: list, report, after, limit: int):
+        """Add findings of ``report`` to ``items``; returns the next cursor once full."""
+        uid = report.get("_uid", "")
+        findings = self._format_flatten(report)
+        start = after[1] if after and uid == after[0] else 0
+
+        for index in range(start, len(findings)):
+            if len(items) == limit:
+                return _encode_cursor(uid, index)
+            items.append(findings[index])
+        return None
+
+    def get_flattened_page(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+        limit: int = 1000,
+        cursor: str = None,
+        fields: tuple = None,
+    ):
+        items = []
+        reports, after = self._get_page(
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
+            cursor=cursor,
+            projection=fields_projection(
+                FLATTEN_PROJECTION, FIELD_PATHS, fields, REQUIRED_PATHS
+            ),
+        )
+        for report in reports:
+            next_cursor = self._fill_page(items, report, after, limit)
+            if next_cursor:
+                return VulnerabilityPage(items=items, next_cursor=next_cursor)
+        return VulnerabilityPage(items=items)
+
+    def _affected_query(
+        self, vulnerability_id: str, namespace: str = None, cluster: str = None
+    ):
+        """Reports containing ``vulnerability_id``, narrowed to that finding."""
+        query = self._build_query(namespace=namespace, cluster=cluster)
+        query["data.report.vulnerabilities.vulnerabilityID"] = vulnerability_id
+        return query, [{"$eq": ["$$this.vulnerabilityID", vulnerability_id]}]
+
+    def get_affected(
+        self, vulnerability_id: str, namespace: str = None, cluster: str = None
+    ):
+        query, conditions = self._affected_query(
+            vulnerability_id, namespace=namespace, cluster=cluster
+        )
+        affected = []
+        for report in self._find_reports(query, conditions):
+            affected.extend(self._format_flatten(report))
+        return affected
+
     def get_by_uid(self, uid: str):
-        item = self.get_collection().find_one({"_uid": uid}, {"_id": 0})
+        collection = lazy_documents(self.get_collection())
+        item = collection.find_one({"_uid": uid}, FLATTEN_PROJECTION)
         return self._format_flatten(item)
 
     def _format(self, report):
@@ -83,56 +615,182 @@ class VulnerabilityClient(DatabaseClient):
         }
 
     def _format_flatten(self, report):
-        if report is None:
-            return None
+        return flatten_report(report)
 
-        uid = report.get("_uid", "")
-        if report is None:
-            return None
 
-        vulnerabilities = (
-            report.get("data", {}).get("report", {}).get("vulnerabilities", [])
+class AsyncVulnerabilityClient(AsyncDatabaseClient, VulnerabilityClient):
+    async def _find_reports(
+        self,
+        query,
+        conditions,
+        sort: bool = False,
+        projection: dict = FLATTEN_PROJECTION,
+    ):
+        if conditions:
+            pipeline = self._findings_pipeline(
+                query, conditions, sort=sort, projection=projection
+            )
+            return await lazy_documents(self.get_collection()).aggregate(pipeline)
+
+        return super()._find_reports(
+            query, conditions, sort=sort, projection=projection
         )
 
-        if not vulnerabilities:
-            return []
+    @cached("vulnerabilityreports")
+    async def get_all(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+        fields: tuple = None,
+    ):
+        reports = await self._get_all(
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
+            projection=fields_projection(
+                LIST_PROJECTION, FIELD_PATHS, fields, REQUIRED_PATHS
+            ),
+        )
+        return [self._format(item) async for item in reports]
 
-        cluster = report.get("_cluster", "")
-        namespace = report.get("_namespace", "")
-        pod_id = str(report.get("data", {}).get("metadata", {}).get("uid", ""))
-        target = (
-            report.get("data", {})
-            .get("report", {})
-            .get("artifact", {})
-            .get("repository", "")
+    async def get_flattened(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+    ):
+        all_vulnerabilities = []
+        async for item in await self._get_all(
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
+        ):
+            all_vulnerabilities.extend(self._format_flatten(item))
+        return all_vulnerabilities
+
+    async def iter_flattened(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+        fields: tuple = None,
+    ):
+        async for item in await self._get_all(
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
+            projection=fields_projection(
+                FLATTEN_PROJECTION, FIELD_PATHS, fields, REQUIRED_PATHS
+            ),
+        ):
+            for vulnerability in self._format_flatten(item):
+                yield vulnerability
+
+    @coalesced("vulnerabilityreports")
+    async def get_flattened_page(
+        self,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+        limit: int = 1000,
+        cursor: str = None,
+        fields: tuple = None,
+    ):
+        items = []
+        reports, after = self._get_page(
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
+            cursor=cursor,
+            projection=fields_projection(
+                FLATTEN_PROJECTION, FIELD_PATHS, fields, REQUIRED_PATHS
+            ),
         )
+        # ``_find_reports`` is a coroutine here, so the cursor is awaited
+        async for report in await reports:
+            next_cursor = self._fill_page(items, report, after, limit)
+            if next_cursor:
+                return VulnerabilityPage(items=items, next_cursor=next_cursor)
+        return VulnerabilityPage(items=items)
 
-        vulnerability_objects = []
-        for vuln in vulnerabilities:
-            vulnerability_data = {
-                "title": vuln.get("title", ""),
-                "uid": uid,
-                "fixedVersion": vuln.get("fixedVersion", ""),
-                "installedVersion": vuln.get("installedVersion", ""),
-                "lastModifiedDate": vuln.get("lastModifiedDate", ""),
-                "links": vuln.get("links", []),
-                "packagePURL": vuln.get("packagePURL", ""),
-                "primaryLink": vuln.get("primaryLink", ""),
-                "publishedDate": vuln.get("publishedDate", ""),
-                "resource": vuln.get("resource", ""),
-                "score": vuln.get("score", 0.0),
-                "severity": vuln.get("severity", ""),
-                "target": target,
-                "vulnerabilityID": vuln.get("vulnerabilityID", ""),
-                "pod_id": pod_id,
-                "cluster": cluster,
-                "namespace": namespace,
-                "description": vuln.get("title", ""),
-            }
-            try:
-                vulnerability_objects.append(Vulnerability(**vulnerability_data))
-            except Exception as e:
-                print(f"Error creating vulnerability object: {e}")
-                continue
+    @cached("vulnerabilityreports")
+    async def get_affected(
+        self, vulnerability_id: str, namespace: str = None, cluster: str = None
+    ):
+        query, conditions = self._affected_query(
+            vulnerability_id, namespace=namespace, cluster=cluster
+        )
+        affected = []
+        async for report in await self._find_reports(query, conditions):
+            affected.extend(self._format_flatten(report))
+        return affected
 
-        return vulnerability_objects
+    @coalesced("vulnerabilityreports")
+    async def get_by_uid(self, uid: str):
+        collection = lazy_documents(self.get_collection())
+        item = await collection.find_one({"_uid": uid}, FLATTEN_PROJECTION)
+        return self._format_flatten(item)
+
+    @cached("vulnerabilityreports")
+    async def count_vulnerabilities(
+        self, namespace: str = None, cluster: str = None, by_severity: bool = False
+    ):
+        pipeline = self._count_pipeline(
+            namespace=namespace, cluster=cluster, by_severity=by_severity
+        )
+        cursor = await self.get_collection().aggregate(pipeline)
+        return self._format_count(await cursor.to_list(), by_severity=by_severity)
+
+    @cached("vulnerabilityreports")
+    async def get_severity_counts(self, namespace: str = None, cluster: str = None):
+        pipeline = self._severity_counts_pipeline(namespace=namespace, cluster=cluster)
+        cursor = await self.get_collection().aggregate(pipeline)
+        return self._format_severity_counts(await cursor.to_list())
+
+    @cached("vulnerabilityreports")
+    async def get_group_counts(
+        self,
+        by: str,
+        namespace: str = None,
+        cluster: str = None,
+        severity: str = None,
+        fixed: bool = None,
+        min_score: float = None,
+        resource: str = None,
+    ):
+        pipeline = self._group_counts_pipeline(
+            by,
+            namespace=namespace,
+            cluster=cluster,
+            severity=severity,
+            fixed=fixed,
+            min_score=min_score,
+            resource=resource,
+        )
+        cursor = await self.get_collection().aggregate(pipeline)
+        return self._format_group_counts(await cursor.to_list())
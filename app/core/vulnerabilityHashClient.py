@@ -0,0 +1,135 @@
+import hashlib
+import os
+from datetime import datetime
+
+from pymongo import ASCENDING, IndexModel
+
+from app.core.databaseClient import AsyncDatabaseClient, DatabaseClient
+from app.core.derivedStateClient import HASHES, DerivedStateClient
+
+# Fields of a report needed to compute the hashes of its findings
+REPORT_PROJECTION = {
+    "data.metadata.uid": 1,
+    "data.report.vulnerabilities.vulnerabilityID": 1,
+    "data.report.vulnerabilities.resource": 1,
+}
+
+
+def finding_hash(vulnerability_id: str, pod_id: str, resource: str) -> str:
+    """Stable identifier of a single finding, as used by /vulnerabilities-old."""
+    return hashlib.md5(f"{vulnerability_id}-{pod_id}-{resource}".encode()).hexdigest()
+
+
+class VulnerabilityHashClient(DatabaseClient):
+
+    """Lookup collection from finding hash to its report and array position.
+
+    Hashes are not unique: several reports (e.g. one per container) can
+    describe the same pod, so a lookup gets every entry of a hash, oldest
+    first, and the first one whose report still has the finding wins. The
+    lookup only covers every report once ``rebuild`` has finished.
+    """
+
+    INDEXES = [
+        IndexModel([("hash", ASCENDING)]),
+        IndexModel([("report_id", ASCENDING)]),
+        IndexModel([("updatedAt", ASCENDING)]),
+    ]
+
+    def __init__(self):
+        super().__init__()
+
+    def get_collection(self):
+        return self.client[os.getenv("MONGODB_DB", "shield")]["vulnerability_hashes"]
+
+    def get_reports_collection(self):
+        return self.client[os.getenv("MONGODB_DB", "shield")]["vulnerabilityreports"]
+
+    def get_state_client(self):
+        return DerivedStateClient()
+
+    def _entries(self, report, updated_at: datetime = None):
+        updated_at = updated_at or datetime.utcnow()
+        pod_id = str(report.get("data", {}).get("metadata", {}).get("uid", ""))
+        vulnerabilities = (
+            report.get("data", {}).get("report", {}).get("vulnerabilities", [])
+        )
+        return [
+            {
+                "hash": finding_hash(
+                    vuln.get("vulnerabilityID", ""), pod_id, vuln.get("resource", "")
+                ),
+                "report_id": report["_id"],
+                "index": index,
+                "updatedAt": updated_at,
+            }
+            for index, vuln in enumerate(vulnerabilities)
+        ]
+
+    def find(self, hash: str):
+        return self.get_collection().find_one({"hash": hash}, {"_id": 0})
+
+    def find_all(self, hash: str):
+        """Every entry of ``hash``, in the order they were written."""
+        cursor = self.get_collection().find({"hash": hash}, {"_id": 0})
+        return list(cursor.sort("_id", ASCENDING))
+
+    def sync_report(self, report, updated_at: datetime = None):
+        """Replace the entries of ``report`` with hashes of its current findings."""
+        collection = self.get_collection()
+        collection.delete_many({"report_id": report["_id"]})
+        entries = self._entries(report, updated_at)
+        if entries:
+            collection.insert_many(entries)
+        return len(entries)
+
+    def remove_report(self, report_id):
+        return self.get_collection().delete_many({"report_id": report_id}).deleted_count
+
+    def rebuild(self):
+        """Recompute every entry and drop the ones of reports that are gone."""
+        state = self.get_state_client()
+        state.clear_built(HASHES)
+        started = datetime.utcnow()
+        total = 0
+        for report in self.get_reports_collection().find({}, REPORT_PROJECTION):
+            total += self.sync_report(report, updated_at=started)
+        self.get_collection().delete_many({"updatedAt": {"$lt": started}})
+        state.mark_built(HASHES)
+        return total
+
+    def apply_change(self, change):
+        """Keep the entries in step with one change stream event."""
+        report_id = change["documentKey"]["_id"]
+        if change["operationType"] == "delete":
+            self.remove_report(report_id)
+        elif change.get("fullDocument"):
+            self.sync_report(change["fullDocument"])
+
+
+class AsyncVulnerabilityHashClient(AsyncDatabaseClient, VulnerabilityHashClient):
+    async def find(self, hash: str):
+        return await self.get_collection().find_one({"hash": hash}, {"_id": 0})
+
+    async def find_all(self, hash: str):
+        cursor = self.get_collection().find({"hash": hash}, {"_id": 0})
+        return await cursor.sort("_id", ASCENDING).to_list()
+
+    async def sync_report(self, report, updated_at: datetime = None):
+        collection = self.get_collection()
+        await collection.delete_many({"report_id": report["_id"]})
+        entries = self._entries(report, updated_at)
+        if entries:
+            await collection.insert_many(entries)
+        return len(entries)
+
+    async def remove_report(self, report_id):
+        result = await self.get_collection().delete_many({"report_id": report_id})
+        return result.deleted_count
+
+    async def apply_change(self, change):
+        report_id = change["documentKey"]["_id"]
+        if change["operationType"] == "delete":
+            await self.remove_report(report_id)
+        elif change.get("fullDocument"):
+            await self.sync_report(change["fullDocument"])
@@ -0,0 +1,300 @@
+import os
+
+from pymongo import ASCENDING, IndexModel
+
+from app.core.cache import cached
+from app.core.databaseClient import AsyncDatabaseClient, DatabaseClient
+from app.core.derivedStateClient import SUMMARIES, DerivedStateClient
+from app.core.vulnerabilityClient import SEVERITIES
+
+COUNT_KEYS = ("total", *SEVERITIES)
+
+
+class VulnerabilitySummaryClient(DatabaseClient):
+
+    """Severity counts per namespace and per image, kept next to the reports.
+
+    ``vulnerability_summaries`` holds three kinds of documents:
+
+    - ``report``: the counts of one report, keyed by the report ``_id``;
+    - ``namespace``: the sum of the reports of one cluster/namespace;
+    - ``image``: the counts of one image and the number of reports using it.
+
+    A changed report replaces its ``report`` document and recounts the
+    namespace and image summaries it was and is part of. The summaries only
+    cover every report once ``rebuild`` has finished, which it records in
+    the derived state.
+    """
+
+    INDEXES = [
+        IndexModel(
+            [("kind", ASCENDING), ("cluster", ASCENDING), ("namespace", ASCENDING)]
+        ),
+        IndexModel(
+            [
+                ("kind", ASCENDING),
+                ("repository", ASCENDING),
+                ("tag", ASCENDING),
+                ("digest", ASCENDING),
+            ]
+        ),
+    ]
+
+    def __init__(self):
+        super().__init__()
+
+    def get_collection(self):
+        return self.client[os.getenv("MONGODB_DB", "shield")]["vulnerability_summaries"]
+
+    def get_reports_collection(self):
+        return self.client[os.getenv("MONGODB_DB", "shield")]["vulnerabilityreports"]
+
+    def get_state_client(self):
+        return DerivedStateClient()
+
+    def _contribution(self, report):
+        """The ``report`` summary document of a vulnerability report."""
+        data = report.get("data", {}).get("report", {})
+        artifact = data.get("artifact", {})
+        counts = {key: 0 for key in COUNT_KEYS}
+        for vuln in data.get("vulnerabilities") or []:
+            counts["total"] += 1
+            if vuln.get("severity") in SEVERITIES:
+                counts[vuln["severity"]] += 1
+
+        return {
+            "_id": report["_id"],
+            "kind": "report",
+            "cluster": report.get("_cluster", ""),
+            "namespace": report.get("_namespace", ""),
+            "repository": artifact.get("repository", ""),
+            "tag": artifact.get("tag", ""),
+            "digest": artifact.get("digest", ""),
+            **counts,
+        }
+
+    def _namespace_key(self, contribution):
+        return {
+            "kind": "namespace",
+            "cluster": contribution["cluster"],
+            "namespace": contribution["namespace"],
+        }
+
+    def _image_key(self, contribution):
+        return {
+            "kind": "image",
+            "repository": contribution["repository"],
+            "tag": contribution["tag"],
+            "digest": contribution["digest"],
+        }
+
+    def _summary_pipelines(self, old, new):
+        """Key and recount pipeline of every summary ``old`` and ``new`` touch.
+
+        Summaries are recounted from the ``report`` documents instead of
+        adjusted by deltas, so applying a change twice, e.g. once per API
+        replica watching the reports, leaves the same result.
+        """
+        pipelines = {}
+        for contribution in (old, new):
+            if not contribution:
+                continue
+            key = self._namespace_key(contribution)
+            counts = {count: {"$sum": f"${count}"} for count in COUNT_KEYS}
+            pipelines[tuple(key.items())] = (key, counts)
+            key = self._image_key(contribution)
+            # Every report of one image has the same findings
+            counts = {count: {"$max": f"${count}"} for count in COUNT_KEYS}
+            pipelines[tuple(key.items())] = (key, counts)
+        return [
+            (
+                key,
+                [
+                    {"$match": {**key, "kind": "report"}},
+                    {"$group": {"_id": None, "reports": {"$sum": 1}, **counts}},
+                ],
+            )
+            for key, counts in pipelines.values()
+        ]
+
+    def _summary(self, key, groups):
+        """The summary document for ``key``, or None when no report is left."""
+        for group in groups:
+            if group.get("reports"):
+                counts = {count: group[count] for count in COUNT_KEYS}
+                return {**key, "reports": group["reports"], **counts}
+        return None
+
+    def _apply(self, old, new):
+        collection = self.get_collection()
+        if new:
+            collection.replace_one({"_id": new["_id"]}, new, upsert=True)
+        else:
+            collection.delete_one({"_id": old["_id"]})
+        for key, pipeline in self._summary_pipelines(old, new):
+            summary = self._summary(key, collection.aggregate(pipeline))
+            if summary:
+                collection.replace_one(key, summary, upsert=True)
+            else:
+                collection.delete_many(key)
+
+    def sync_report(self, report):
+        """Replace the counts of ``report`` in the summaries."""
+        old = self.get_collection().find_one({"_id": report["_id"], "kind": "report"})
+        self._apply(old, self._contribution(report))
+
+    def remove_report(self, report_id):
+        old = self.get_collection().find_one({"_id": report_id, "kind": "report"})
+        if old:
+            self._apply(old, None)
+
+    def apply_change(self, change):
+        """Keep the summaries in step with one change stream event."""
+        report_id = change["documentKey"]["_id"]
+        if change["operationType"] == "delete":
+            self.remove_report(report_id)
+        elif change.get("fullDocument"):
+            self.sync_report(change["fullDocument"])
+
+    def _contributions_pipeline(self):
+        """Per-report counts computed in the database, without the findings."""
+        findings = {"$ifNull": ["$data.report.vulnerabilities", []]}
+        counts = {
+            severity: {
+                "$size": {
+                    "$filter": {
+                        "input": findings,
+                        "cond": {"$eq": ["$$this.severity", severity]},
+                    }
+                }
+            }
+            for severity in SEVERITIES
+        }
+        return [
+            {
+                "$project": {
+                    "cluster": {"$ifNull": ["$_cluster", ""]},
+                    "namespace": {"$ifNull": ["$_namespace", ""]},
+                    "repository": {"$ifNull": ["$data.report.artifact.repository", ""]},
+                    "tag": {"$ifNull": ["$data.report.artifact.tag", ""]},
+                    "digest": {"$ifNull": ["$data.report.artifact.digest", ""]},
+                    "total": {"$size": findings},
+                    **counts,
+                }
+            }
+        ]
+
+    def rebuild(self):
+        """Recompute every summary from the reports; returns the report count."""
+        state = self.get_state_client()
+        # Partial while rebuilding, so not read until done
+        state.clear_built(SUMMARIES)
+        contributions = [
+            {**contribution, "kind": "report"}
+            for contribution in self.get_reports_collection().aggregate(
+                self._contributions_pipeline()
+            )
+        ]
+
+        namespaces, images = {}, {}
+        for contribution in contributions:
+            key = self._namespace_key(contribution)
+            summary = namespaces.setdefault(
+                tuple(key.values()),
+                {**key, "reports": 0, **{count: 0 for count in COUNT_KEYS}},
+            )
+            summary["reports"] += 1
+            for count in COUNT_KEYS:
+                summary[count] += contribution[count]
+
+            key = self._image_key(contribution)
+            summary = images.setdefault(
+                tuple(key.values()),
+                {**key, "reports": 0, **{c: contribution[c] for c in COUNT_KEYS}},
+            )
+            summary["reports"] += 1
+
+        collection = self.get_collection()
+        collection.delete_many({})
+        documents = [*contributions, *namespaces.values(), *images.values()]
+        if documents:
+            collection.insert_many(documents)
+        state.mark_built(SUMMARIES)
+        return len(contributions)
+
+    def _counts_pipeline(self, namespace: str = None, cluster: str = None):
+        match = {"kind": "namespace"}
+        if namespace:
+            match["namespace"] = namespace
+        if cluster:
+            match["cluster"] = cluster
+        group = {
+            "_id": None,
+            **{key: {"$sum": f"${key}"} for key in ("reports", *COUNT_KEYS)},
+        }
+        return [{"$match": match}, {"$group": group}]
+
+    def _format_counts(self, groups):
+        for group in groups:
+            if group.get("reports"):
+                return {key: group[key] for key in COUNT_KEYS}
+        return None
+
+    def get_severity_counts(self, namespace: str = None, cluster: str = None):
+        """Summed counts, or None when no namespace summary matches."""
+        pipeline = self._counts_pipeline(namespace=namespace, cluster=cluster)
+        return self._format_counts(self.get_collection().aggregate(pipeline))
+
+    def _image_counts_query(self, repository: str = None):
+        query = {"kind": "image"}
+        if repository:
+            query["repository"] = repository
+        return query
+
+    def get_image_counts(self, repository: str = None):
+        query = self._image_counts_query(repository)
+        return list(self.get_collection().find(query, {"_id": 0, "kind": 0}))
+
+
+class AsyncVulnerabilitySummaryClient(AsyncDatabaseClient, VulnerabilitySummaryClient):
+    async def _apply(self, old, new):
+        collection = self.get_collection()
+        if new:
+            await collection.replace_one({"_id": new["_id"]}, new, upsert=True)
+        else:
+            await collection.delete_one({"_id": old["_id"]})
+        for key, pipeline in self._summary_pipelines(old, new):
+            cursor = await collection.aggregate(pipeline)
+            summary = self._summary(key, await cursor.to_list())
+            if summary:
+                await collection.replace_one(key, summary, upsert=True)
+            else:
+                await collection.delete_many(key)
+
+    async def sync_report(self, report):
+        old = await self.get_collection().find_one(
+            {"_id": report["_id"], "kind": "report"}
+        )
+        await self._apply(old, self._contribution(report))
+
+    async def remove_report(self, report_id):
+        old = await self.get_collection().find_one({"_id": report_id, "kind": "report"})
+        if old:
+            await self._apply(old, None)
+
+    async def apply_change(self, change):
+        report_id = change["documentKey"]["_id"]
+        if change["operationType"] == "delete":
+            await self.remove_report(report_id)
+        elif change.get("fullDocument"):
+            await self.sync_report(change["fullDocument"])
+
+    @cached("vulnerabilityreports")
+    async def get_severity_counts(self, namespace: str = None, cluster: str = None):
+        pipeline = self._counts_pipeline(namespace=namespace, cluster=cluster)
+        cursor = await self.get_collection().aggregate(pipeline)
+        return self._format_counts(await cursor.to_list())
+
+    async def get_image_counts(self, repository: str = None):
+        query = self._image_counts_query(repository)
+        return await self.get_collection().find(query, {"_id": 0, "kind": 0}).to_list()
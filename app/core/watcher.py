@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.cache import query_cache
+from app.core.derivedStateClient import (
+    RESUME_TOKEN_ID,
+    STATE_COLLECTION,
+    AsyncDerivedStateClient,
+)
+from app.core.findingClient import AsyncFindingClient, findings_enabled
+from app.core.snapshot import vulnerability_snapshot
+from app.core.versions import collection_versions
+from app.core.vulnerabilityHashClient import AsyncVulnerabilityHashClient
+from app.core.vulnerabilitySummaryClient import AsyncVulnerabilitySummaryClient
+
+# Collections whose changes drop the cached query results that read them
+WATCHED_COLLECTIONS = ("vulnerabilityreports", "pods", "namespaces")
+# Events about one document; drop, rename and invalidate have no documentKey
+DOCUMENT_OPERATIONS = ("insert", "update", "replace", "delete")
+# ChangeStreamHistoryLost, ChangeStreamFatalError: the token cannot be resumed
+LOST_RESUME_CODES = (280, 286)
+RETRY_DELAY = 1
+MAX_RETRY_DELAY = 60
+# Seconds between saves of the resume token while no change arrives
+TOKEN_SAVE_INTERVAL = 60
+
+
+async def _apply(change, derived):
+    collection = change["ns"]["coll"]
+    if collection == STATE_COLLECTION:
+        # A rebuild started or finished
+        if change["operationType"] in DOCUMENT_OPERATIONS:
+            document = change.get("fullDocument") or {}
+            collection_versions.set_built(
+                change["documentKey"]["_id"], "builtAt" in document
+            )
+        return
+    if collection == "vulnerabilityreports":
+        if change["operationType"] in DOCUMENT_OPERATIONS:
+            for client in derived:
+                await client.apply_change(change)
+        vulnerability_snapshot.mark_stale()
+    query_cache.invalidate(collection)
+    collection_versions.bump(collection)
+
+
+async def _follow(stream, derived, state):
+    """Apply the changes of ``stream``, saving where it got to as it goes."""
+    await state.save_resume_token(stream.resume_token)
+    saved_at = time.monotonic()
+    while stream.alive:
+        change = await stream.try_next()
+        if change is not None:
+            await _apply(change, derived)
+        if change is not None or time.monotonic() - saved_at >= TOKEN_SAVE_INTERVAL:
+            await state.save_resume_token(stream.resume_token)
+            saved_at = time.monotonic()
+
+
+async def watch_collections(retry_delay: float = RETRY_DELAY):
+    """Keep derived data, the query cache and ETags in step with the collections.
+
+    Report changes update the hash lookup, the severity summaries and, when
+    enabled, the findings collection, and make the in-memory snapshot stale;
+    any change to a watched collection invalidates its cached query results
+    and bumps its version, which changes the ETags of the routes reading it.
+
+    The resume token is kept in MongoDB, so a restarted watcher, or another
+    replica, continues after the last change applied. Without a token to
+    continue from, changes may have been missed: the build markers are
+    dropped and the derived data is not read until it is rebuilt. A broken
+    stream is reopened after an exponentially growing delay. While it is
+    down the versions stop, so no ETags are issued and no derived data is
+    served.
+    """
+    derived = [AsyncVulnerabilityHashClient(), AsyncVulnerabilitySummaryClient()]
+    if findings_enabled():
+        derived.append(AsyncFindingClient())
+    state = AsyncDerivedStateClient()
+    collections = [*WATCHED_COLLECTIONS, STATE_COLLECTION]
+    pipeline = [
+        {
+            "$match": {
+                "ns.coll": {"$in": collections},
+                # Saving the token is not a change to react to
+                "$nor": [
+                    {"ns.coll": STATE_COLLECTION, "documentKey._id": RESUME_TOKEN_ID}
+                ],
+            }
+        }
+    ]
+    database = derived[0].get_reports_collection().database
+    lost, delay = False, retry_delay
+    while True:
+        try:
+            resume_token = None if lost else await state.get_resume_token()
+            async with await database.watch(
+                pipeline, full_document="updateLookup", resume_after=resume_token
+            ) as stream:
+                if resume_token is None:
+                    # Changes before now may be missing from the derived data
+                    await state.clear_built()
+                lost = False
+                collection_versions.start(built=await state.get_built())
+                delay = retry_delay
+                await _follow(stream, derived, state)
+        except OperationFailure as e:
+            if e.code in LOST_RESUME_CODES:
+                # The derived data is unused until `make rebuild-hashes
+                # rebuild-summaries rebuild-findings` brings it back in step
+                print(f"Warning: collection watcher lost its resume point: {e}")
+                lost = True
+            else:
+                # Change streams need a replica set
+                print(f"Warning: collection watcher stopped: {e}")
+        except PyMongoError as e:
+            print(f"Warning: collection watcher stopped: {e}")
+        finally:
+            # Unwatched collections can change unnoticed, so stop issuing ETags
+            collection_versions.stop()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, MAX_RETRY_DELAY)
@@ -1,13 +1,22 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager, suppress
 
 import sentry_sdk
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from pymongo.errors import PyMongoError
 
 from app.api.application import router as application_router
+from app.api.cache import router as cache_router
+from app.api.compression import CompressionMiddleware
 from app.api.exposedsecret import router as exposedsecret_router
 from app.api.health import router as health_router
+from app.api.image import router as image_router
+from app.api.ingest import router as ingest_router
+from app.api.metrics import MetricsMiddleware
+from app.api.metrics import router as metrics_router
 from app.api.namespace import router as namespace_router
 from app.api.pod import router as pod_router
 from app.api.sbom import router as sbom_router
@@ -15,6 +24,11 @@ from app.api.sentry import router as sentry_router
 from app.api.user import router as user_router
 from app.api.vulnerability import router as vulnerability_router
 from app.api.vulnerability_old import router as vulnerability_old_router
+from app.core.databaseClient import connection_manager
+from app.core.indexes import ensure_indexes
+from app.core.metrics import mongo_command_metrics
+from app.core.snapshot import vulnerability_snapshot
+from app.core.watcher import watch_collections
 
 # Load environment variables first
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
@@ -36,7 +50,57 @@ if sentry_dsn:
 else:
     print("Warning: SENTRY_DSN not found in environment variables")
 
-app = FastAPI(title="Trivy Ultimate Backend")
+metrics_enabled = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+if metrics_enabled:
+    # Before the shared clients are created, so every command is timed
+    connection_manager.add_event_listener(mongo_command_metrics)
+
+
+async def verify_indexes():
+    """Create missing indexes; problems are reported but do not block startup.
+
+    An unreachable server is given up on after MONGODB_STARTUP_TIMEOUT
+    seconds rather than the full server selection timeout.
+    """
+    timeout = float(os.getenv("MONGODB_STARTUP_TIMEOUT", "5"))
+    try:
+        results = await asyncio.to_thread(ensure_indexes, timeout=timeout)
+    except PyMongoError as e:
+        print(f"Warning: could not ensure MongoDB indexes: {e}")
+        return
+
+    for collection, result in results.items():
+        if "error" in result:
+            print(
+                f"Warning: could not ensure indexes on {collection}: {result['error']}"
+            )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One MongoClient (and connection pool) for the whole process
+    await connection_manager.aconnect()
+    if os.getenv("MONGODB_ENSURE_INDEXES", "true").lower() == "true":
+        await verify_indexes()
+
+    report_watcher = None
+    if os.getenv("VULNERABILITY_REPORT_WATCH", "true").lower() == "true":
+        report_watcher = asyncio.create_task(watch_collections())
+    snapshot_refresher = None
+    # Only served while the watcher runs, so without one it is never used
+    snapshot_enabled = os.getenv("VULNERABILITY_SNAPSHOT", "false").lower() == "true"
+    if report_watcher and snapshot_enabled:
+        snapshot_refresher = asyncio.create_task(vulnerability_snapshot.run())
+    yield
+    for task in (report_watcher, snapshot_refresher):
+        if task:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await connection_manager.aclose()
+
+
+app = FastAPI(title="Trivy Ultimate Backend", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +110,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true":
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024")),
+        encodings=os.getenv("RESPONSE_COMPRESSION_ENCODINGS", "zstd,br,gzip").split(
+            ","
+        ),
+    )
+
+if metrics_enabled:
+    # Outermost, so the timings include compression and the sizes are on the wire
+    app.add_middleware(MetricsMiddleware)
+
 
 @app.get("/", include_in_schema=False)
 async def root():
@@ -69,7 +146,12 @@ app.include_router(
 )
 
 app.include_router(pod_router, prefix="/pods", tags=["pods"])
+app.include_router(image_router, prefix="/images", tags=["images"])
 app.include_router(application_router, prefix="/application", tags=["application"])
 app.include_router(user_router, prefix="/users", tags=["users"])
 app.include_router(health_router, prefix="/health", tags=["health"])
+app.include_router(cache_router, prefix="/cache", tags=["cache"])
+app.include_router(ingest_router, prefix="/ingest", tags=["ingest"])
 app.include_router(sentry_router, prefix="/sentry", tags=["sentry"])
+if metrics_enabled:
+    app.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
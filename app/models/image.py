@@ -0,0 +1,23 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+from app.models.vulnerability import Vulnerability
+
+
+class ImagePod(BaseModel):
+    cluster: str = ""
+    namespace: str = ""
+    pod_id: str = ""
+
+
+class Image(BaseModel):
+    repository: str = ""
+    tag: str = ""
+    digest: str = ""
+    pods: List[ImagePod] = []
+    severity_counts: Dict[str, int] = {}
+
+
+class ImageVulnerabilities(Image):
+    vulnerabilities: List[Vulnerability] = []
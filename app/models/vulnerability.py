@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -23,3 +23,13 @@ class Vulnerability(BaseModel):
     namespace: str = ""
     description: str = ""
     vulnerabilities: List = []
+
+
+class VulnerabilityPage(BaseModel):
+    items: List[Vulnerability] = []
+    next_cursor: Optional[str] = None
+
+
+class GroupCount(BaseModel):
+    value: str
+    count: int
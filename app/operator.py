@@ -0,0 +1,114 @@
+"""Kopf operator writing trivy-operator reports, pods and namespaces to MongoDB.
+
+Run it next to the API, against the cluster the reports come from:
+
+    kopf run --all-namespaces -m app.operator
+
+Every watched object is queued and written in batches: every
+INGESTION_FLUSH_INTERVAL seconds, or as soon as INGESTION_BATCH_SIZE
+objects are waiting. Documents are tagged with CLUSTER_NAME. Rescans
+that leave a report's content unchanged are not written at all.
+
+Objects deleted while the operator is not watching send no event, so on
+startup and every INGESTION_RECONCILE_INTERVAL seconds the stored documents
+are checked against a listing of the cluster and those of objects that no
+longer exist are removed.
+"""
+
+import asyncio
+import os
+from contextlib import suppress
+
+import aiohttp
+import kopf
+from dotenv import load_dotenv
+from pymongo.errors import PyMongoError
+
+from app.core.databaseClient import connection_manager
+from app.core.ingestionClient import (
+    RESOURCES,
+    AsyncIngestionClient,
+    InvalidObjectError,
+)
+from app.core.kubernetesClient import KubernetesClient
+
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
+
+ingestion = None
+flusher = None
+reconciler = None
+
+
+@kopf.on.startup()
+async def start_ingestion(settings: kopf.OperatorSettings, **_):
+    global ingestion, flusher, reconciler
+    # Handlers only read; nothing is written back to the watched objects
+    settings.posting.enabled = False
+    await connection_manager.aconnect()
+    ingestion = AsyncIngestionClient()
+    flusher = asyncio.create_task(ingestion.run())
+
+    connection = kopf.login_with_service_account() or kopf.login_with_kubeconfig()
+    if connection is None:
+        print("Warning: no Kubernetes credentials, deleted objects are not reconciled")
+        return
+    reconciler = asyncio.create_task(run_reconciliation(KubernetesClient(connection)))
+
+
+@kopf.on.cleanup()
+async def stop_ingestion(**_):
+    # The flusher last, so that it writes what the others queued
+    for task in (reconciler, flusher):
+        if task:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await connection_manager.aclose()
+
+
+async def reconcile(kubernetes: KubernetesClient):
+    """Remove the documents of objects the cluster no longer lists."""
+    removed = {}
+    for kind, resource in RESOURCES.items():
+        # Read before listing, so objects created in between are kept
+        stored = await ingestion.stored_keys(kind)
+        listed = await kubernetes.list(resource)
+        removed[kind] = ingestion.reconcile(kind, stored, listed)
+    await ingestion.flush()
+    return removed
+
+
+async def run_reconciliation(kubernetes: KubernetesClient, interval: float = None):
+    """Reconcile now and then every ``interval`` seconds until cancelled."""
+    interval = interval or float(os.getenv("INGESTION_RECONCILE_INTERVAL", "3600"))
+    while True:
+        try:
+            await reconcile(kubernetes)
+        except (PyMongoError, aiohttp.ClientError) as e:
+            print(f"Warning: could not reconcile ingested objects: {e}")
+        await asyncio.sleep(interval)
+
+
+async def ingest_event(event, param, logger, **_):
+    """Queue a watch event; DELETED removes the object, anything else upserts it."""
+    try:
+        ingestion.queue(param, event["object"], deleted=event["type"] == "DELETED")
+    except InvalidObjectError as e:
+        logger.warning(f"Skipped {param} object: {e}")
+        return
+    if ingestion.pending() >= int(os.getenv("INGESTION_BATCH_SIZE", "500")):
+        try:
+            await ingestion.flush()
+        except PyMongoError as e:
+            # Requeued; the periodic flush retries
+            logger.warning(f"Could not write ingested objects: {e}")
+
+
+for kind, resource in RESOURCES.items():
+    kopf.on.event(
+        resource.group,
+        resource.version,
+        resource.plural,
+        id=f"ingest-{kind}",
+        param=kind,
+    )(ingest_event)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Measure the cost of serialising vulnerability list responses.
+
+Compares FastAPI's ``response_model`` path (validate, then encode) with
+the ``FAST_JSON_RESPONSES`` path (validate and dump with a cached
+``TypeAdapter``) on what the routes really return: the report dicts
+``_format`` builds for ``/vulnerabilities/`` and the ``Vulnerability``
+pages of ``/vulnerabilities/flatten``. No database is needed; the reports
+are generated.
+
+Usage:
+    python benchmark_serialization.py
+    python benchmark_serialization.py --findings 50000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add the project root to Python path to allow absolute imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+# Module imports after path setup (E402 exception for this case)
+from unittest.mock import patch  # noqa: E402
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+
+from app.api.responses import model_response  # noqa: E402
+from app.api.vulnerability import router  # noqa: E402
+from app.core.vulnerabilityClient import VulnerabilityClient  # noqa: E402
+from app.models.vulnerability import Vulnerability, VulnerabilityPage  # noqa: E402
+
+# Findings per generated report
+REPORT_SIZE = 20
+
+
+def make_reports(findings: int) -> list:
+    """Stored vulnerability reports holding ``findings`` findings in total."""
+    return [
+        {
+            "_uid": f"uid-{report}",
+            "_cluster": "cluster1",
+            "_namespace": "default",
+            "data": {
+                "metadata": {"uid": f"pod-{report}"},
+                "report": {
+                    "artifact": {"repository": "library/nginx"},
+                    "vulnerabilities": [
+                        {
+                            "title": f"Example vulnerability {i}",
+                            "fixedVersion": "1.2.4",
+                            "installedVersion": "1.2.3",
+                            "lastModifiedDate": "2024-01-01T00:00:00Z",
+                            "links": [f"https://example.com/CVE-2024-{i}"] * 3,
+                            "packagePURL": f"pkg:deb/debian/package{i}@1.2.3",
+                            "primaryLink": f"https://example.com/CVE-2024-{i}",
+                            "publishedDate": "2024-01-01T00:00:00Z",
+                            "resource": f"package{i}",
+                            "score": 7.5,
+                            "severity": "HIGH",
+                            "vulnerabilityID": f"CVE-2024-{i}",
+                        }
+                        for i in range(REPORT_SIZE)
+                    ],
+                },
+            },
+        }
+        for report in range(max(1, findings // REPORT_SIZE))
+    ]
+
+
+async def response_model_path(field, content) -> bytes:
+    content = await serialize_response(
+        field=field, response_content=content, is_coroutine=True
+    )
+    return JSONResponse(content).body
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def compare(name: str, field, annotation, content, count: int, repeat: int):
+    before = best_of(repeat, lambda: asyncio.run(response_model_path(field, content)))
+    after = best_of(repeat, lambda: model_response(annotation, content).body)
+
+    print(f"📊 {name}: {count} items, best of {repeat}")
+    print(f"   response_model: {before / count * 1e6:8.2f} µs/item")
+    print(f"   fast path:      {after / count * 1e6:8.2f} µs/item")
+    print(f"   speedup:        {before / after:8.1f}x")
+
+
+def main():
+    """Run both serialisation paths and print the cost per item."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark vulnerability list serialisation"
+    )
+    parser.add_argument("--findings", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["FAST_JSON_RESPONSES"] = "true"
+    fields = {route.path: route.response_field for route in router.routes}
+    with patch("app.core.databaseClient.connection_manager"):
+        client = VulnerabilityClient()
+    reports = make_reports(args.findings)
+
+    listing = [client._format(report) for report in reports]
+    compare(
+        "/vulnerabilities/",
+        fields["/"],
+        List[Vulnerability],
+        listing,
+        len(listing),
+        args.repeat,
+    )
+
+    items = [item for report in reports for item in client._format_flatten(report)]
+    page = VulnerabilityPage(items=items)
+    compare(
+        "/vulnerabilities/flatten",
+        fields["/flatten"],
+        VulnerabilityPage,
+        page,
+        len(items),
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Create and verify the MongoDB indexes declared by the SHIELD backend clients.
+
+Usage:
+    python manage_indexes.py            # create missing indexes, then report
+    python manage_indexes.py --check    # only report, do not create anything
+    python manage_indexes.py --rebuild-hashes --rebuild-summaries --rebuild-findings
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file in the app directory
+load_dotenv(dotenv_path=Path(__file__).parent / "app" / ".env")
+
+# Add the project root to Python path to allow absolute imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+# Module imports after path setup (E402 exception for this case)
+from app.core.findingClient import FindingClient  # noqa: E402
+from app.core.indexes import ensure_indexes, index_report  # noqa: E402
+from app.core.vulnerabilityHashClient import VulnerabilityHashClient  # noqa: E402
+from app.core.vulnerabilitySummaryClient import (  # noqa: E402
+    VulnerabilitySummaryClient,
+)
+
+
+def create_indexes() -> bool:
+    """Create the declared indexes.
+
+    Returns:
+        bool: True if every collection succeeded, False otherwise
+
+    """
+    success = True
+    for collection, result in ensure_indexes().items():
+        if "error" in result:
+            print(f"❌ {collection}: {result['error']}")
+            success = False
+        else:
+            print(f"✅ {collection}: {', '.join(result['indexes'])}")
+    return success
+
+
+def print_report() -> bool:
+    """Print missing and unused indexes per collection.
+
+    Returns:
+        bool: True if no declared index is missing, False otherwise
+
+    """
+    complete = True
+    for collection, report in index_report().items():
+        print(f"\n📋 {collection}")
+        if report["missing"]:
+            complete = False
+            print(f"   Missing: {', '.join(report['missing'])}")
+        else:
+            print("   Missing: none")
+        print(f"   Unused since mongod start: {', '.join(report['unused']) or 'none'}")
+    return complete
+
+
+def rebuild_hashes():
+    """Recompute the finding hash lookup used by /vulnerabilities-old/{hash}."""
+    print("🔄 Rebuilding vulnerability hash lookup...")
+    total = VulnerabilityHashClient().rebuild()
+    print(f"✅ Indexed {total} findings")
+
+
+def rebuild_summaries():
+    """Recompute the severity summaries used by /application."""
+    print("🔄 Rebuilding vulnerability summaries...")
+    total = VulnerabilitySummaryClient().rebuild()
+    print(f"✅ Summarised {total} reports")
+
+
+def rebuild_findings():
+    """Reflatten the reports into the findings collection."""
+    print("🔄 Rebuilding findings...")
+    total = FindingClient().rebuild()
+    print(f"✅ Flattened {total} findings")
+
+
+def main():
+    """Handle command line arguments and manage the indexes."""
+    parser = argparse.ArgumentParser(
+        description="Create and verify the MongoDB indexes of the SHIELD backend",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Create missing indexes and print the report
+  python manage_indexes.py
+
+  # Only report missing and unused indexes (exit code 1 if any are missing)
+  python manage_indexes.py --check
+
+  # Recompute the /vulnerabilities-old hash lookup from all reports
+  python manage_indexes.py --rebuild-hashes
+
+  # Recompute the severity summaries behind /application/dashboard and sidebar
+  python manage_indexes.py --rebuild-summaries
+
+  # Reflatten all reports into the findings collection
+  python manage_indexes.py --rebuild-findings
+        """,
+    )
+
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report missing and unused indexes, do not create them",
+    )
+
+    parser.add_argument(
+        "--rebuild-hashes",
+        action="store_true",
+        help="Recompute the vulnerability hash lookup from all reports",
+    )
+
+    parser.add_argument(
+        "--rebuild-summaries",
+        action="store_true",
+        help="Recompute the vulnerability severity summaries from all reports",
+    )
+
+    parser.add_argument(
+        "--rebuild-findings",
+        action="store_true",
+        help="Reflatten all reports into the findings collection",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        if not args.check:
+            print("🛠️  Creating indexes...")
+            if not create_indexes():
+                print("\n💥 Some indexes could not be created!")
+                sys.exit(1)
+
+        if args.rebuild_hashes:
+            rebuild_hashes()
+        if args.rebuild_summaries:
+            rebuild_summaries()
+        if args.rebuild_findings:
+            rebuild_findings()
+
+        complete = print_report()
+    except Exception as e:
+        print(f"❌ Error managing indexes: {str(e)}")
+        sys.exit(1)
+
+    if not complete:
+        print("\n💥 Some declared indexes are missing!")
+        sys.exit(1)
+    print("\n🎉 All declared indexes are present.")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,45 @@ from fastapi.testclient import TestClient
 os.environ["MONGODB_DB"] = "shield_test"
 os.environ["SENTRY_DSN"] = ""
 
+from app.core import metrics
+from app.core.cache import query_cache
+from app.core.ingestionClient import ingestion_stats
 from app.main import app
 
 
+@pytest.fixture(autouse=True)
+def clear_query_cache():
+    """Keep cached query results from leaking between tests."""
+    query_cache.reset()
+    yield
+    query_cache.reset()
+
+
+@pytest.fixture(autouse=True)
+def clear_ingestion_stats():
+    """Start every test with zero ingestion counters."""
+    ingestion_stats.reset()
+    yield
+    ingestion_stats.reset()
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    """Start every test without recorded metrics."""
+    recorded = (
+        metrics.http_request_duration,
+        metrics.http_requests_in_progress,
+        metrics.http_response_size,
+        metrics.mongodb_command_duration,
+        metrics.mongodb_command_failures,
+    )
+    for metric in recorded:
+        metric.clear()
+    yield
+    for metric in recorded:
+        metric.clear()
+
+
 @pytest.fixture
 def client():
     """Create a test client for the FastAPI app."""
@@ -94,32 +94,32 @@ class TestAPIIntegration:
             response = client.get(endpoint)
             assert response.status_code != 404, f"Endpoint {endpoint} not found"
 
-    @patch("app.core.exposedsecretClient.ExposedsecretClient.get_collection")
+    @patch("app.core.exposedsecretClient.AsyncExposedsecretClient.get_collection")
     def test_exposed_secrets_integration(self, mock_collection, client):
         """Integration test for exposed secrets endpoints."""
         # Mock the collection to return empty results
-        mock_collection.return_value.find.return_value = []
+        mock_collection.return_value.find.return_value.__aiter__.return_value = []
 
         response = client.get("/exposedsecrets/")
         assert response.status_code == 200
         # Response should be a list (even if empty due to mocking)
         assert isinstance(response.json(), list)
 
-    @patch("app.core.sbomClient.SbomClient.get_collection")
+    @patch("app.core.sbomClient.AsyncSbomClient.get_collection")
     def test_sbom_integration(self, mock_collection, client):
         """Integration test for SBOM endpoints."""
         # Mock the collection to return empty results
-        mock_collection.return_value.find.return_value = []
+        mock_collection.return_value.find.return_value.__aiter__.return_value = []
 
         response = client.get("/sbom/")
         assert response.status_code == 200
         assert isinstance(response.json(), list)
 
-    @patch("app.core.vulnerabilityClient.VulnerabilityClient.get_collection")
+    @patch("app.core.vulnerabilityClient.AsyncVulnerabilityClient.get_collection")
     def test_vulnerabilities_integration(self, mock_collection, client):
         """Integration test for vulnerabilities endpoints."""
         # Mock the collection to return empty results
-        mock_collection.return_value.find.return_value = []
+        mock_collection.return_value.find.return_value.__aiter__.return_value = []
 
         response = client.get("/vulnerabilities/")
         assert response.status_code == 200
@@ -0,0 +1,133 @@
+"""Integration tests for the operator against mongod and a Kubernetes API stand-in."""
+
+import logging
+import os
+
+import kopf
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from pymongo import MongoClient
+
+from app import operator
+from app.core.databaseClient import connection_manager
+from app.core.ingestionClient import RESOURCES, AsyncIngestionClient
+from app.core.kubernetesClient import KubernetesClient
+
+CLUSTER = "integration"
+
+
+def report(uid, namespace="ns1"):
+    return {
+        "apiVersion": "aquasecurity.github.io/v1alpha1",
+        "kind": "VulnerabilityReport",
+        "metadata": {"uid": uid, "namespace": namespace, "name": f"report-{uid}"},
+        "report": {"vulnerabilities": [{"vulnerabilityID": "CVE-1", "severity": "HIGH"}]},
+    }
+
+
+def pod(name):
+    return {"kind": "Pod", "metadata": {"name": name, "namespace": "ns1"}}
+
+
+def kube_api(objects):
+    """A Kubernetes API stand-in serving ``objects`` by list path, paginated."""
+
+    async def list_objects(request):
+        items = objects.get(request.path, [])
+        start = int(request.query.get("continue", "0"))
+        end = start + int(request.query["limit"])
+        metadata = {"continue": str(end)} if end < len(items) else {}
+        return web.json_response({"items": items[start:end], "metadata": metadata})
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", list_objects)
+    return TestServer(app)
+
+
+@pytest.fixture
+def database():
+    """The test database on mongod, without ingested documents."""
+    client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    database = client[os.getenv("MONGODB_DB", "shield")]
+    for kind in RESOURCES:
+        database.drop_collection(kind)
+
+    yield database
+
+    for kind in RESOURCES:
+        database.drop_collection(kind)
+    client.close()
+
+
+@pytest_asyncio.fixture
+async def ingestion(monkeypatch):
+    """The operator's ingestion client, tagging documents with CLUSTER."""
+    client = AsyncIngestionClient(cluster=CLUSTER)
+    monkeypatch.setattr(operator, "ingestion", client)
+    yield client
+    await connection_manager.aclose()
+
+
+class TestOperatorIntegration:
+
+    """Integration tests for event ingestion and reconciliation."""
+
+    @pytest.mark.asyncio
+    async def test_events_are_written(self, database, ingestion):
+        """Test watch events end up as upserted and deleted documents."""
+        logger = logging.getLogger("test")
+        for uid in ("r1", "r2"):
+            await operator.ingest_event(
+                event={"type": None, "object": report(uid)},
+                param="vulnerabilityreports",
+                logger=logger,
+            )
+        await operator.ingest_event(
+            event={"type": "DELETED", "object": report("r1")},
+            param="vulnerabilityreports",
+            logger=logger,
+        )
+        await ingestion.flush()
+
+        documents = list(database["vulnerabilityreports"].find({}, {"_id": 0}))
+        assert [document["_uid"] for document in documents] == ["r2"]
+        assert documents[0]["_cluster"] == CLUSTER
+
+        # A rescan with the same findings writes nothing
+        ingestion.queue("vulnerabilityreports", report("r2"))
+        assert await ingestion.flush() == {
+            "vulnerabilityreports": {"written": 0, "skipped": 1, "deleted": 0}
+        }
+
+    @pytest.mark.asyncio
+    async def test_objects_deleted_while_down_are_removed(self, database, ingestion):
+        """Test reconciliation removes what the cluster no longer lists."""
+        for uid in ("r1", "r2"):
+            ingestion.queue("vulnerabilityreports", report(uid))
+        for name in ("web-1", "web-2"):
+            ingestion.queue("pods", pod(name))
+        await ingestion.flush()
+        # Another cluster's documents are not this operator's to remove
+        database["vulnerabilityreports"].insert_one({"_uid": "r3", "_cluster": "other"})
+
+        server = kube_api(
+            {
+                "/apis/aquasecurity.github.io/v1alpha1/vulnerabilityreports": [
+                    report("r1"),
+                    report("r4"),
+                ],
+                "/api/v1/pods": [pod("web-1")],
+            }
+        )
+        async with server:
+            kubernetes = KubernetesClient(
+                kopf.ConnectionInfo(server=str(server.make_url("/"))), page_size=1
+            )
+            removed = await operator.reconcile(kubernetes)
+
+        assert removed["vulnerabilityreports"] == 1
+        assert removed["pods"] == 1
+        assert sorted(database["vulnerabilityreports"].distinct("_uid")) == ["r1", "r3"]
+        assert database["pods"].distinct("name") == ["web-1"]
@@ -1,12 +1,20 @@
 """Tests for application API module."""
 
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock
 
 import pytest
 from fastapi.testclient import TestClient
 
-from app.api.application import get_pod_client, get_vulnerability_client
+from app.api.application import (
+    get_pod_client,
+    get_summary_client,
+    get_vulnerability_client,
+)
+from app.core.derivedStateClient import SUMMARIES
+from app.core.snapshot import VulnerabilitySnapshot, vulnerability_snapshot
+from app.core.versions import collection_versions
 from app.main import app
+from app.models.vulnerability import Vulnerability
 
 
 class TestApplicationAPI:
@@ -16,29 +24,56 @@ class TestApplicationAPI:
     @pytest.fixture
     def mock_vulnerability_client(self):
         """Create a mock vulnerability client."""
-        mock_client = MagicMock()
-        mock_client.get_all.return_value = [
-            MagicMock(severity="CRITICAL"),
-            MagicMock(severity="HIGH"),
-            MagicMock(severity="MEDIUM"),
-        ]
+        mock_client = AsyncMock()
+        mock_client.count_vulnerabilities.return_value = {
+            "total": 3,
+            "CRITICAL": 1,
+            "HIGH": 1,
+            "MEDIUM": 1,
+            "LOW": 0,
+            "UNKNOWN": 0,
+        }
+        mock_client.get_severity_counts.return_value = {
+            "total": 3,
+            "CRITICAL": 1,
+            "HIGH": 1,
+            "MEDIUM": 1,
+            "LOW": 0,
+            "UNKNOWN": 0,
+        }
         return mock_client
 
     @pytest.fixture 
     def mock_pod_client(self):
         """Create a mock pod client."""
-        mock_client = MagicMock()
-        mock_client.get_all.return_value = [
-            MagicMock(namespace="test-ns1", cluster="test-cluster1"),
-            MagicMock(namespace="test-ns2", cluster="test-cluster2"),
-        ]
+        mock_client = AsyncMock()
+        mock_client.get_summary.return_value = {
+            "total": 2,
+            "namespaces": ["test-ns1", "test-ns2"],
+            "clusters": ["test-cluster1", "test-cluster2"],
+        }
         return mock_client
 
     @pytest.fixture
-    def test_client(self, mock_vulnerability_client, mock_pod_client):
+    def mock_summary_client(self):
+        """Create a mock summary client without materialised summaries."""
+        mock_client = AsyncMock()
+        mock_client.get_severity_counts.return_value = None
+        return mock_client
+
+    @pytest.fixture
+    def watching(self):
+        """Pretend the summaries were rebuilt and the watcher keeps them current."""
+        collection_versions.start(built=[SUMMARIES])
+        yield
+        collection_versions.stop()
+
+    @pytest.fixture
+    def test_client(self, mock_vulnerability_client, mock_pod_client, mock_summary_client):
         """Create test client with dependency overrides."""
         app.dependency_overrides[get_vulnerability_client] = lambda: mock_vulnerability_client
         app.dependency_overrides[get_pod_client] = lambda: mock_pod_client
+        app.dependency_overrides[get_summary_client] = lambda: mock_summary_client
         yield TestClient(app)
         app.dependency_overrides.clear()
 
@@ -61,7 +96,11 @@ class TestApplicationAPI:
 
         assert "vulnerability_total" in data
         assert data["vulnerability_total"] == 3  # Updated to match mock data
-        mock_vulnerability_client.get_all.assert_called()
+        assert "severity_counts" not in data
+        mock_vulnerability_client.count_vulnerabilities.assert_awaited_once_with(
+            cluster=None, namespace=None, by_severity=False
+        )
+        mock_vulnerability_client.get_all.assert_not_called()
 
     def test_sidebar_with_query_parameters(self, test_client, mock_vulnerability_client):
         """Test sidebar endpoint with query parameters."""
@@ -71,3 +110,126 @@ class TestApplicationAPI:
         assert response.status_code == 200
         data = response.json()
         assert "vulnerability_total" in data
+
+    def test_sidebar_severity_breakdown(self, test_client, mock_vulnerability_client):
+        """Test sidebar endpoint with the per-severity breakdown."""
+        response = test_client.get("/application/sidebar?by_severity=true")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["vulnerability_total"] == 3
+        assert data["severity_counts"] == {
+            "CRITICAL": 1,
+            "HIGH": 1,
+            "MEDIUM": 1,
+            "LOW": 0,
+            "UNKNOWN": 0,
+        }
+
+    def test_dashboard_uses_aggregations(self, test_client, mock_vulnerability_client, mock_pod_client):
+        """Test dashboard returns the aggregated counts without loading reports."""
+        response = test_client.get("/application/dashboard?cluster=test-cluster1")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["severity_counts"]["total"] == 3
+        assert data["severity_counts"]["CRITICAL"] == 1
+        assert data["pods"]["total"] == 2
+        assert sorted(data["pods"]["clusters"]) == ["test-cluster1", "test-cluster2"]
+        mock_vulnerability_client.get_severity_counts.assert_awaited_once_with(
+            cluster="test-cluster1", namespace=None
+        )
+        mock_pod_client.get_summary.assert_awaited_once_with(
+            cluster="test-cluster1", namespace=None
+        )
+        mock_vulnerability_client.get_all.assert_not_called()
+        mock_pod_client.get_all.assert_not_called()
+
+    def test_sidebar_reads_summaries(self, test_client, mock_vulnerability_client, mock_summary_client, watching):
+        """Test sidebar uses the materialised summaries when they exist."""
+        mock_summary_client.get_severity_counts.return_value = {
+            "total": 7,
+            "CRITICAL": 2,
+            "HIGH": 5,
+            "MEDIUM": 0,
+            "LOW": 0,
+            "UNKNOWN": 0,
+        }
+
+        response = test_client.get("/application/sidebar?namespace=ns1&by_severity=true")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["vulnerability_total"] == 7
+        assert data["severity_counts"]["HIGH"] == 5
+        mock_summary_client.get_severity_counts.assert_awaited_once_with(
+            cluster=None, namespace="ns1"
+        )
+        mock_vulnerability_client.count_vulnerabilities.assert_not_called()
+
+    def test_dashboard_reads_summaries(self, test_client, mock_vulnerability_client, mock_summary_client, watching):
+        """Test dashboard uses the materialised summaries when they exist."""
+        mock_summary_client.get_severity_counts.return_value = {
+            "total": 1,
+            "CRITICAL": 1,
+            "HIGH": 0,
+            "MEDIUM": 0,
+            "LOW": 0,
+            "UNKNOWN": 0,
+        }
+
+        response = test_client.get("/application/dashboard")
+
+        assert response.status_code == 200
+        assert response.json()["severity_counts"]["CRITICAL"] == 1
+        mock_vulnerability_client.get_severity_counts.assert_not_called()
+
+    def test_summaries_unused_without_watcher(self, test_client, mock_vulnerability_client, mock_summary_client):
+        """Test summaries are not read while nothing keeps them current."""
+        mock_summary_client.get_severity_counts.return_value = {"total": 99}
+
+        response = test_client.get("/application/sidebar")
+
+        assert response.json()["vulnerability_total"] == 3
+        mock_summary_client.get_severity_counts.assert_not_called()
+        mock_vulnerability_client.count_vulnerabilities.assert_awaited_once()
+
+    def test_summaries_unused_until_rebuilt(self, test_client, mock_vulnerability_client, mock_summary_client):
+        """Test summaries filled by the watcher alone are not read: they may be partial."""
+        collection_versions.start()
+        mock_summary_client.get_severity_counts.return_value = {"total": 10}
+        try:
+            response = test_client.get("/application/sidebar")
+        finally:
+            collection_versions.stop()
+
+        assert response.json()["vulnerability_total"] == 3
+        mock_summary_client.get_severity_counts.assert_not_called()
+
+    def test_summaries_disabled(self, test_client, mock_vulnerability_client, mock_summary_client, monkeypatch):
+        """Test VULNERABILITY_SUMMARIES=false always aggregates the reports."""
+        monkeypatch.setenv("VULNERABILITY_SUMMARIES", "false")
+
+        response = test_client.get("/application/sidebar")
+
+        assert response.status_code == 200
+        mock_summary_client.get_severity_counts.assert_not_called()
+        mock_vulnerability_client.count_vulnerabilities.assert_awaited_once()
+
+    def test_dashboard_reads_snapshot(self, test_client, mock_vulnerability_client, monkeypatch, watching):
+        """Test dashboard counts come from the snapshot without summaries."""
+        snapshot = VulnerabilitySnapshot(
+            [
+                Vulnerability(uid="a", namespace="ns1", severity="HIGH"),
+                Vulnerability(uid="a", namespace="ns1", severity="HIGH"),
+                Vulnerability(uid="b", namespace="ns2", severity="LOW"),
+            ]
+        )
+        monkeypatch.setattr(vulnerability_snapshot, "_snapshot", snapshot)
+
+        response = test_client.get("/application/dashboard?namespace=ns1")
+
+        assert response.status_code == 200
+        assert response.json()["severity_counts"]["total"] == 2
+        assert response.json()["severity_counts"]["HIGH"] == 2
+        mock_vulnerability_client.get_severity_counts.assert_not_called()
@@ -0,0 +1,40 @@
+"""Unit tests for cache API endpoints."""
+
+from app.core.cache import query_cache
+
+
+class TestCacheAPI:
+
+    """Test cases for Cache API endpoints."""
+
+    def test_cache_stats(self, client):
+        """Test GET /cache/ returns entry count and counters."""
+        query_cache.set("pods", "k", [], ttl=30)
+        query_cache.get("pods", "k")
+
+        response = client.get("/cache/")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["entries"] == 1
+        assert data["scopes"]["pods"]["hits"] == 1
+
+    def test_purge_scope(self, client):
+        """Test DELETE /cache/?scope= drops one collection's entries."""
+        query_cache.set("pods", "k", [], ttl=30)
+        query_cache.set("namespaces", "k", [], ttl=30)
+
+        response = client.delete("/cache/?scope=pods")
+
+        assert response.status_code == 200
+        assert response.json() == {"purged": 1}
+        assert query_cache.get("namespaces", "k")[0] is True
+
+    def test_purge_all(self, client):
+        """Test DELETE /cache/ drops everything."""
+        query_cache.set("pods", "k", [], ttl=30)
+        query_cache.set("namespaces", "k", [], ttl=30)
+
+        response = client.delete("/cache/")
+
+        assert response.json() == {"purged": 2}
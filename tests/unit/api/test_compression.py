@@ -0,0 +1,132 @@
+"""Unit tests for response compression."""
+
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.compression import CompressionMiddleware, GzipCompressor, negotiate
+
+LARGE = "x" * 4096
+
+
+@pytest.fixture
+def compressed_client():
+    """A small app behind CompressionMiddleware with a 1 KiB threshold."""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/large")
+    async def large():
+        return PlainTextResponse(LARGE)
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for i in range(3):
+                yield f"{i}{LARGE}\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/events")
+    async def events():
+        return PlainTextResponse(LARGE, media_type="text/event-stream")
+
+    @app.get("/encoded")
+    async def encoded():
+        body = zlib.compress(LARGE.encode())
+        return Response(body, headers={"Content-Encoding": "deflate"})
+
+    return TestClient(app)
+
+
+class TestNegotiate:
+
+    """Test cases for Accept-Encoding negotiation."""
+
+    @pytest.mark.parametrize(
+        "accept_encoding, expected",
+        [
+            ("gzip, deflate", "gzip"),
+            ("br;q=1.0, gzip;q=0.5", "br"),
+            ("gzip;q=0.5, br", "br"),
+            ("zstd, br, gzip", "zstd"),
+            ("gzip;q=0", None),
+            ("*", "zstd"),
+            ("identity", None),
+            ("", None),
+        ],
+    )
+    def test_negotiate(self, accept_encoding, expected):
+        """Test the client's q-values first, then the server's order."""
+        assert negotiate(accept_encoding, ["zstd", "br", "gzip"]) == expected
+
+
+class TestCompressionMiddleware:
+
+    """Test cases for CompressionMiddleware."""
+
+    def test_large_response_is_gzipped(self, compressed_client):
+        """Test a response above the threshold is compressed."""
+        response = compressed_client.get(
+            "/large", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(LARGE)
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.text == LARGE
+
+    def test_small_response_is_not_compressed(self, compressed_client):
+        """Test a response below the threshold is sent as is."""
+        response = compressed_client.get(
+            "/small", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert "content-encoding" not in response.headers
+        assert response.text == "tiny"
+
+    def test_identity_when_not_accepted(self, compressed_client):
+        """Test nothing is compressed for clients without a shared encoding."""
+        response = compressed_client.get(
+            "/large", headers={"Accept-Encoding": "identity"}
+        )
+
+        assert "content-encoding" not in response.headers
+        assert response.text == LARGE
+
+    def test_stream_is_compressed(self, compressed_client):
+        """Test a streaming response is compressed without a Content-Length."""
+        response = compressed_client.get(
+            "/stream", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text == "".join(f"{i}{LARGE}\n" for i in range(3))
+
+    def test_gzip_flushes_every_chunk(self):
+        """Test each streamed chunk can be decompressed as soon as it is sent."""
+        compressor = GzipCompressor()
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        first = compressor.compress(b"line 1\n", more_body=True)
+        assert decompressor.decompress(first) == b"line 1\n"
+
+        last = compressor.compress(b"line 2\n", more_body=False)
+        assert decompressor.decompress(last) == b"line 2\n"
+        assert decompressor.eof
+
+    @pytest.mark.parametrize("path", ["/events", "/encoded"])
+    def test_left_alone(self, compressed_client, path):
+        """Test event streams and already encoded responses are not compressed."""
+        response = compressed_client.get(path, headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers.get("content-encoding") != "gzip"
+        assert "vary" not in response.headers
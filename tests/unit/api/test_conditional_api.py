@@ -0,0 +1,110 @@
+"""Unit tests for conditional GET with ETags."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.api.conditional import etag_matches
+from app.api.namespace import get_namespace_client
+from app.api.pod import get_pod_client
+from app.core.versions import collection_versions
+from app.models.namespace import Namespace
+from app.models.pod import Pod
+
+
+@pytest.fixture
+def tracked_versions():
+    """Versions as handed out while the change stream watcher runs."""
+    collection_versions.start()
+    yield collection_versions
+    collection_versions.stop()
+
+
+@pytest.fixture
+def namespace_client(client):
+    """Override get_namespace_client with a mock client."""
+    mock_client = AsyncMock()
+    mock_client.get_all.return_value = [Namespace(name="ns1", cluster="c1")]
+    client.app.dependency_overrides[get_namespace_client] = lambda: mock_client
+    yield mock_client
+    client.app.dependency_overrides.clear()
+
+
+class TestEtagMatches:
+
+    """Test cases for etag_matches."""
+
+    @pytest.mark.parametrize(
+        "if_none_match, expected",
+        [
+            ('W/"abc"', True),
+            ('"abc"', True),
+            ('"xyz", W/"abc"', True),
+            ("*", True),
+            ('"xyz"', False),
+            ("", False),
+        ],
+    )
+    def test_etag_matches(self, if_none_match, expected):
+        """Test the weak comparison used by If-None-Match."""
+        assert etag_matches(if_none_match, 'W/"abc"') is expected
+
+
+class TestConditionalGet:
+
+    """Test cases for ETag and If-None-Match handling."""
+
+    def test_no_etag_without_change_tracking(self, client, namespace_client):
+        """Test no ETag is sent when changes are not watched."""
+        response = client.get("/namespaces/")
+
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+
+    def test_not_modified(self, client, namespace_client, tracked_versions):
+        """Test a matching If-None-Match is answered without querying."""
+        etag = client.get("/namespaces/").headers["etag"]
+
+        response = client.get("/namespaces/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+        namespace_client.get_all.assert_awaited_once()
+
+    def test_modified_after_change(self, client, namespace_client, tracked_versions):
+        """Test a change to the collection makes the old ETag stale."""
+        etag = client.get("/namespaces/").headers["etag"]
+        tracked_versions.bump("namespaces")
+
+        response = client.get("/namespaces/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()[0]["name"] == "ns1"
+
+    def test_etag_depends_on_filters(self, client, namespace_client, tracked_versions):
+        """Test another filter of the same collection gets its own ETag."""
+        etag = client.get("/namespaces/").headers["etag"]
+
+        response = client.get(
+            "/namespaces/?cluster=c1", headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == 200
+
+    def test_etag_on_ready_responses(self, client, tracked_versions):
+        """Test routes returning a ready Response still send the ETag."""
+        mock_client = AsyncMock()
+        mock_client.get_all.return_value = [Pod(name="pod1")]
+        client.app.dependency_overrides[get_pod_client] = lambda: mock_client
+
+        try:
+            response = client.get("/pods/?fields=name")
+            etag = response.headers["etag"]
+            cached = client.get("/pods/?fields=name", headers={"If-None-Match": etag})
+        finally:
+            client.app.dependency_overrides.clear()
+
+        assert response.json() == [{"name": "pod1"}]
+        assert cached.status_code == 304
@@ -1,6 +1,6 @@
 """Unit tests for exposedsecret API endpoints."""
 
-from unittest.mock import Mock
+from unittest.mock import AsyncMock
 
 import pytest
 
@@ -15,7 +15,7 @@ class TestExposedSecretAPI:
     @pytest.fixture
     def mock_client_dependency(self):
         """Mock the get_exposedsecret_client dependency."""
-        mock_client = Mock()
+        mock_client = AsyncMock()
         return mock_client
 
     def test_list_exposedsecrets_no_filters(self, client, mock_client_dependency):
@@ -44,7 +44,7 @@ class TestExposedSecretAPI:
         assert data[0]["uid"] == "uid1"
         assert data[1]["uid"] == "uid2"
         mock_client_dependency.get_all.assert_called_once_with(
-            namespace=None, cluster=None
+            namespace=None, cluster=None, fields=None
         )
 
     def test_list_exposedsecrets_with_namespace_filter(
@@ -72,7 +72,7 @@ class TestExposedSecretAPI:
         assert len(data) == 1
         assert data[0]["namespace"] == "test-ns"
         mock_client_dependency.get_all.assert_called_once_with(
-            namespace="test-ns", cluster=None
+            namespace="test-ns", cluster=None, fields=None
         )
 
     def test_list_exposedsecrets_with_cluster_filter(
@@ -100,7 +100,7 @@ class TestExposedSecretAPI:
         assert len(data) == 1
         assert data[0]["cluster"] == "test-cluster"
         mock_client_dependency.get_all.assert_called_once_with(
-            namespace=None, cluster="test-cluster"
+            namespace=None, cluster="test-cluster", fields=None
         )
 
     def test_list_exposedsecrets_with_both_filters(
@@ -129,7 +129,7 @@ class TestExposedSecretAPI:
         data = response.json()
         assert len(data) == 1
         mock_client_dependency.get_all.assert_called_once_with(
-            namespace="test-ns", cluster="test-cluster"
+            namespace="test-ns", cluster="test-cluster", fields=None
         )
 
     def test_show_exposedsecret_found(self, client, mock_client_dependency):
@@ -199,7 +199,7 @@ class TestExposedSecretAPI:
     def test_dependency_injection_working(self, client):
         """Test that dependency injection is properly configured."""
         # This test verifies that the dependency injection setup is working
-        mock_client = Mock()
+        mock_client = AsyncMock()
         mock_client.get_all.return_value = []
 
         # Override the dependency
@@ -0,0 +1,90 @@
+"""Unit tests for image API endpoints."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.api.image import get_image_client
+from app.models.image import Image, ImagePod, ImageVulnerabilities
+from app.models.vulnerability import Vulnerability
+
+
+class TestImageAPI:
+
+    """Test cases for Image API endpoints."""
+
+    @pytest.fixture
+    def mock_client_dependency(self):
+        """Mock the get_image_client dependency."""
+        return AsyncMock()
+
+    def test_list_images(self, client, mock_client_dependency):
+        """Test GET /images/ returns per-image severity counts."""
+        mock_client_dependency.get_images.return_value = [
+            Image(
+                repository="library/nginx",
+                tag="1.25",
+                pods=[ImagePod(cluster="c1", namespace="ns1", pod_id="pod1")],
+                severity_counts={"total": 2, "HIGH": 1, "LOW": 1},
+            )
+        ]
+        client.app.dependency_overrides[get_image_client] = (
+            lambda: mock_client_dependency
+        )
+
+        try:
+            response = client.get("/images/?cluster=c1")
+        finally:
+            client.app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data[0]["repository"] == "library/nginx"
+        assert data[0]["severity_counts"]["total"] == 2
+        assert data[0]["pods"][0]["pod_id"] == "pod1"
+        mock_client_dependency.get_images.assert_called_once_with(
+            namespace=None, cluster="c1"
+        )
+
+    def test_show_image_vulnerabilities(self, client, mock_client_dependency):
+        """Test GET /images/vulnerabilities returns the findings once."""
+        mock_client_dependency.get_image.return_value = ImageVulnerabilities(
+            repository="library/nginx",
+            tag="1.25",
+            vulnerabilities=[Vulnerability(vulnerabilityID="CVE-1")],
+        )
+        client.app.dependency_overrides[get_image_client] = (
+            lambda: mock_client_dependency
+        )
+
+        try:
+            response = client.get(
+                "/images/vulnerabilities?repository=library/nginx&tag=1.25"
+            )
+        finally:
+            client.app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json()["vulnerabilities"][0]["vulnerabilityID"] == "CVE-1"
+        mock_client_dependency.get_image.assert_called_once_with(
+            "library/nginx", tag="1.25", digest=None
+        )
+
+    def test_show_image_vulnerabilities_not_found(self, client, mock_client_dependency):
+        """Test GET /images/vulnerabilities with an unknown image."""
+        mock_client_dependency.get_image.return_value = None
+        client.app.dependency_overrides[get_image_client] = (
+            lambda: mock_client_dependency
+        )
+
+        try:
+            response = client.get("/images/vulnerabilities?repository=library/redis")
+        finally:
+            client.app.dependency_overrides.clear()
+
+        assert response.status_code == 404
+
+    def test_show_image_vulnerabilities_requires_repository(self, client):
+        """Test the repository parameter is required."""
+        response = client.get("/images/vulnerabilities")
+        assert response.status_code == 422
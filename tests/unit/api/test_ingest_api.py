@@ -0,0 +1,167 @@
+"""Unit tests for the /ingest endpoint."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pymongo import ReplaceOne
+from pymongo.errors import AutoReconnect
+
+from app.api.ingest import get_ingestion_client, ndjson_lines
+from app.core.ingestionClient import AsyncIngestionClient, report_digest
+
+
+def report(uid):
+    return {"metadata": {"uid": uid, "namespace": "ns1"}, "report": {}}
+
+
+def ndjson(*objects):
+    return "".join(json.dumps(obj) + "\n" for obj in objects).encode()
+
+
+class TestIngestAPI:
+
+    """Test cases for POST /ingest/{kind}."""
+
+    @pytest.fixture
+    def collection(self, client):
+        """The mocked collection behind the ingestion client."""
+        collection = MagicMock(bulk_write=AsyncMock())
+
+        def get_ingestion(cluster=None):
+            with patch("app.core.databaseClient.connection_manager"):
+                ingestion = AsyncIngestionClient(cluster=cluster or "edge")
+            ingestion.get_collection = lambda kind: collection
+            return ingestion
+
+        client.app.dependency_overrides[get_ingestion_client] = get_ingestion
+        yield collection
+        client.app.dependency_overrides.clear()
+
+    def test_batches(self, client, collection):
+        """Test objects are written in unordered batches of batch_size."""
+        body = ndjson(*(report(f"r{i}") for i in range(5)))
+
+        response = client.post("/ingest/vulnerabilityreports?batch_size=2", content=body)
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "kind": "vulnerabilityreports",
+            "batches": [
+                {"received": 2, "written": 2, "skipped": 0, "deleted": 0},
+                {"received": 2, "written": 2, "skipped": 0, "deleted": 0},
+                {"received": 1, "written": 1, "skipped": 0, "deleted": 0},
+            ],
+            "written": 5,
+            "skipped": 0,
+            "invalid": 0,
+            "invalid_lines": [],
+        }
+        assert collection.bulk_write.await_count == 3
+        first = collection.bulk_write.await_args_list[0]
+        assert first.args[0][0] == ReplaceOne(
+            {"_uid": "r0"},
+            {
+                "_uid": "r0",
+                "_cluster": "edge",
+                "_namespace": "ns1",
+                "_digest": report_digest(report("r0")["report"], "edge", "ns1"),
+                "data": report("r0"),
+            },
+            upsert=True,
+        )
+        assert first.kwargs == {"ordered": False}
+
+    def test_invalid_lines_are_skipped(self, client, collection):
+        """Test malformed JSON and objects without a uid are reported, not written."""
+        body = ndjson(report("r1")) + b"{not json\n\n" + ndjson([1], {"metadata": {}})
+
+        response = client.post("/ingest/sbomreports", content=body)
+
+        assert response.json()["written"] == 1
+        assert response.json()["invalid"] == 3
+        assert response.json()["invalid_lines"] == [2, 4, 5]
+
+    def test_invalid_lines_are_capped(self, client, collection, monkeypatch):
+        """Test overlong lines are invalid and only the first line numbers listed."""
+        monkeypatch.setattr("app.api.ingest.MAX_INVALID_LINES", 2)
+        monkeypatch.setenv("INGESTION_MAX_LINE_BYTES", "1000")
+        body = ndjson(report("r1"), {"padding": "x" * 1000}) + b"[]\n" * 3
+
+        response = client.post("/ingest/sbomreports", content=body)
+
+        assert response.json()["written"] == 1
+        assert response.json()["invalid"] == 4
+        assert response.json()["invalid_lines"] == [2, 3]
+
+    def test_duplicates_in_a_batch_are_written_once(self, client, collection):
+        """Test the latest line per object wins within a batch."""
+        response = client.post(
+            "/ingest/exposedsecretreports", content=ndjson(report("r1"), report("r1"))
+        )
+
+        assert response.json()["batches"] == [
+            {"received": 2, "written": 1, "skipped": 0, "deleted": 0}
+        ]
+
+    def test_unchanged_reports_are_counted(self, client, collection):
+        """Test unchanged reports are skipped and show up in the counters."""
+        digest = report_digest(report("r1")["report"], "edge", "ns1")
+        collection.find.return_value.__aiter__.return_value = [
+            {"_uid": "r1", "_digest": digest}
+        ]
+
+        response = client.post(
+            "/ingest/vulnerabilityreports", content=ndjson(report("r1"), report("r2"))
+        )
+
+        assert response.json()["written"] == 1
+        assert response.json()["skipped"] == 1
+        assert client.get("/ingest/").json() == {
+            "vulnerabilityreports": {"written": 1, "skipped": 1, "deleted": 0}
+        }
+
+    def test_unknown_kind(self, client, collection):
+        """Test kinds without a collection are a 404."""
+        response = client.post("/ingest/configauditreports", content=b"{}\n")
+
+        assert response.status_code == 404
+        collection.bulk_write.assert_not_called()
+
+    def test_database_error(self, client, collection):
+        """Test a failed bulk_write is a 503 naming the batches already written."""
+        collection.bulk_write.side_effect = [None, AutoReconnect("down")]
+        body = ndjson(report("r1"), report("r2"))
+
+        response = client.post("/ingest/vulnerabilityreports?batch_size=1", content=body)
+
+        assert response.status_code == 503
+        assert "after 1 batches" in response.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_ndjson_lines_across_chunks(self):
+        """Test lines split over several chunks are put back together."""
+
+        async def chunks():
+            for chunk in [b'{"a":', b' 1}\n{"b"', b": 2}\n", b'{"c": 3}']:
+                yield chunk
+
+        assert [line async for line in ndjson_lines(chunks())] == [
+            b'{"a": 1}',
+            b'{"b": 2}',
+            b'{"c": 3}',
+        ]
+
+    @pytest.mark.asyncio
+    async def test_ndjson_lines_too_long(self):
+        """Test a line over max_length is yielded as None, the next one intact."""
+
+        async def chunks():
+            for chunk in [b"ab", b"cdef", b"gh\nij\nklmn", b"opq"]:
+                yield chunk
+
+        assert [line async for line in ndjson_lines(chunks(), max_length=4)] == [
+            None,
+            b"ij",
+            None,
+        ]
@@ -0,0 +1,98 @@
+"""Unit tests for the /metrics endpoint and the metrics middleware."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from app.api.metrics import MetricsMiddleware, router
+from app.api.vulnerability import get_vulnerability_client
+from app.models.vulnerability import VulnerabilityPage
+
+
+@pytest.fixture
+def metrics_client():
+    """A small app behind MetricsMiddleware exposing /metrics."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(router, prefix="/metrics")
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        return PlainTextResponse("x" * 300)
+
+    return TestClient(app)
+
+
+class TestMetricsAPI:
+
+    """Test requests are recorded per route template and exposed."""
+
+    def test_route_templates_label_requests(self, metrics_client):
+        """Test requests are labelled by template, unknown paths as unmatched."""
+        metrics_client.get("/items/1")
+        metrics_client.get("/items/2")
+        metrics_client.get("/missing")
+        metrics_client.post("/items/3")
+
+        body = metrics_client.get("/metrics").text
+
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"} 2.0'
+            in body
+        )
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1.0'
+            in body
+        )
+        assert (
+            'http_request_duration_seconds_count{method="POST",route="/items/{item_id}",status="405"} 1.0'
+            in body
+        )
+        assert "/items/1" not in body
+
+    def test_response_sizes_and_in_progress(self, metrics_client):
+        """Test body bytes are observed and finished requests leave the gauge."""
+        metrics_client.get("/items/1")
+
+        body = metrics_client.get("/metrics").text
+
+        assert (
+            'http_response_size_bytes_bucket{le="256.0",method="GET",route="/items/{item_id}"} 0.0'
+            in body
+        )
+        assert (
+            'http_response_size_bytes_sum{method="GET",route="/items/{item_id}"} 300.0'
+            in body
+        )
+        assert 'http_requests_in_progress{method="GET",route="/items/{item_id}"} 0.0' in body
+        # The scrape itself is still in flight while the body is rendered
+        assert 'http_requests_in_progress{method="GET",route="/metrics"} 1.0' in body
+
+    def test_exposition_format(self, metrics_client):
+        """Test the content type and the threadpool gauge Prometheus scrapes."""
+        response = metrics_client.get("/metrics")
+
+        assert response.headers["content-type"] == CONTENT_TYPE_LATEST
+        assert "# TYPE threadpool_threads gauge" in response.text
+        assert 'threadpool_threads{state="capacity"} 40.0' in response.text
+
+    def test_application_routes_are_measured(self, client):
+        """Test the application records /vulnerabilities/flatten by template."""
+        mock_client = AsyncMock()
+        mock_client.get_flattened_page.return_value = VulnerabilityPage(items=[])
+        client.app.dependency_overrides[get_vulnerability_client] = lambda: mock_client
+        try:
+            client.get("/vulnerabilities/flatten?limit=1")
+        finally:
+            client.app.dependency_overrides.clear()
+
+        body = client.get("/metrics").text
+
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/vulnerabilities/flatten",status="200"} 1.0'
+            in body
+        )
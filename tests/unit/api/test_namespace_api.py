@@ -1,12 +1,12 @@
 """Tests for namespace API module."""
 
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from fastapi.testclient import TestClient
 
 from app.api.namespace import get_namespace_client
-from app.core.namespaceClient import NamespaceClient
+from app.core.namespaceClient import AsyncNamespaceClient
 from app.main import app
 from app.models.namespace import Namespace
 
@@ -23,7 +23,7 @@ class TestNamespaceAPI:
     @pytest.fixture
     def mock_namespace_client(self):
         """Create mock namespace client."""
-        return Mock(spec=NamespaceClient)
+        return Mock(spec=AsyncNamespaceClient)
 
     @pytest.fixture
     def sample_namespace(self):
@@ -179,7 +179,7 @@ class TestNamespaceAPI:
     def test_namespaces_database_error_handling(self, client):
         """Test namespaces endpoint handles database errors gracefully."""
         # Mock the client to raise an exception
-        mock_client_instance = Mock()
+        mock_client_instance = AsyncMock()
         mock_client_instance.get_all.side_effect = Exception(
             "Database connection failed"
         )
@@ -1,12 +1,12 @@
 """Tests for pod API module."""
 
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from fastapi.testclient import TestClient
 
 from app.api.pod import get_pod_client
-from app.core.podClient import PodClient
+from app.core.podClient import AsyncPodClient
 from app.main import app
 from app.models.pod import Pod
 
@@ -23,7 +23,7 @@ class TestPodAPI:
     @pytest.fixture
     def mock_pod_client(self):
         """Create mock pod client."""
-        return Mock(spec=PodClient)
+        return Mock(spec=AsyncPodClient)
 
     @pytest.fixture
     def sample_pod(self):
@@ -58,6 +58,22 @@ class TestPodAPI:
         assert data[0]["name"] == "test-pod"
         assert data[0]["kind"] == "Deployment"
 
+    def test_get_all_pods_fields(self, client, mock_pod_client, sample_pod):
+        """Test GET /pods?fields= returns only the requested fields."""
+        mock_pod_client.get_all.return_value = [sample_pod]
+        client.app.dependency_overrides[get_pod_client] = lambda: mock_pod_client
+
+        try:
+            response = client.get("/pods?fields=name,namespace")
+        finally:
+            client.app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json() == [{"name": "test-pod", "namespace": "test-namespace"}]
+        mock_pod_client.get_all.assert_called_once_with(
+            namespace=None, cluster=None, fields=("name", "namespace")
+        )
+
     def test_get_all_pods_empty(self, client, mock_pod_client):
         """Test GET /pods endpoint with no pods."""
         mock_pod_client.get_all.return_value = []
@@ -236,7 +252,7 @@ class TestPodAPI:
 
     def test_pods_database_error_handling(self, client):
         """Test pods endpoint handles database errors gracefully."""
-        mock_client_instance = Mock()
+        mock_client_instance = AsyncMock()
         mock_client_instance.get_all.side_effect = Exception(
             "Database connection failed"
         )
@@ -1,6 +1,6 @@
 """Unit tests for SBOM API endpoints."""
 
-from unittest.mock import Mock
+from unittest.mock import AsyncMock
 
 import pytest
 
@@ -15,7 +15,7 @@ class TestSBOMAPI:
     @pytest.fixture
     def mock_client_dependency(self):
         """Mock the get_sbom_client dependency."""
-        mock_client = Mock()
+        mock_client = AsyncMock()
         return mock_client
 
     def test_list_sbom_no_filters(self, client, mock_client_dependency):
@@ -43,7 +43,7 @@ class TestSBOMAPI:
         assert data[0]["uid"] == "sbom1"
         assert data[1]["uid"] == "sbom2"
         mock_client_dependency.get_all.assert_called_once_with(
-            namespace=None, cluster=None
+            namespace=None, cluster=None, fields=None
         )
 
     def test_list_sbom_with_namespace_filter(self, client, mock_client_dependency):
@@ -67,7 +67,7 @@ class TestSBOMAPI:
         assert len(data) == 1
         assert data[0]["namespace"] == "test-ns"
         mock_client_dependency.get_all.assert_called_once_with(
-            namespace="test-ns", cluster=None
+            namespace="test-ns", cluster=None, fields=None
         )
 
     def test_list_sbom_with_cluster_filter(self, client, mock_client_dependency):
@@ -91,7 +91,7 @@ class TestSBOMAPI:
         assert len(data) == 1
         assert data[0]["cluster"] == "test-cluster"
         mock_client_dependency.get_all.assert_called_once_with(
-            namespace=None, cluster="test-cluster"
+            namespace=None, cluster="test-cluster", fields=None
         )
 
     def test_show_sbom_found(self, client, mock_client_dependency):
@@ -181,7 +181,7 @@ class TestSBOMAPI:
 
     def test_dependency_injection_working(self, client):
         """Test that dependency injection is properly configured."""
-        mock_client = Mock()
+        mock_client = AsyncMock()
         mock_client.get_all.return_value = []
 
         # Override the dependency
@@ -5,7 +5,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from app.api.user import get_user_client
-from app.core.userClient import UserClient
+from app.core.userClient import AsyncUserClient
 from app.main import app
 from app.models.user import CreateUserRequest, Role, User, UserStats
 
@@ -13,7 +13,7 @@ from app.models.user import CreateUserRequest, Role, User, UserStats
 @pytest.fixture
 def mock_user_client():
     """Create a mock user client."""
-    return Mock(spec=UserClient)
+    return Mock(spec=AsyncUserClient)
 
 
 @pytest.fixture
@@ -1,9 +1,10 @@
 """Unit tests for vulnerability API endpoints."""
 
-from unittest.mock import Mock
+from unittest.mock import AsyncMock
 
 import pytest
 
+from app.api import vulnerability_old
 from app.api.vulnerability import get_vulnerability_client
 from app.models.vulnerability import Vulnerability
 
@@ -15,7 +16,7 @@ class TestVulnerabilityAPI:
     @pytest.fixture
     def mock_client_dependency(self):
         """Mock the get_vulnerability_client dependency."""
-        mock_client = Mock()
+        mock_client = AsyncMock()
         return mock_client
 
 
@@ -72,7 +73,7 @@ class TestVulnerabilityAPI:
 
     def test_dependency_injection_working(self, client):
         """Test that dependency injection is properly configured."""
-        mock_client = Mock()
+        mock_client = AsyncMock()
         mock_client.get_all.return_value = []
 
         # Override the dependency
@@ -90,7 +91,7 @@ class TestVulnerabilityAPI:
 
     def test_dependency_injection_working(self, client):
         """Test that dependency injection is properly configured."""
-        mock_client = Mock()
+        mock_client = AsyncMock()
         mock_client.get_all.return_value = []
 
         # Override the dependency
@@ -105,3 +106,24 @@ class TestVulnerabilityAPI:
         assert response.status_code == 200
         # Verify the mock was called
         mock_client.get_all.assert_called_once()
+
+
+class TestOldVulnerabilityAPI:
+
+    """Test cases for the /vulnerabilities-old endpoints."""
+
+    def test_show_vulnerability_not_found(self, client):
+        """Test an unknown hash is a 404 rather than an invalid response."""
+        mock_client = AsyncMock()
+        mock_client.get_by_hash.return_value = None
+        client.app.dependency_overrides[vulnerability_old.get_vulnerability_client] = (
+            lambda: mock_client
+        )
+
+        try:
+            response = client.get("/vulnerabilities-old/missing")
+        finally:
+            client.app.dependency_overrides.clear()
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Vulnerability not found"
@@ -1,11 +1,16 @@
 """Unit tests for vulnerability API endpoints."""
 
-from unittest.mock import Mock
+import warnings
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
-from app.api.vulnerability import get_vulnerability_client
-from app.models.vulnerability import Vulnerability
+from app.api.vulnerability import get_finding_client, get_vulnerability_client
+from app.core.derivedStateClient import FINDINGS
+from app.core.snapshot import VulnerabilitySnapshot, vulnerability_snapshot
+from app.core.versions import collection_versions
+from app.core.vulnerabilityClient import VulnerabilityClient
+from app.models.vulnerability import Vulnerability, VulnerabilityPage
 
 
 class TestVulnerabilityAPI:
@@ -15,7 +20,7 @@ class TestVulnerabilityAPI:
     @pytest.fixture
     def mock_client_dependency(self):
         """Mock the get_vulnerability_client dependency."""
-        mock_client = Mock()
+        mock_client = AsyncMock()
         return mock_client
 
     def test_list_vulnerabilities_no_filters(self, client, mock_client_dependency):
@@ -43,7 +48,13 @@ class TestVulnerabilityAPI:
         assert data[0]["vulnerabilityID"] == "CVE-1"
         assert data[1]["vulnerabilityID"] == "CVE-2"
         mock_client_dependency.get_all.assert_called_once_with(
-            namespace=None, cluster=None, severity=None
+            namespace=None,
+            cluster=None,
+            severity=None,
+            fixed=None,
+            min_score=None,
+            resource=None,
+            fields=None,
         )
 
     def test_list_vulnerabilities_with_filters(self, client, mock_client_dependency):
@@ -77,7 +88,13 @@ class TestVulnerabilityAPI:
         assert len(data) == 1
         assert data[0]["severity"] == "HIGH"
         mock_client_dependency.get_all.assert_called_once_with(
-            namespace="test-ns", cluster="test-cluster", severity="HIGH"
+            namespace="test-ns",
+            cluster="test-cluster",
+            severity="HIGH",
+            fixed=None,
+            min_score=None,
+            resource=None,
+            fields=None,
         )
 
     def test_show_vulnerability_found(self, client, mock_client_dependency):
@@ -156,7 +173,13 @@ class TestVulnerabilityAPI:
         assert len(data) == 1
         assert data[0]["severity"] == "CRITICAL"
         mock_client_dependency.get_all.assert_called_once_with(
-            namespace=None, cluster=None, severity="CRITICAL"
+            namespace=None,
+            cluster=None,
+            severity="CRITICAL",
+            fixed=None,
+            min_score=None,
+            resource=None,
+            fields=None,
         )
 
     def test_list_vulnerabilities_empty_result(self, client, mock_client_dependency):
@@ -178,9 +201,34 @@ class TestVulnerabilityAPI:
         data = response.json()
         assert data == []
 
+    def test_list_vulnerabilities_fields(self, client, mock_client_dependency):
+        """Test fields= only accepts the keys a report entry carries."""
+        mock_client_dependency.get_all.return_value = [
+            {"uid": "uid1", "namespace": "ns1", "target": "nginx"}
+        ]
+        client.app.dependency_overrides[get_vulnerability_client] = (
+            lambda: mock_client_dependency
+        )
+
+        try:
+            response = client.get("/vulnerabilities/?fields=uid,namespace")
+            rejected = client.get("/vulnerabilities/?fields=uid,severity")
+        finally:
+            client.app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json() == [{"uid": "uid1", "namespace": "ns1"}]
+        assert mock_client_dependency.get_all.call_args.kwargs["fields"] == (
+            "namespace",
+            "uid",
+        )
+        assert rejected.status_code == 400
+        assert rejected.json()["detail"] == "Unknown fields: severity"
+        mock_client_dependency.get_all.assert_called_once()
+
     def test_dependency_injection_working(self, client):
         """Test that dependency injection is properly configured."""
-        mock_client = Mock()
+        mock_client = AsyncMock()
         mock_client.get_all.return_value = []
 
         # Override the dependency
@@ -195,3 +243,256 @@ class TestVulnerabilityAPI:
         assert response.status_code == 200
         # Verify the mock was called
         mock_client.get_all.assert_called_once()
+
+    def test_list_affected(self, client, mock_client_dependency):
+        """Test GET /vulnerabilities/by-id/{vulnerabilityID} lists affected pods."""
+        mock_client_dependency.get_affected.return_value = [
+            Vulnerability(
+                vulnerabilityID="CVE-2024-1",
+                pod_id="pod1",
+                namespace="ns1",
+                cluster="cluster1",
+                resource="openssl",
+                installedVersion="1.0",
+                fixedVersion="1.1",
+            )
+        ]
+        client.app.dependency_overrides[get_vulnerability_client] = (
+            lambda: mock_client_dependency
+        )
+
+        try:
+            response = client.get("/vulnerabilities/by-id/CVE-2024-1?cluster=cluster1")
+        finally:
+            client.app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data[0]["pod_id"] == "pod1"
+        assert data[0]["fixedVersion"] == "1.1"
+        mock_client_dependency.get_affected.assert_called_once_with(
+            "CVE-2024-1", namespace=None, cluster="cluster1"
+        )
+
+    def test_list_affected_none(self, client, mock_client_dependency):
+        """Test an unknown vulnerability affects nothing rather than 404."""
+        mock_client_dependency.get_affected.return_value = []
+        client.app.dependency_overrides[get_vulnerability_client] = (
+            lambda: mock_client_dependency
+        )
+
+        try:
+            response = client.get("/vulnerabilities/by-id/CVE-0000-0")
+        finally:
+            client.app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+
+class TestFastJSONResponses:
+
+    """Test cases for the FAST_JSON_RESPONSES serialisation path."""
+
+    @pytest.fixture
+    def mock_client_dependency(self, client):
+        """Override get_vulnerability_client with a mock client."""
+        report = {
+            "_uid": "uid-1",
+            "_cluster": "c1",
+            "_namespace": "ns1",
+            "data": {
+                "metadata": {"uid": "pod-1"},
+                "report": {
+                    "artifact": {"repository": "library/nginx"},
+                    "vulnerabilities": [
+                        {"vulnerabilityID": "CVE-1"},
+                        {"vulnerabilityID": "CVE-2"},
+                    ],
+                },
+            },
+        }
+        with patch("app.core.databaseClient.connection_manager"):
+            reports = VulnerabilityClient()
+        findings = [
+            Vulnerability(vulnerabilityID="CVE-1", links=["https://a"], score=7.5),
+            Vulnerability(vulnerabilityID="CVE-2", severity="CRITICAL"),
+        ]
+        mock_client = AsyncMock()
+        # get_all lists reports as the plain dicts ``_format`` builds
+        mock_client.get_all.return_value = [reports._format(report)]
+        mock_client.get_flattened_page.return_value = VulnerabilityPage(
+            items=findings, next_cursor="abc"
+        )
+        mock_client.get_affected.return_value = findings
+        client.app.dependency_overrides[get_vulnerability_client] = (
+            lambda: mock_client
+        )
+        yield mock_client
+        client.app.dependency_overrides.clear()
+
+    @pytest.mark.parametrize(
+        "path",
+        ["/vulnerabilities/", "/vulnerabilities/flatten", "/vulnerabilities/by-id/CVE-1"],
+    )
+    def test_same_body_as_response_model(
+        self, client, mock_client_dependency, monkeypatch, path
+    ):
+        """Test the fast path returns exactly what response_model would."""
+        monkeypatch.setenv("FAST_JSON_RESPONSES", "false")
+        expected = client.get(path)
+        monkeypatch.setenv("FAST_JSON_RESPONSES", "true")
+        with warnings.catch_warnings():
+            # e.g. PydanticSerializationUnexpectedValue for unvalidated dicts
+            warnings.simplefilter("error")
+            response = client.get(path)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == expected.json()
+
+
+class TestVulnerabilityGroupsAndSnapshot:
+
+    """Test /vulnerabilities/groups and serving from the in-memory snapshot."""
+
+    @pytest.fixture
+    def mock_client(self, client):
+        mock_client = AsyncMock()
+        mock_client.get_group_counts.return_value = [{"value": "HIGH", "count": 2}]
+        client.app.dependency_overrides[get_vulnerability_client] = (
+            lambda: mock_client
+        )
+        yield mock_client
+        client.app.dependency_overrides.clear()
+
+    @pytest.fixture
+    def snapshot(self, monkeypatch):
+        # Served only while the watcher keeps it current
+        collection_versions.start()
+        snapshot = VulnerabilitySnapshot(
+            [
+                Vulnerability(uid="a", vulnerabilityID="CVE-1", severity="HIGH"),
+                Vulnerability(uid="a", vulnerabilityID="CVE-2", severity="LOW"),
+                Vulnerability(uid="b", vulnerabilityID="CVE-1", severity="HIGH"),
+            ]
+        )
+        monkeypatch.setattr(vulnerability_snapshot, "_snapshot", snapshot)
+        yield snapshot
+        collection_versions.stop()
+
+    def test_groups_from_database(self, client, mock_client):
+        """Test group counts are aggregated in MongoDB without a snapshot."""
+        response = client.get("/vulnerabilities/groups?by=severity&namespace=ns1")
+
+        assert response.status_code == 200
+        assert response.json() == [{"value": "HIGH", "count": 2}]
+        mock_client.get_group_counts.assert_awaited_once_with(
+            "severity",
+            namespace="ns1",
+            cluster=None,
+            severity=None,
+            fixed=None,
+            min_score=None,
+            resource=None,
+        )
+
+    def test_groups_unknown_field(self, client, mock_client):
+        """Test grouping by an unsupported field is a 400."""
+        response = client.get("/vulnerabilities/groups?by=title")
+
+        assert response.status_code == 400
+        mock_client.get_group_counts.assert_not_called()
+
+    def test_groups_from_snapshot(self, client, mock_client, snapshot):
+        """Test group counts come from the snapshot when one is loaded."""
+        response = client.get("/vulnerabilities/groups?by=vulnerabilityID")
+
+        assert response.json() == [
+            {"value": "CVE-1", "count": 2},
+            {"value": "CVE-2", "count": 1},
+        ]
+        mock_client.get_group_counts.assert_not_called()
+
+    def test_flatten_from_snapshot(self, client, mock_client, snapshot):
+        """Test flatten pages come from the snapshot when one is loaded."""
+        first = client.get("/vulnerabilities/flatten?limit=2&severity=HIGH").json()
+
+        assert [item["uid"] for item in first["items"]] == ["a", "b"]
+        assert first["next_cursor"] is None
+        mock_client.get_flattened_page.assert_not_called()
+
+    def test_flatten_from_snapshot_invalid_cursor(self, client, mock_client, snapshot):
+        """Test a malformed cursor is a 400 with the snapshot too."""
+        response = client.get("/vulnerabilities/flatten?cursor=not-a-cursor")
+
+        assert response.status_code == 400
+
+
+class TestVulnerabilityFindings:
+
+    """Test reading from the findings collection when it is enabled."""
+
+    @pytest.fixture
+    def mock_clients(self, client, monkeypatch):
+        monkeypatch.setenv("VULNERABILITY_FINDINGS", "true")
+        reports, findings = AsyncMock(), AsyncMock()
+        client.app.dependency_overrides[get_vulnerability_client] = lambda: reports
+        client.app.dependency_overrides[get_finding_client] = lambda: findings
+        # Findings are only read once rebuilt and while the watcher runs
+        collection_versions.start(built=[FINDINGS])
+        yield reports, findings
+        collection_versions.stop()
+        client.app.dependency_overrides.clear()
+
+    def test_flatten_from_findings(self, client, mock_clients):
+        """Test flatten pages are read from the findings collection."""
+        reports, findings = mock_clients
+        findings.get_flattened_page.return_value = VulnerabilityPage(
+            items=[Vulnerability(uid="a", vulnerabilityID="CVE-1")], next_cursor="c"
+        )
+
+        response = client.get("/vulnerabilities/flatten?limit=1&cluster=c1")
+
+        assert response.json()["next_cursor"] == "c"
+        assert findings.get_flattened_page.await_args.kwargs["cluster"] == "c1"
+        reports.get_flattened_page.assert_not_called()
+
+    def test_affected_from_findings(self, client, mock_clients):
+        """Test affected workloads are looked up in the findings collection."""
+        reports, findings = mock_clients
+        findings.get_affected.return_value = [
+            Vulnerability(uid="a", vulnerabilityID="CVE-1")
+        ]
+
+        response = client.get("/vulnerabilities/by-id/CVE-1")
+
+        assert response.status_code == 200
+        findings.get_affected.assert_awaited_once_with(
+            "CVE-1", namespace=None, cluster=None
+        )
+        reports.get_affected.assert_not_called()
+
+    def test_reports_until_rebuilt(self, client, mock_clients):
+        """Test findings filled by the watcher alone are not read: they may be partial."""
+        reports, findings = mock_clients
+        reports.get_affected.return_value = []
+        collection_versions.start()
+
+        response = client.get("/vulnerabilities/by-id/CVE-1")
+
+        assert response.status_code == 200
+        reports.get_affected.assert_awaited_once()
+        findings.get_affected.assert_not_called()
+
+    def test_reports_without_watcher(self, client, mock_clients):
+        """Test pages come from the reports while the watcher is down."""
+        reports, findings = mock_clients
+        reports.get_flattened_page.return_value = VulnerabilityPage()
+        collection_versions.stop()
+
+        response = client.get("/vulnerabilities/flatten")
+
+        assert response.status_code == 200
+        reports.get_flattened_page.assert_awaited_once()
+        findings.get_flattened_page.assert_not_called()
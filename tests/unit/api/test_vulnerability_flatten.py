@@ -1,11 +1,13 @@
 """Unit tests for vulnerability API /vulnerabilities/flatten endpoint."""
 
-from unittest.mock import Mock
+import json
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 
 from app.api.vulnerability import get_vulnerability_client
-from app.models.vulnerability import Vulnerability
+from app.core.vulnerabilityClient import InvalidCursorError
+from app.models.vulnerability import Vulnerability, VulnerabilityPage
 
 
 class TestVulnerabilityFlattenAPI:
@@ -14,7 +16,7 @@ class TestVulnerabilityFlattenAPI:
 
     @pytest.fixture
     def mock_client_dependency(self):
-        mock_client = Mock()
+        mock_client = AsyncMock()
         return mock_client
 
     def test_list_vulnerabilities_flatten_no_filters(self, client, mock_client_dependency):
@@ -23,7 +25,9 @@ class TestVulnerabilityFlattenAPI:
             Vulnerability(vulnerabilityID="CVE-1", severity="HIGH", score=7.0),
             Vulnerability(vulnerabilityID="CVE-2", severity="CRITICAL", score=9.0),
         ]
-        mock_client_dependency.get_flattened.return_value = mock_vulns
+        mock_client_dependency.get_flattened_page.return_value = VulnerabilityPage(
+            items=mock_vulns
+        )
         client.app.dependency_overrides[get_vulnerability_client] = (
             lambda: mock_client_dependency
         )
@@ -33,11 +37,20 @@ class TestVulnerabilityFlattenAPI:
             client.app.dependency_overrides.clear()
         assert response.status_code == 200
         data = response.json()
-        assert len(data) == 2
-        assert data[0]["vulnerabilityID"] == "CVE-1"
-        assert data[1]["vulnerabilityID"] == "CVE-2"
-        mock_client_dependency.get_flattened.assert_called_once_with(
-            namespace=None, cluster=None, severity=None
+        assert len(data["items"]) == 2
+        assert data["items"][0]["vulnerabilityID"] == "CVE-1"
+        assert data["items"][1]["vulnerabilityID"] == "CVE-2"
+        assert data["next_cursor"] is None
+        mock_client_dependency.get_flattened_page.assert_called_once_with(
+            namespace=None,
+            cluster=None,
+            severity=None,
+            fixed=None,
+            min_score=None,
+            resource=None,
+            limit=1000,
+            cursor=None,
+            fields=None,
         )
 
     def test_list_vulnerabilities_flatten_with_filters(self, client, mock_client_dependency):
@@ -51,7 +64,9 @@ class TestVulnerabilityFlattenAPI:
                 cluster="test-cluster",
             )
         ]
-        mock_client_dependency.get_flattened.return_value = mock_vulns
+        mock_client_dependency.get_flattened_page.return_value = VulnerabilityPage(
+            items=mock_vulns
+        )
         client.app.dependency_overrides[get_vulnerability_client] = (
             lambda: mock_client_dependency
         )
@@ -63,15 +78,23 @@ class TestVulnerabilityFlattenAPI:
             client.app.dependency_overrides.clear()
         assert response.status_code == 200
         data = response.json()
-        assert len(data) == 1
-        assert data[0]["severity"] == "HIGH"
-        mock_client_dependency.get_flattened.assert_called_once_with(
-            namespace="test-ns", cluster="test-cluster", severity="HIGH"
+        assert len(data["items"]) == 1
+        assert data["items"][0]["severity"] == "HIGH"
+        mock_client_dependency.get_flattened_page.assert_called_once_with(
+            namespace="test-ns",
+            cluster="test-cluster",
+            severity="HIGH",
+            fixed=None,
+            min_score=None,
+            resource=None,
+            limit=1000,
+            cursor=None,
+            fields=None,
         )
 
     def test_list_vulnerabilities_flatten_empty_result(self, client, mock_client_dependency):
         """Test GET /vulnerabilities/flatten with empty result."""
-        mock_client_dependency.get_flattened.return_value = []
+        mock_client_dependency.get_flattened_page.return_value = VulnerabilityPage()
         client.app.dependency_overrides[get_vulnerability_client] = (
             lambda: mock_client_dependency
         )
@@ -81,4 +104,146 @@ class TestVulnerabilityFlattenAPI:
             client.app.dependency_overrides.clear()
         assert response.status_code == 200
         data = response.json()
-        assert data == []
+        assert data == {"items": [], "next_cursor": None}
+
+    def test_list_vulnerabilities_flatten_with_cursor(self, client, mock_client_dependency):
+        """Test GET /vulnerabilities/flatten passes limit and cursor through."""
+        mock_client_dependency.get_flattened_page.return_value = VulnerabilityPage(
+            items=[Vulnerability(vulnerabilityID="CVE-3")], next_cursor="abc"
+        )
+        client.app.dependency_overrides[get_vulnerability_client] = (
+            lambda: mock_client_dependency
+        )
+        try:
+            response = client.get("/vulnerabilities/flatten?limit=1&cursor=xyz")
+        finally:
+            client.app.dependency_overrides.clear()
+        assert response.status_code == 200
+        assert response.json()["next_cursor"] == "abc"
+        mock_client_dependency.get_flattened_page.assert_called_once_with(
+            namespace=None,
+            cluster=None,
+            severity=None,
+            fixed=None,
+            min_score=None,
+            resource=None,
+            limit=1,
+            cursor="xyz",
+            fields=None,
+        )
+
+    def test_list_vulnerabilities_flatten_invalid_cursor(self, client, mock_client_dependency):
+        """Test GET /vulnerabilities/flatten rejects a malformed cursor."""
+        mock_client_dependency.get_flattened_page.side_effect = InvalidCursorError(
+            "Invalid cursor"
+        )
+        client.app.dependency_overrides[get_vulnerability_client] = (
+            lambda: mock_client_dependency
+        )
+        try:
+            response = client.get("/vulnerabilities/flatten?cursor=not-a-cursor")
+        finally:
+            client.app.dependency_overrides.clear()
+        assert response.status_code == 400
+
+    def test_list_vulnerabilities_flatten_limit_bounds(self, client):
+        """Test GET /vulnerabilities/flatten validates the page size."""
+        response = client.get("/vulnerabilities/flatten?limit=0")
+        assert response.status_code == 422
+
+    def test_list_vulnerabilities_flatten_finding_filters(self, client, mock_client_dependency):
+        """Test GET /vulnerabilities/flatten passes the per-finding filters through."""
+        mock_client_dependency.get_flattened_page.return_value = VulnerabilityPage()
+        client.app.dependency_overrides[get_vulnerability_client] = (
+            lambda: mock_client_dependency
+        )
+        try:
+            response = client.get(
+                "/vulnerabilities/flatten?fixed=true&min_score=7.5&resource=openssl"
+            )
+        finally:
+            client.app.dependency_overrides.clear()
+        assert response.status_code == 200
+        mock_client_dependency.get_flattened_page.assert_called_once_with(
+            namespace=None,
+            cluster=None,
+            severity=None,
+            fixed=True,
+            min_score=7.5,
+            resource="openssl",
+            limit=1000,
+            cursor=None,
+            fields=None,
+        )
+
+    def test_stream_vulnerabilities_flatten(self, client, mock_client_dependency):
+        """Test GET /vulnerabilities/flatten/stream returns one JSON line per finding."""
+
+        async def iter_flattened(**kwargs):
+            yield Vulnerability(vulnerabilityID="CVE-1", severity="HIGH")
+            yield Vulnerability(vulnerabilityID="CVE-2", severity="LOW")
+
+        mock_client_dependency.iter_flattened = Mock(side_effect=iter_flattened)
+        client.app.dependency_overrides[get_vulnerability_client] = (
+            lambda: mock_client_dependency
+        )
+        try:
+            response = client.get("/vulnerabilities/flatten/stream?severity=HIGH")
+        finally:
+            client.app.dependency_overrides.clear()
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["vulnerabilityID"] for line in lines] == ["CVE-1", "CVE-2"]
+        mock_client_dependency.iter_flattened.assert_called_once_with(
+            namespace=None,
+            cluster=None,
+            severity="HIGH",
+            fixed=None,
+            min_score=None,
+            resource=None,
+            fields=None,
+        )
+
+    def test_list_vulnerabilities_flatten_fields(self, client, mock_client_dependency):
+        """Test fields= is passed on and trims every returned finding."""
+        mock_client_dependency.get_flattened_page.return_value = VulnerabilityPage(
+            items=[Vulnerability(vulnerabilityID="CVE-1", severity="HIGH", score=7.0)],
+            next_cursor="abc",
+        )
+        client.app.dependency_overrides[get_vulnerability_client] = (
+            lambda: mock_client_dependency
+        )
+
+        try:
+            response = client.get(
+                "/vulnerabilities/flatten?fields=vulnerabilityID, severity"
+            )
+        finally:
+            client.app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "items": [{"severity": "HIGH", "vulnerabilityID": "CVE-1"}],
+            "next_cursor": "abc",
+        }
+        assert mock_client_dependency.get_flattened_page.call_args.kwargs[
+            "fields"
+        ] == ("severity", "vulnerabilityID")
+
+    def test_list_vulnerabilities_flatten_unknown_field(
+        self, client, mock_client_dependency
+    ):
+        """Test an unknown field is rejected before querying."""
+        client.app.dependency_overrides[get_vulnerability_client] = (
+            lambda: mock_client_dependency
+        )
+
+        try:
+            response = client.get("/vulnerabilities/flatten?fields=severity,secret")
+        finally:
+            client.app.dependency_overrides.clear()
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Unknown fields: secret"
+        mock_client_dependency.get_flattened_page.assert_not_called()
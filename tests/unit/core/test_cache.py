@@ -0,0 +1,219 @@
+"""Unit tests for the query cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.cache import (
+    QueryCache,
+    cached,
+    coalesced,
+    query_cache,
+    single_flight,
+)
+
+
+class TestQueryCache:
+
+    """Test cases for QueryCache."""
+
+    def test_hit_and_miss(self):
+        """Test a stored value is returned and both outcomes are counted."""
+        cache = QueryCache()
+
+        assert cache.get("pods", "k") == (False, None)
+        cache.set("pods", "k", [1], ttl=30)
+        assert cache.get("pods", "k") == (True, [1])
+
+        assert cache.stats()["scopes"]["pods"]["hits"] == 1
+        assert cache.stats()["scopes"]["pods"]["misses"] == 1
+
+    def test_ttl_expiry(self):
+        """Test entries expire after their TTL."""
+        cache = QueryCache()
+        with patch("app.core.cache.time.monotonic", return_value=100.0):
+            cache.set("pods", "k", "value", ttl=10)
+        with patch("app.core.cache.time.monotonic", return_value=105.0):
+            assert cache.get("pods", "k") == (True, "value")
+        with patch("app.core.cache.time.monotonic", return_value=111.0):
+            assert cache.get("pods", "k") == (False, None)
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first."""
+        cache = QueryCache(max_entries=2)
+        cache.set("pods", "a", 1, ttl=30)
+        cache.set("pods", "b", 2, ttl=30)
+        cache.get("pods", "a")
+        cache.set("pods", "c", 3, ttl=30)
+
+        assert cache.get("pods", "a") == (True, 1)
+        assert cache.get("pods", "b") == (False, None)
+        assert cache.stats()["scopes"]["pods"]["evictions"] == 1
+
+    def test_row_budget_evicts_least_recently_used(self):
+        """Test entries are evicted once the rows across all entries exceed max_rows."""
+        cache = QueryCache(max_rows=5)
+        cache.set("pods", "a", [1, 2], ttl=30)
+        cache.set("pods", "b", [1, 2], ttl=30)
+        cache.get("pods", "a")
+        cache.set("pods", "c", [1, 2], ttl=30)
+
+        assert cache.get("pods", "a") == (True, [1, 2])
+        assert cache.get("pods", "b") == (False, None)
+        assert cache.stats()["rows"] == 4
+
+        cache.set("pods", "a", [1], ttl=30)
+        cache.invalidate("pods")
+        assert cache.stats()["rows"] == 0
+
+    def test_large_results_are_not_cached(self):
+        """Test results above max_items bypass the cache."""
+        cache = QueryCache(max_items=2)
+        cache.set("pods", "k", [1, 2, 3], ttl=30)
+
+        assert cache.get("pods", "k") == (False, None)
+
+    def test_invalidate_scope(self):
+        """Test invalidation only drops entries of the given scope."""
+        cache = QueryCache()
+        cache.set("pods", "a", 1, ttl=30)
+        cache.set("namespaces", "a", 2, ttl=30)
+
+        assert cache.invalidate("pods") == 1
+        assert cache.get("pods", "a") == (False, None)
+        assert cache.get("namespaces", "a") == (True, 2)
+        assert cache.invalidate() == 1
+
+    def test_set_skips_results_of_invalidated_scope(self):
+        """Test a query that raced with an invalidation is not stored."""
+        cache = QueryCache()
+        generation = cache.generation("pods")
+        cache.invalidate("pods")
+
+        cache.set("pods", "k", 1, ttl=30, generation=generation)
+
+        assert cache.get("pods", "k") == (False, None)
+
+
+class Client:
+    def __init__(self):
+        self.query = AsyncMock(return_value=["result"])
+        self.release = asyncio.Event()
+
+    async def slow_query(self, *args):
+        await self.release.wait()
+        return await self.query(*args)
+
+    @cached("pods", ttl=30)
+    async def get_all(self, namespace: str = None, cluster: str = None):
+        return await self.query(namespace, cluster)
+
+    @cached("pods", ttl=30)
+    async def get_summary(self, namespace: str = None):
+        return await self.slow_query(namespace)
+
+    @coalesced("pods")
+    async def get_page(self, cursor: str = None):
+        return await self.slow_query(cursor)
+
+
+async def _gather_released(client, *calls):
+    tasks = [asyncio.ensure_future(call) for call in calls]
+    await asyncio.sleep(0)
+    client.release.set()
+    return await asyncio.gather(*tasks)
+
+
+class TestCachedDecorator:
+
+    """Test cases for the cached decorator."""
+
+    @pytest.mark.asyncio
+    async def test_normalised_arguments_share_an_entry(self):
+        """Test positional and keyword calls hit the same entry."""
+        client = Client()
+
+        assert await client.get_all(cluster="c1") == ["result"]
+        assert await client.get_all(None, "c1") == ["result"]
+        await client.get_all(cluster="c2")
+
+        assert client.query.await_count == 2
+        assert query_cache.stats()["scopes"]["pods"] == {
+            "hits": 1,
+            "misses": 2,
+            "coalesced": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, monkeypatch):
+        """Test QUERY_CACHE_ENABLED=false always queries."""
+        monkeypatch.setenv("QUERY_CACHE_ENABLED", "false")
+        client = Client()
+
+        await client.get_all()
+        await client.get_all()
+
+        assert client.query.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_query(self):
+        """Test identical concurrent calls run one query and share its result."""
+        client = Client()
+
+        results = await _gather_released(
+            client, *[client.get_summary("ns1") for _ in range(5)]
+        )
+
+        assert results == [["result"]] * 5
+        assert client.query.await_count == 1
+        assert query_cache.stats()["scopes"]["pods"]["coalesced"] == 4
+        assert single_flight._flights == {}
+
+    @pytest.mark.asyncio
+    async def test_coalesced_without_cache(self):
+        """Test coalesced calls share a query but store nothing."""
+        client = Client()
+
+        await _gather_released(client, client.get_page("a"), client.get_page("a"))
+        await _gather_released(client, client.get_page("a"), client.get_page("b"))
+
+        assert client.query.await_count == 3
+        assert query_cache.stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_coalesced_failure_reaches_every_caller(self):
+        """Test a failed query raises for all callers and is not remembered."""
+        client = Client()
+        client.query.side_effect = [RuntimeError("boom"), ["result"]]
+
+        tasks = [asyncio.ensure_future(client.get_page("a")) for _ in range(2)]
+        await asyncio.sleep(0)
+        client.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert client.query.await_count == 1
+        assert await client.get_page("a") == ["result"]
+
+    @pytest.mark.asyncio
+    async def test_call_after_invalidation_does_not_join_older_query(self):
+        """Test a call made after invalidate() runs its own query."""
+        client = Client()
+
+        before = asyncio.ensure_future(client.get_summary("ns1"))
+        await asyncio.sleep(0)
+        query_cache.invalidate("pods")
+        after = asyncio.ensure_future(client.get_summary("ns1"))
+        await asyncio.sleep(0)
+        client.release.set()
+
+        await asyncio.gather(before, after)
+
+        assert client.query.await_count == 2
+        assert query_cache.stats()["scopes"]["pods"]["coalesced"] == 0
+        await client.get_summary("ns1")
+        assert client.query.await_count == 2
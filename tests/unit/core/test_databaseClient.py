@@ -1,8 +1,13 @@
 """Tests for databaseClient module."""
 
-from unittest.mock import Mock, patch
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 
-from app.core.databaseClient import DatabaseClient
+from app.core.databaseClient import (
+    ConnectionManager,
+    DatabaseClient,
+    fields_projection,
+)
 
 
 class TestDatabaseClient:
@@ -100,3 +105,132 @@ class TestDatabaseClient:
 
         # If DatabaseClient defines abstract methods or interface contracts,
         # we would test those here
+
+
+class TestConnectionManager:
+
+    """Test class for the shared ConnectionManager."""
+
+    @patch("app.core.databaseClient.MongoClient")
+    def test_client_is_created_once(self, mock_mongo_client):
+        """Test that repeated access reuses the same MongoClient."""
+        manager = ConnectionManager()
+
+        first = manager.client
+        second = manager.client
+
+        assert first is second
+        mock_mongo_client.assert_called_once()
+
+    @patch("app.core.databaseClient.MongoClient")
+    def test_pool_options_from_environment(self, mock_mongo_client):
+        """Test that pool settings are read from the environment."""
+        with patch.dict(
+            "os.environ",
+            {
+                "MONGODB_URI": "mongodb://test:27017",
+                "MONGODB_MAX_POOL_SIZE": "25",
+                "MONGODB_MIN_POOL_SIZE": "5",
+                "MONGODB_MAX_IDLE_TIME_MS": "1000",
+                "MONGODB_WAIT_QUEUE_TIMEOUT_MS": "2000",
+            },
+        ):
+            ConnectionManager().connect()
+
+        mock_mongo_client.assert_called_once_with(
+            "mongodb://test:27017",
+            maxPoolSize=25,
+            minPoolSize=5,
+            maxIdleTimeMS=1000,
+            waitQueueTimeoutMS=2000,
+        )
+
+    @patch("app.core.databaseClient.MongoClient")
+    def test_close_releases_client(self, mock_mongo_client):
+        """Test that close shuts the pool down and allows reconnecting."""
+        first_instance, second_instance = Mock(), Mock()
+        mock_mongo_client.side_effect = [first_instance, second_instance]
+        manager = ConnectionManager()
+
+        assert manager.client is first_instance
+        manager.close()
+
+        first_instance.close.assert_called_once()
+        assert manager.client is second_instance
+
+    @patch("app.core.databaseClient.connection_manager")
+    def test_database_clients_share_connection(self, mock_manager):
+        """Test that every DatabaseClient uses the shared MongoClient."""
+        shared = Mock()
+        mock_manager.client = shared
+
+        assert DatabaseClient().client is shared
+        assert DatabaseClient().client is shared
+
+    @patch("app.core.databaseClient.connection_manager")
+    def test_database_client_close_keeps_pool_open(self, mock_manager):
+        """Test that closing one client does not close the shared pool."""
+        shared = Mock()
+        mock_manager.client = shared
+
+        DatabaseClient().close()
+
+        shared.close.assert_not_called()
+
+    @patch("app.core.databaseClient.AsyncMongoClient")
+    def test_async_client_is_recreated_per_event_loop(self, mock_async_client):
+        """Test that the async client is not reused across event loops."""
+        mock_async_client.side_effect = [Mock(), Mock()]
+        manager = ConnectionManager()
+
+        async def get_client():
+            return manager.async_client
+
+        first = asyncio.run(get_client())
+        assert manager.async_client is first  # no running loop: reuse
+        second = asyncio.run(get_client())
+
+        assert first is not second
+        assert mock_async_client.call_count == 2
+
+    @patch("app.core.databaseClient.AsyncMongoClient")
+    @patch("app.core.databaseClient.MongoClient")
+    def test_aclose_closes_both_clients(self, mock_mongo_client, mock_async_client):
+        """Test that aclose shuts down the sync and async pools."""
+        async_instance = Mock()
+        async_instance.close = AsyncMock()
+        mock_async_client.return_value = async_instance
+        manager = ConnectionManager()
+
+        async def lifespan():
+            await manager.aconnect()
+            manager.connect()
+            await manager.aclose()
+
+        asyncio.run(lifespan())
+
+        mock_mongo_client.return_value.close.assert_called_once()
+        async_instance.close.assert_awaited_once()
+
+
+class TestFieldsProjection:
+
+    """Test cases for fields_projection."""
+
+    def test_no_fields_keeps_projection(self):
+        """Test the default projection is used when no fields are requested."""
+        assert fields_projection({"_id": 0, "a": 1}, {"x": ("a",)}) == {
+            "_id": 0,
+            "a": 1,
+        }
+
+    def test_fields_map_to_paths(self):
+        """Test requested fields and required paths become the projection."""
+        projection = fields_projection(
+            {"_id": 0, "a": 1, "b.c": 1},
+            {"x": ("a",), "y": ("b.c",)},
+            fields=("y",),
+            required=("_uid",),
+        )
+
+        assert projection == {"_id": 0, "_uid": 1, "b.c": 1}
@@ -1,11 +1,14 @@
 """Unit tests for ExposedsecretClient."""
 
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import mongomock
 import pytest
 
-from app.core.exposedsecretClient import ExposedsecretClient
+from app.core.exposedsecretClient import (
+    AsyncExposedsecretClient,
+    ExposedsecretClient,
+)
 from app.models.exposedsecret import ExposedSecret
 
 
@@ -49,7 +52,7 @@ class TestExposedsecretClient:
         assert len(result) == 2
         assert isinstance(result[0], ExposedSecret)
         assert result[0].uid == "uid1"
-        mock_collection.find.assert_called_once_with({}, {"_id": 0})
+        mock_collection.find.assert_called_once_with({}, ExposedsecretClient.PROJECTION)
 
     def test_get_all_with_namespace_filter(self, mock_client):
         """Test get_all with namespace filter."""
@@ -63,7 +66,7 @@ class TestExposedsecretClient:
 
         assert len(result) == 1
         mock_collection.find.assert_called_once_with(
-            {"_namespace": "test-ns"}, {"_id": 0}
+            {"_namespace": "test-ns"}, ExposedsecretClient.PROJECTION
         )
 
     def test_get_all_with_cluster_filter(self, mock_client):
@@ -78,7 +81,7 @@ class TestExposedsecretClient:
 
         assert len(result) == 1
         mock_collection.find.assert_called_once_with(
-            {"_cluster": "test-cluster"}, {"_id": 0}
+            {"_cluster": "test-cluster"}, ExposedsecretClient.PROJECTION
         )
 
     def test_get_all_with_both_filters(self, mock_client):
@@ -95,7 +98,7 @@ class TestExposedsecretClient:
 
         assert len(result) == 1
         mock_collection.find.assert_called_once_with(
-            {"_namespace": "test-ns", "_cluster": "test-cluster"}, {"_id": 0}
+            {"_namespace": "test-ns", "_cluster": "test-cluster"}, ExposedsecretClient.PROJECTION
         )
 
     def test_get_all_filters_none_items(self, mock_client):
@@ -130,7 +133,7 @@ class TestExposedsecretClient:
         assert isinstance(result, ExposedSecret)
         assert result.uid == "test-uid"
         mock_collection.find_one.assert_called_once_with(
-            {"_uid": "test-uid"}, {"_id": 0}
+            {"_uid": "test-uid"}, ExposedsecretClient.PROJECTION
         )
 
     def test_get_by_uid_not_found(self, mock_client):
@@ -143,7 +146,7 @@ class TestExposedsecretClient:
 
         assert result is None
         mock_collection.find_one.assert_called_once_with(
-            {"_uid": "nonexistent-uid"}, {"_id": 0}
+            {"_uid": "nonexistent-uid"}, ExposedsecretClient.PROJECTION
         )
 
     def test_format_with_valid_item(self, mock_client):
@@ -173,3 +176,47 @@ class TestExposedsecretClient:
         assert result.uid == "test-uid"
         assert result.namespace == ""  # Default value
         assert result.cluster == ""  # Default value
+
+
+class TestAsyncExposedsecretClient:
+
+    """Test cases for AsyncExposedsecretClient."""
+
+    @pytest.fixture
+    def mock_collection(self):
+        """Create a mock async collection."""
+        return MagicMock()
+
+    @pytest.fixture
+    def async_client(self, mock_collection):
+        """Create an AsyncExposedsecretClient backed by a mock collection."""
+        with patch("app.core.exposedsecretClient.AsyncDatabaseClient.__init__", return_value=None):
+            client = AsyncExposedsecretClient()
+        client.get_collection = Mock(return_value=mock_collection)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_get_all_with_filters(self, async_client, mock_collection):
+        """Test async get_all applies filters and formats documents."""
+        mock_collection.find.return_value.__aiter__.return_value = [
+            {"_uid": "uid1", "_namespace": "ns1", "_cluster": "cluster1"}
+        ]
+
+        result = await async_client.get_all(namespace="ns1", cluster="cluster1")
+
+        assert len(result) == 1
+        assert isinstance(result[0], ExposedSecret)
+        assert result[0].uid == "uid1"
+        mock_collection.find.assert_called_once_with(
+            {"_namespace": "ns1", "_cluster": "cluster1"}, ExposedsecretClient.PROJECTION
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_by_uid_not_found(self, async_client, mock_collection):
+        """Test async get_by_uid returns None for a missing document."""
+        mock_collection.find_one = AsyncMock(return_value=None)
+
+        assert await async_client.get_by_uid("missing") is None
+        mock_collection.find_one.assert_awaited_once_with(
+            {"_uid": "missing"}, ExposedsecretClient.PROJECTION
+        )
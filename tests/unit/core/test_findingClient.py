@@ -0,0 +1,260 @@
+"""Tests for findingClient module."""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import mongomock
+import pytest
+from mongomock.collection import BulkOperationBuilder
+from pymongo import ReplaceOne
+
+from app.core.findingClient import AsyncFindingClient, FindingClient
+from app.core.vulnerabilityClient import InvalidCursorError, VulnerabilityClient
+from app.core.vulnerabilityHashClient import finding_hash
+
+FILTERS = [
+    {},
+    {"namespace": "ns1"},
+    {"cluster": "c2"},
+    {"severity": "CRITICAL"},
+    {"severity": "MISSING"},
+    {"fixed": True},
+    {"fixed": False, "min_score": 5.0},
+    {"resource": "openssl", "namespace": "ns2"},
+]
+
+
+def _report(report):
+    severities = ["CRITICAL", "HIGH", "LOW"]
+    return {
+        "_id": f"id-{report}",
+        "_uid": f"uid-{report}",
+        "_cluster": f"c{report % 2 + 1}",
+        "_namespace": f"ns{report % 3 + 1}",
+        "data": {
+            "metadata": {"uid": f"pod-{report}"},
+            "report": {
+                "artifact": {"repository": "library/nginx"},
+                "vulnerabilities": [
+                    {
+                        "vulnerabilityID": f"CVE-{(report + i) % 4}",
+                        "severity": severities[(report + i) % 3],
+                        "score": float((report * 3 + i) % 10),
+                        "fixedVersion": "1.0" if i % 2 else "",
+                        "resource": ["openssl", "zlib"][i % 2],
+                    }
+                    for i in range(report % 4)
+                ],
+            },
+        },
+    }
+
+
+@pytest.fixture(autouse=True)
+def bulk_replace(monkeypatch):
+    """Let mongomock take the ``sort`` pymongo passes along with every ReplaceOne."""
+    add_replace = BulkOperationBuilder.add_replace
+    monkeypatch.setattr(
+        BulkOperationBuilder,
+        "add_replace",
+        lambda self, *args, sort=None, **kwargs: add_replace(self, *args, **kwargs),
+    )
+
+
+@pytest.fixture
+def database():
+    database = mongomock.MongoClient()["shield"]
+    database["vulnerabilityreports"].insert_many([_report(r) for r in range(9)])
+    return database
+
+
+@pytest.fixture
+def reports(database):
+    client = VulnerabilityClient()
+    client.get_collection = Mock(return_value=database["vulnerabilityreports"])
+    return client
+
+
+@pytest.fixture
+def client(database):
+    client = FindingClient()
+    client.get_collection = Mock(return_value=database["findings"])
+    client.get_reports_collection = Mock(return_value=database["vulnerabilityreports"])
+    client.get_state_client = Mock()
+    client.rebuild()
+    return client
+
+
+def walk(get_page, limit, **filters):
+    """Every page of a flattened listing as (items, next_cursor) pairs."""
+    pages, cursor = [], None
+    while True:
+        page = get_page(limit=limit, cursor=cursor, **filters)
+        pages.append((page.items, page.next_cursor))
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+class TestFindingClient:
+
+    """Test the findings collection answers like the report queries."""
+
+    @pytest.mark.parametrize("filters", FILTERS)
+    @pytest.mark.parametrize("limit", [1, 2, 5, 100])
+    def test_pages_match_reports(self, client, reports, filters, limit):
+        """Test pages and their cursors are identical to the report pages."""
+        assert walk(client.get_flattened_page, limit, **filters) == walk(
+            reports.get_flattened_page, limit, **filters
+        )
+
+    def test_report_cursor_resumes_in_findings(self, client, reports):
+        """Test a cursor from a report page continues in the findings."""
+        cursor = reports.get_flattened_page(limit=3, severity="LOW").next_cursor
+
+        assert client.get_flattened_page(limit=4, cursor=cursor, severity="LOW") == (
+            reports.get_flattened_page(limit=4, cursor=cursor, severity="LOW")
+        )
+
+    def test_invalid_cursor(self, client):
+        """Test a malformed cursor raises InvalidCursorError."""
+        with pytest.raises(InvalidCursorError):
+            client.get_flattened_page(cursor="not-a-cursor")
+
+    def test_selected_fields(self, client):
+        """Test only the selected fields are read, besides the uid."""
+        page = client.get_flattened_page(limit=2, fields=("severity",))
+
+        assert [(item.uid, item.severity, item.score) for item in page.items] == [
+            ("uid-1", "HIGH", 0.0),
+            ("uid-2", "LOW", 0.0),
+        ]
+
+    def test_get_affected(self, client, reports):
+        """Test affected findings match the report lookup."""
+        assert client.get_affected("CVE-2") == reports.get_affected("CVE-2")
+        assert client.get_affected("CVE-2", cluster="c1") == reports.get_affected(
+            "CVE-2", cluster="c1"
+        )
+
+    def test_document_shape(self, client):
+        """Test a finding holds its report, position, hash and fixed flag."""
+        document = client.get_collection().find_one(
+            {"report_uid": "uid-3", "position": 1}, {"_id": 0, "updatedAt": 0}
+        )
+
+        assert {
+            key: document[key]
+            for key in ("uid", "cluster", "namespace", "pod_id", "target", "severity")
+        } == {
+            "uid": "uid-3",
+            "cluster": "c2",
+            "namespace": "ns1",
+            "pod_id": "pod-3",
+            "target": "library/nginx",
+            "severity": "HIGH",
+        }
+        assert document["report_id"] == "id-3"
+        assert document["report_uid"] == "uid-3"
+        assert document["hash"] == finding_hash("CVE-0", "pod-3", "zlib")
+        assert document["fixed"] is True
+        assert "vulnerabilities" not in document
+
+    def test_sync_and_remove_report(self, client):
+        """Test a report's findings are replaced and removed as a whole."""
+        report = _report(3)
+        report["data"]["report"]["vulnerabilities"] = report["data"]["report"][
+            "vulnerabilities"
+        ][:1]
+
+        assert client.sync_report(report) == 1
+        assert client.get_collection().count_documents({"report_id": "id-3"}) == 1
+        assert client.remove_report("id-3") == 1
+        assert client.get_collection().count_documents({"report_id": "id-3"}) == 0
+
+    def test_apply_change(self, client):
+        """Test change stream events update and drop findings."""
+        client.apply_change(
+            {
+                "operationType": "insert",
+                "documentKey": {"_id": "id-9"},
+                "fullDocument": _report(10),
+            }
+        )
+        assert client.get_collection().count_documents({"report_uid": "uid-10"}) == 2
+
+        client.apply_change({"operationType": "delete", "documentKey": {"_id": "id-1"}})
+        assert client.get_collection().count_documents({"report_id": "id-1"}) == 0
+
+    def test_sync_twice_keeps_one_copy(self, client):
+        """Test a report synced again, e.g. by a second replica, is not duplicated."""
+        report = _report(3)
+        client.sync_report(report)
+        client.sync_report(report)
+        report["data"]["report"]["vulnerabilities"].pop()
+        client.sync_report(report)
+
+        assert client.get_collection().count_documents({"report_id": "id-3"}) == 2
+        assert client.get_collection().count_documents({}) == 11
+
+    def test_rebuild_drops_stale_findings(self, client):
+        """Test findings of reports that are gone do not survive a rebuild."""
+        stale = client._documents(_report(42), datetime.utcnow() - timedelta(days=1))
+        client.get_collection().insert_many(stale)
+
+        assert client.rebuild() == 12
+        client.get_state_client().mark_built.assert_called_with("findings")
+        assert client.get_collection().count_documents({"report_uid": "uid-42"}) == 0
+        assert client.get_collection().count_documents({}) == 12
+
+
+class TestAsyncFindingClient:
+
+    """Test class for AsyncFindingClient."""
+
+    @pytest.fixture
+    def mock_collection(self):
+        return MagicMock(delete_many=AsyncMock(), bulk_write=AsyncMock())
+
+    @pytest.fixture
+    def async_client(self, mock_collection):
+        with patch("app.core.databaseClient.connection_manager"):
+            client = AsyncFindingClient()
+        client.get_collection = Mock(return_value=mock_collection)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_apply_change_replaces_findings(self, async_client, mock_collection):
+        """Test an upserted report replaces its findings."""
+        await async_client.apply_change(
+            {
+                "operationType": "replace",
+                "documentKey": {"_id": "id-2"},
+                "fullDocument": _report(2),
+            }
+        )
+
+        upserts = mock_collection.bulk_write.await_args.args[0]
+        assert upserts == [
+            ReplaceOne(
+                {"report_id": "id-2", "position": position},
+                document,
+                upsert=True,
+            )
+            for position, document in enumerate(
+                async_client._documents(_report(2), upserts[0]._doc["updatedAt"])
+            )
+        ]
+        mock_collection.delete_many.assert_awaited_once_with(
+            {"report_id": "id-2", "position": {"$gte": 2}}
+        )
+
+    @pytest.mark.asyncio
+    async def test_apply_change_delete(self, async_client, mock_collection):
+        """Test a deleted report drops its findings without inserting."""
+        await async_client.apply_change(
+            {"operationType": "delete", "documentKey": {"_id": "id-2"}}
+        )
+
+        mock_collection.delete_many.assert_awaited_once_with({"report_id": "id-2"})
+        mock_collection.bulk_write.assert_not_called()
@@ -0,0 +1,139 @@
+"""Unit tests for ImageClient."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import mongomock
+import pytest
+
+from app.core.imageClient import AsyncImageClient, ImageClient
+from app.models.image import Image, ImageVulnerabilities
+
+FINDINGS = [
+    {"vulnerabilityID": "CVE-1", "severity": "HIGH"},
+    {"vulnerabilityID": "CVE-2", "severity": "LOW"},
+]
+
+
+def _report(pod_id, repository, tag, vulnerabilities=None, cluster="cluster1"):
+    return {
+        "_cluster": cluster,
+        "_namespace": "ns1",
+        "data": {
+            "metadata": {"uid": pod_id},
+            "report": {
+                "artifact": {"repository": repository, "tag": tag},
+                "vulnerabilities": vulnerabilities or [],
+            },
+        },
+    }
+
+
+class TestImageClient:
+
+    """Test cases for ImageClient."""
+
+    @pytest.fixture
+    def client(self):
+        """An ImageClient over a mongomock collection."""
+        client = ImageClient()
+        client.get_collection = Mock(
+            return_value=mongomock.MongoClient()["shield_test"]["vulnerabilityreports"]
+        )
+        client.get_collection().insert_many(
+            [
+                _report("pod1", "library/nginx", "1.25", FINDINGS),
+                _report("pod2", "library/nginx", "1.25", FINDINGS),
+                _report("pod3", "library/nginx", "1.25", FINDINGS, cluster="cluster2"),
+                _report("pod4", "library/alpine", "3.19"),
+            ]
+        )
+        return client
+
+    def test_get_images_counts_once_per_image(self, client):
+        """Test findings shared by several pods are counted once."""
+        images = client.get_images()
+
+        assert [image.repository for image in images] == [
+            "library/alpine",
+            "library/nginx",
+        ]
+        nginx = images[1]
+        assert isinstance(nginx, Image)
+        assert [pod.pod_id for pod in nginx.pods] == ["pod1", "pod2", "pod3"]
+        assert nginx.severity_counts["total"] == 2
+        assert nginx.severity_counts["HIGH"] == 1
+        assert images[0].severity_counts["total"] == 0
+
+    def test_get_images_filtered(self, client):
+        """Test the cluster filter limits the referencing pods."""
+        images = client.get_images(cluster="cluster2")
+
+        assert len(images) == 1
+        assert [pod.pod_id for pod in images[0].pods] == ["pod3"]
+
+    def test_get_image(self, client):
+        """Test get_image returns the findings once with all pods."""
+        image = client.get_image("library/nginx", tag="1.25")
+
+        assert isinstance(image, ImageVulnerabilities)
+        assert len(image.pods) == 3
+        assert [v.vulnerabilityID for v in image.vulnerabilities] == ["CVE-1", "CVE-2"]
+        assert image.vulnerabilities[0].target == "library/nginx"
+        assert image.vulnerabilities[0].pod_id == ""
+
+    def test_get_image_not_found(self, client):
+        """Test get_image returns None for an unknown image."""
+        assert client.get_image("library/redis") is None
+
+
+class TestAsyncImageClient:
+
+    """Test cases for AsyncImageClient."""
+
+    @pytest.fixture
+    def async_client(self):
+        """Create an AsyncImageClient backed by a mock collection."""
+        with patch("app.core.imageClient.AsyncDatabaseClient.__init__", return_value=None):
+            client = AsyncImageClient()
+        client.get_collection = Mock(return_value=Mock())
+        return client
+
+    @pytest.mark.asyncio
+    async def test_get_image(self, async_client):
+        """Test async get_image runs the grouping pipeline for one image."""
+        cursor = Mock()
+        cursor.to_list = AsyncMock(
+            return_value=[
+                {
+                    "_id": {"repository": "library/nginx", "tag": "1.25"},
+                    "pods": [{"cluster": "c1", "namespace": "ns1", "pod_id": "pod1"}],
+                    "total": 2,
+                    "HIGH": 1,
+                    "LOW": 1,
+                    "vulnerabilities": FINDINGS,
+                }
+            ]
+        )
+        async_client.get_collection().aggregate = AsyncMock(return_value=cursor)
+
+        image = await async_client.get_image("library/nginx", tag="1.25")
+
+        assert image.tag == "1.25"
+        assert len(image.vulnerabilities) == 2
+        pipeline = async_client.get_collection().aggregate.await_args.args[0]
+        assert pipeline[0] == {
+            "$match": {
+                "data.report.artifact.repository": "library/nginx",
+                "data.report.artifact.tag": "1.25",
+            }
+        }
+        assert pipeline[-1] == {"$limit": 1}
+
+    @pytest.mark.asyncio
+    async def test_get_image_not_found(self, async_client):
+        """Test async get_image returns None without results."""
+        cursor = Mock()
+        cursor.to_list = AsyncMock(return_value=[])
+        async_client.get_collection().aggregate = AsyncMock(return_value=cursor)
+
+        assert await async_client.get_image("library/redis") is None
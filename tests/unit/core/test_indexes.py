@@ -0,0 +1,152 @@
+"""Unit tests for the index registry."""
+
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+
+from app.core.findingClient import FindingClient
+from app.core.indexes import (
+    INDEXED_CLIENTS,
+    declared_index_names,
+    ensure_indexes,
+    index_report,
+    indexed_clients,
+)
+from app.core.userClient import UserClient
+from app.core.vulnerabilityClient import VulnerabilityClient
+
+
+def _collection(name):
+    collection = Mock()
+    collection.name = name
+    return collection
+
+
+class TestIndexRegistry:
+
+    """Test cases for the declared indexes."""
+
+    def test_every_client_declares_indexes(self):
+        """Test every registered client declares uniquely named indexes."""
+        for client_cls in (*INDEXED_CLIENTS, FindingClient):
+            names = declared_index_names(client_cls)
+            assert names, client_cls.__name__
+            assert len(names) == len(set(names)), client_cls.__name__
+
+    def test_findings_indexed_only_when_enabled(self, monkeypatch):
+        """Test the findings collection is not created unless it is in use."""
+        monkeypatch.setenv("VULNERABILITY_FINDINGS", "false")
+        assert FindingClient not in indexed_clients()
+
+        monkeypatch.setenv("VULNERABILITY_FINDINGS", "true")
+        assert FindingClient in indexed_clients()
+
+    def test_vulnerability_indexes(self):
+        """Test the vulnerability report indexes."""
+        indexes = {
+            model.document["name"]: model.document
+            for model in VulnerabilityClient.INDEXES
+        }
+
+        assert indexes["_uid_1"]["unique"] is True
+        assert "_cluster_1__namespace_1" in indexes
+        assert "data.report.vulnerabilities.severity_1" in indexes
+        assert "data.report.vulnerabilities.vulnerabilityID_1" in indexes
+
+    def test_user_indexes(self):
+        """Test email and id are unique and users can be sorted by createdAt."""
+        indexes = {
+            model.document["name"]: model.document for model in UserClient.INDEXES
+        }
+
+        assert indexes["email_1"]["unique"] is True
+        assert indexes["id_1"]["unique"] is True
+        assert "createdAt_-1" in indexes
+
+
+class TestEnsureIndexes:
+
+    """Test cases for ensure_indexes."""
+
+    def test_creates_declared_indexes(self):
+        """Test the declared models are passed to create_indexes."""
+        collection = _collection("users")
+        collection.create_indexes.return_value = ["email_1", "id_1", "createdAt_-1"]
+
+        with patch.object(UserClient, "get_collection", return_value=collection):
+            results = ensure_indexes(clients=(UserClient,))
+
+        collection.create_indexes.assert_called_once_with(UserClient.INDEXES)
+        assert results == {"users": {"indexes": ["email_1", "id_1", "createdAt_-1"]}}
+
+    def test_records_failures_per_collection(self):
+        """Test a failing collection does not stop the others."""
+        users = _collection("users")
+        users.create_indexes.side_effect = OperationFailure("E11000 duplicate key")
+        reports = _collection("vulnerabilityreports")
+        reports.create_indexes.return_value = ["_uid_1"]
+
+        with (
+            patch.object(UserClient, "get_collection", return_value=users),
+            patch.object(VulnerabilityClient, "get_collection", return_value=reports),
+        ):
+            results = ensure_indexes(clients=(UserClient, VulnerabilityClient))
+
+        assert "duplicate key" in results["users"]["error"]
+        assert results["vulnerabilityreports"] == {"indexes": ["_uid_1"]}
+
+    def test_raises_when_server_unreachable(self):
+        """Test an unreachable server aborts instead of timing out per collection."""
+        users = _collection("users")
+        users.create_indexes.side_effect = ServerSelectionTimeoutError("timeout")
+
+        with (
+            patch.object(UserClient, "get_collection", return_value=users),
+            pytest.raises(ServerSelectionTimeoutError),
+        ):
+            ensure_indexes(clients=(UserClient,))
+
+    def test_timeout_bounds_unreachable_server(self):
+        """Test a timeout gives up on an unreachable server early."""
+        client = MongoClient("mongodb://localhost:1", serverSelectionTimeoutMS=30000)
+        users = client["shield_test"]["users"]
+
+        started = time.monotonic()
+        with (
+            patch.object(UserClient, "get_collection", return_value=users),
+            pytest.raises(ServerSelectionTimeoutError),
+        ):
+            ensure_indexes(clients=(UserClient,), timeout=0.2)
+
+        assert time.monotonic() - started < 5
+        client.close()
+
+
+class TestIndexReport:
+
+    """Test cases for index_report."""
+
+    def test_reports_missing_and_unused(self):
+        """Test missing declared indexes and unused existing ones are reported."""
+        collection = _collection("users")
+        collection.list_indexes.return_value = [
+            {"name": "_id_"},
+            {"name": "email_1"},
+            {"name": "legacy_1"},
+        ]
+        collection.aggregate.return_value = [
+            {"name": "_id_", "accesses": {"ops": 0}},
+            {"name": "email_1", "accesses": {"ops": 42}},
+            {"name": "legacy_1", "accesses": {"ops": 0}},
+        ]
+
+        with patch.object(UserClient, "get_collection", return_value=collection):
+            report = index_report(clients=(UserClient,))
+
+        collection.aggregate.assert_called_once_with([{"$indexStats": {}}])
+        assert report == {
+            "users": {"missing": ["id_1", "createdAt_-1"], "unused": ["legacy_1"]}
+        }
@@ -0,0 +1,285 @@
+"""Tests for ingestionClient module and the kopf handlers using it."""
+
+import logging
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import AutoReconnect
+
+from app import operator
+from app.core.ingestionClient import (
+    AsyncIngestionClient,
+    IngestionClient,
+    InvalidObjectError,
+    ingestion_stats,
+    report_digest,
+)
+
+
+def report(uid="r1", namespace="ns1", vulnerabilities=()):
+    return {
+        "apiVersion": "aquasecurity.github.io/v1alpha1",
+        "kind": "VulnerabilityReport",
+        "metadata": {"uid": uid, "namespace": namespace, "name": f"report-{uid}"},
+        "report": {"vulnerabilities": list(vulnerabilities)},
+    }
+
+
+def stored(body, cluster="prod"):
+    """The document a report is stored as."""
+    namespace = body["metadata"]["namespace"]
+    return {
+        "_uid": body["metadata"]["uid"],
+        "_cluster": cluster,
+        "_namespace": namespace,
+        "_digest": report_digest(body["report"], cluster, namespace),
+        "data": body,
+    }
+
+
+def pod(name="web-1", owner="ReplicaSet"):
+    owners = [{"kind": owner, "name": "web"}] if owner else []
+    return {
+        "kind": "Pod",
+        "metadata": {"name": name, "namespace": "ns1", "ownerReferences": owners},
+    }
+
+
+@pytest.fixture
+def collections():
+    """One mock collection per name, as returned by get_collection."""
+    return {}
+
+
+def counts(written=0, skipped=0, deleted=0):
+    return {"written": written, "skipped": skipped, "deleted": deleted}
+
+
+@pytest.fixture
+def ingestion_client(collections):
+    with patch("app.core.databaseClient.connection_manager"):
+        client = IngestionClient(cluster="prod")
+    client.get_collection = lambda kind: collections.setdefault(kind, MagicMock())
+    return client
+
+
+class TestIngestionClient:
+
+    """Test class for IngestionClient."""
+
+    def test_report_document_shape(self, ingestion_client, collections):
+        """Test reports are upserted by _uid in the shape the clients read."""
+        body = report(vulnerabilities=[{"vulnerabilityID": "CVE-1"}])
+        ingestion_client.queue("vulnerabilityreports", body)
+
+        assert ingestion_client.flush() == {"vulnerabilityreports": counts(written=1)}
+        collections["vulnerabilityreports"].bulk_write.assert_called_once_with(
+            [ReplaceOne({"_uid": "r1"}, stored(body), upsert=True)],
+            ordered=False,
+        )
+
+    def test_pod_and_namespace_documents(self, ingestion_client, collections):
+        """Test pods are stored flat and namespaces by _uid and _name."""
+        ingestion_client.queue("pods", pod())
+        ingestion_client.queue("pods", pod("job-1", owner=None))
+        namespace = {"metadata": {"uid": "n1", "name": "ns1"}}
+        ingestion_client.queue("namespaces", namespace)
+        ingestion_client.flush()
+
+        pods = collections["pods"].bulk_write.call_args.args[0]
+        assert pods == [
+            ReplaceOne(
+                {"cluster": "prod", "namespace": "ns1", "name": "web-1"},
+                {"name": "web-1", "namespace": "ns1", "kind": "ReplicaSet", "cluster": "prod"},
+                upsert=True,
+            ),
+            ReplaceOne(
+                {"cluster": "prod", "namespace": "ns1", "name": "job-1"},
+                {"name": "job-1", "namespace": "ns1", "kind": "Pod", "cluster": "prod"},
+                upsert=True,
+            ),
+        ]
+        assert collections["namespaces"].bulk_write.call_args.args[0] == [
+            ReplaceOne(
+                {"_uid": "n1"},
+                {"_uid": "n1", "_cluster": "prod", "_name": "ns1", "data": namespace},
+                upsert=True,
+            )
+        ]
+
+    def test_latest_event_per_object_wins(self, ingestion_client, collections):
+        """Test repeated events for one object become a single write."""
+        ingestion_client.queue("vulnerabilityreports", report("r1"))
+        ingestion_client.queue("vulnerabilityreports", report("r2"))
+        ingestion_client.queue("vulnerabilityreports", report("r1", namespace="ns2"))
+        ingestion_client.queue("vulnerabilityreports", report("r2"), deleted=True)
+
+        assert ingestion_client.pending() == 2
+        ingestion_client.flush()
+        operations = collections["vulnerabilityreports"].bulk_write.call_args.args[0]
+        assert operations == [
+            ReplaceOne({"_uid": "r1"}, stored(report("r1", namespace="ns2")), upsert=True),
+            DeleteOne({"_uid": "r2"}),
+        ]
+        assert ingestion_client.pending() == 0
+
+    def test_objects_without_identity_are_rejected(self, ingestion_client):
+        """Test objects missing their key fields never reach the queue."""
+        with pytest.raises(InvalidObjectError, match="_uid"):
+            ingestion_client.queue("sbomreports", {"metadata": {"namespace": "ns1"}})
+        with pytest.raises(InvalidObjectError):
+            ingestion_client.queue("pods", ["not", "an", "object"])
+
+        assert ingestion_client.pending() == 0
+
+    def test_flush_nothing_queued(self, ingestion_client, collections):
+        """Test an empty flush does not touch the database."""
+        assert ingestion_client.flush() == {}
+        assert collections == {}
+
+    def test_failed_flush_is_retried(self, ingestion_client, collections):
+        """Test a failed collection is requeued and written by the next flush."""
+        ingestion_client.queue("sbomreports", report("s1"))
+        ingestion_client.queue("exposedsecretreports", report("e1"))
+        collections["sbomreports"] = MagicMock()
+        collections["exposedsecretreports"] = MagicMock()
+        collections["exposedsecretreports"].bulk_write.side_effect = AutoReconnect()
+
+        with pytest.raises(AutoReconnect):
+            ingestion_client.flush()
+        collections["sbomreports"].bulk_write.assert_called_once()
+        assert ingestion_client.pending() == 1
+
+        collections["exposedsecretreports"].bulk_write.side_effect = None
+        assert ingestion_client.flush() == {"exposedsecretreports": counts(written=1)}
+
+
+    def test_reconcile_removes_unlisted_objects(self, ingestion_client, collections):
+        """Test stored objects missing from the listing are deleted, newer events win."""
+        collections["pods"] = MagicMock()
+        collections["pods"].find.return_value = [
+            {"cluster": "prod", "namespace": "ns1", "name": "web-1"},
+            {"cluster": "prod", "namespace": "ns1", "name": "web-2"},
+            {"cluster": "prod", "namespace": "ns1", "name": "web-3"},
+        ]
+        stored_pods = ingestion_client.stored_keys("pods")
+        ingestion_client.queue("pods", pod("web-3"))
+
+        removed = ingestion_client.reconcile("pods", stored_pods, [pod("web-1"), {"metadata": {}}])
+
+        assert removed == 1
+        assert collections["pods"].find.call_args.args[0] == {"cluster": "prod"}
+        ingestion_client.flush()
+        operations = collections["pods"].bulk_write.call_args.args[0]
+        assert DeleteOne({"cluster": "prod", "namespace": "ns1", "name": "web-2"}) in operations
+        assert len(operations) == 2
+
+    def test_unchanged_reports_are_skipped(self, ingestion_client, collections):
+        """Test reports whose stored digest matches are not rewritten."""
+        unchanged, changed = report("r1"), report("r2")
+        collections["vulnerabilityreports"] = MagicMock()
+        collections["vulnerabilityreports"].find.return_value = [
+            {"_uid": "r1", "_digest": stored(unchanged)["_digest"]},
+            {"_uid": "r2", "_digest": "outdated"},
+        ]
+        ingestion_client.queue("vulnerabilityreports", unchanged)
+        ingestion_client.queue("vulnerabilityreports", changed)
+        ingestion_client.queue("vulnerabilityreports", report("r3"))
+        ingestion_client.queue("pods", pod())
+
+        result = ingestion_client.flush()
+
+        assert result["vulnerabilityreports"] == counts(written=2, skipped=1)
+        collections["vulnerabilityreports"].find.assert_called_once_with(
+            {"_uid": {"$in": ["r1", "r2", "r3"]}}, {"_id": 0, "_uid": 1, "_digest": 1}
+        )
+        operations = collections["vulnerabilityreports"].bulk_write.call_args.args[0]
+        assert operations == [
+            ReplaceOne({"_uid": "r2"}, stored(changed), upsert=True),
+            ReplaceOne({"_uid": "r3"}, stored(report("r3")), upsert=True),
+        ]
+        collections["pods"].find.assert_not_called()
+        assert ingestion_stats.stats() == {
+            "vulnerabilityreports": counts(written=2, skipped=1),
+            "pods": counts(written=1),
+        }
+
+    def test_all_unchanged_writes_nothing(self, ingestion_client, collections):
+        """Test a batch of unchanged reports skips bulk_write altogether."""
+        body = report("r1")
+        collections["sbomreports"] = MagicMock()
+        collections["sbomreports"].find.return_value = [stored(body)]
+        ingestion_client.queue("sbomreports", body)
+
+        assert ingestion_client.flush() == {"sbomreports": counts(skipped=1)}
+        collections["sbomreports"].bulk_write.assert_not_called()
+
+    def test_digest_ignores_update_timestamp(self):
+        """Test a rescan with the same findings keeps its digest."""
+        findings = {"vulnerabilities": [{"vulnerabilityID": "CVE-1"}]}
+        first = report_digest({**findings, "updateTimestamp": "t1"}, "prod", "ns1")
+
+        assert first == report_digest({**findings, "updateTimestamp": "t2"}, "prod", "ns1")
+        assert first != report_digest({"vulnerabilities": []}, "prod", "ns1")
+        assert first != report_digest(findings, "prod", "ns2")
+
+
+class TestAsyncIngestionClient:
+
+    """Test class for AsyncIngestionClient and the kopf event handler."""
+
+    @pytest.fixture
+    def async_ingestion_client(self, collections):
+        with patch("app.core.databaseClient.connection_manager"):
+            client = AsyncIngestionClient(cluster="prod")
+
+        def get_collection(kind):
+            return collections.setdefault(kind, MagicMock(bulk_write=AsyncMock()))
+
+        client.get_collection = get_collection
+        return client
+
+    @pytest.mark.asyncio
+    async def test_flush(self, async_ingestion_client, collections):
+        """Test queued objects are written with an awaited bulk_write."""
+        async_ingestion_client.queue("namespaces", {"metadata": {"uid": "n1"}})
+
+        assert await async_ingestion_client.flush() == {"namespaces": counts(written=1)}
+        collections["namespaces"].bulk_write.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_flush_skips_unchanged(self, async_ingestion_client, collections):
+        """Test stored digests are read asynchronously and matches skipped."""
+        body = report("r1")
+        collection = async_ingestion_client.get_collection("vulnerabilityreports")
+        collection.find.return_value.__aiter__.return_value = [stored(body)]
+        async_ingestion_client.queue("vulnerabilityreports", body)
+
+        result = await async_ingestion_client.flush()
+
+        assert result == {"vulnerabilityreports": counts(skipped=1)}
+        collection.bulk_write.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_handler_batches_events(self, async_ingestion_client, collections, monkeypatch):
+        """Test events are queued and flushed once the batch size is reached."""
+        monkeypatch.setattr(operator, "ingestion", async_ingestion_client)
+        monkeypatch.setenv("INGESTION_BATCH_SIZE", "2")
+        logger = logging.getLogger("test")
+
+        await operator.ingest_event(
+            event={"type": None, "object": report("r1")},
+            param="vulnerabilityreports",
+            logger=logger,
+        )
+        assert "vulnerabilityreports" not in collections
+
+        await operator.ingest_event(
+            event={"type": "DELETED", "object": report("r2")},
+            param="vulnerabilityreports",
+            logger=logger,
+        )
+        operations = collections["vulnerabilityreports"].bulk_write.call_args.args[0]
+        assert [type(operation) for operation in operations] == [ReplaceOne, DeleteOne]
+        assert async_ingestion_client.pending() == 0
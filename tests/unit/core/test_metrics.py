@@ -0,0 +1,130 @@
+"""Tests for the MongoDB command listener and the threadpool collector."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import CollectorRegistry, Counter, Histogram
+
+from app.core.databaseClient import ConnectionManager
+from app.core.metrics import (
+    MongoCommandMetrics,
+    ThreadpoolCollector,
+    exposed_registry,
+    mongo_command_metrics,
+    registry,
+)
+
+
+def command_event(name, command=None, request_id=1, duration_micros=2500):
+    return SimpleNamespace(
+        command_name=name,
+        command=command or {},
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        duration_micros=duration_micros,
+    )
+
+
+@pytest.fixture
+def metrics():
+    """A listener recording into a registry of its own."""
+    test_registry = CollectorRegistry()
+    duration = Histogram(
+        "duration", "", ("collection", "command"), buckets=(0.001, 0.01), registry=test_registry
+    )
+    failures = Counter("failures", "", ("collection", "command"), registry=test_registry)
+    return test_registry, duration, failures
+
+
+class TestMongoCommandMetrics:
+
+    """Test commands are timed per collection and command name."""
+
+    def test_commands_are_timed(self, metrics):
+        """Test succeeded and failed commands use the collection of their start."""
+        test_registry, duration, failures = metrics
+        listener = MongoCommandMetrics(duration, failures)
+
+        listener.started(command_event("find", {"find": "pods"}, request_id=1))
+        listener.started(command_event("getMore", {"getMore": 7, "collection": "pods"}, request_id=2))
+        listener.started(command_event("aggregate", {"aggregate": 1}, request_id=3))
+        listener.succeeded(command_event("find", request_id=1))
+        listener.succeeded(command_event("getMore", request_id=2))
+        listener.failed(command_event("aggregate", request_id=3))
+
+        find = {"collection": "pods", "command": "find"}
+        assert test_registry.get_sample_value("duration_count", find) == 1
+        assert test_registry.get_sample_value("duration_count", {**find, "command": "getMore"}) == 1
+        assert test_registry.get_sample_value("duration_bucket", {**find, "le": "0.01"}) == 1
+        assert test_registry.get_sample_value("duration_bucket", {**find, "le": "0.001"}) == 0
+        assert test_registry.get_sample_value("failures_total", {"collection": "", "command": "aggregate"}) == 1
+        assert listener._started == {}
+
+    def test_heartbeats_are_ignored(self, metrics):
+        """Test handshakes are neither tracked nor recorded."""
+        test_registry, duration, failures = metrics
+        listener = MongoCommandMetrics(duration, failures)
+
+        listener.started(command_event("hello", {"hello": 1}))
+        listener.succeeded(command_event("hello"))
+
+        assert test_registry.get_sample_value("duration_count", {"collection": "", "command": "hello"}) is None
+        assert listener._started == {}
+
+    def test_unfinished_commands_are_bounded(self, metrics):
+        """Test commands never reported as finished do not pile up."""
+        test_registry, duration, failures = metrics
+        listener = MongoCommandMetrics(duration, failures, max_pending=2)
+
+        for request_id in range(5):
+            listener.started(command_event("find", {"find": "pods"}, request_id=request_id))
+        listener.succeeded(command_event("find", request_id=0))
+        listener.succeeded(command_event("find", request_id=4))
+
+        assert len(listener._started) == 1
+        assert test_registry.get_sample_value("duration_count", {"collection": "pods", "command": "find"}) == 1
+
+    @patch("app.core.databaseClient.MongoClient")
+    def test_listener_registered_on_shared_client(self, mock_mongo_client):
+        """Test the shared client is created with the registered listeners."""
+        manager = ConnectionManager()
+        manager.add_event_listener(mongo_command_metrics)
+
+        manager.connect()
+
+        kwargs = mock_mongo_client.call_args.kwargs
+        assert kwargs["event_listeners"] == [mongo_command_metrics]
+        assert kwargs["maxPoolSize"] == 100
+
+
+class TestExposition:
+
+    """Test what /metrics collects."""
+
+    @pytest.mark.asyncio
+    async def test_threadpool_collected_at_scrape(self):
+        """Test the threadpool gauge reads the limiter when collected."""
+        test_registry = CollectorRegistry()
+        test_registry.register(ThreadpoolCollector())
+
+        assert test_registry.get_sample_value("threadpool_threads", {"state": "busy"}) == 0
+        assert test_registry.get_sample_value("threadpool_threads", {"state": "capacity"}) == 40
+
+    def test_single_process_registry(self, monkeypatch):
+        """Test the process registry is exposed without a multiprocess directory."""
+        monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+        assert exposed_registry() is registry
+
+    def test_multiprocess_registry(self, monkeypatch, tmp_path):
+        """Test the values of every worker are merged with a multiprocess directory."""
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+        merged = exposed_registry()
+
+        assert merged is not registry
+        assert [type(collector).__name__ for collector in merged._collector_to_names] == [
+            "MultiProcessCollector",
+            "ThreadpoolCollector",
+        ]
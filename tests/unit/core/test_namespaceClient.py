@@ -1,8 +1,10 @@
 """Tests for namespaceClient module."""
 
-from unittest.mock import Mock
+from unittest.mock import MagicMock, Mock, patch
 
-from app.core.namespaceClient import NamespaceClient
+import pytest
+
+from app.core.namespaceClient import AsyncNamespaceClient, NamespaceClient
 from app.models.namespace import Namespace
 
 
@@ -108,3 +110,26 @@ class TestNamespaceClient:
         assert hasattr(client, "get_collection")
         assert hasattr(client, "_format_to_namespace")
         assert hasattr(client, "get_all")
+
+
+class TestAsyncNamespaceClient:
+
+    """Test class for AsyncNamespaceClient."""
+
+    @pytest.mark.asyncio
+    async def test_get_all_with_cluster_filter(self):
+        """Test async get_all filters by cluster."""
+        with patch("app.core.namespaceClient.AsyncDatabaseClient.__init__", return_value=None):
+            client = AsyncNamespaceClient()
+        mock_collection = MagicMock()
+        mock_collection.find.return_value.__aiter__.return_value = [
+            {"_cluster": "cluster1", "_name": "ns1", "_uid": "ns1-uid"}
+        ]
+        client.get_collection = Mock(return_value=mock_collection)
+
+        result = await client.get_all(cluster="cluster1")
+
+        assert len(result) == 1
+        assert isinstance(result[0], Namespace)
+        assert result[0].name == "ns1"
+        mock_collection.find.assert_called_once_with({"_cluster": "cluster1"}, {"_id": 0})
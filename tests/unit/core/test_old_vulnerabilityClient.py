@@ -0,0 +1,166 @@
+"""Unit tests for the old VulnerabilityClient hash lookups."""
+
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+from app.core.derivedStateClient import HASHES
+from app.core.old_vulnerabilityClient import (
+    AsyncVulnerabilityClient,
+    VulnerabilityClient,
+)
+from app.core.versions import collection_versions
+from app.core.vulnerabilityHashClient import finding_hash
+
+HASH = finding_hash("CVE-2", "pod1", "zlib")
+
+
+def _report(*findings):
+    return {
+        "_cluster": "cluster1",
+        "_namespace": "ns1",
+        "data": {
+            "metadata": {"uid": "pod1"},
+            "report": {
+                "vulnerabilities": [
+                    {"vulnerabilityID": vuln_id, "resource": resource}
+                    for vuln_id, resource in findings
+                ]
+            },
+        },
+    }
+
+
+@pytest.fixture
+def hashes_built():
+    """Pretend the hash lookup was rebuilt and the watcher keeps it in step."""
+    collection_versions.start(built=[HASHES])
+    yield
+    collection_versions.stop()
+
+
+@pytest.mark.usefixtures("hashes_built")
+class TestVulnerabilityClientGetByHash:
+
+    """Test cases for VulnerabilityClient.get_by_hash."""
+
+    @pytest.fixture
+    def client(self):
+        """A client with mocked report and hash collections."""
+        with patch("app.core.old_vulnerabilityClient.DatabaseClient.__init__"):
+            client = VulnerabilityClient()
+        client.get_collection = Mock(return_value=Mock())
+        client.get_hash_client = Mock(return_value=Mock())
+        return client
+
+    def test_get_by_hash_point_query(self, client):
+        """Test the lookup fetches only the hashed finding of one report."""
+        client.get_hash_client().find_all.return_value = [
+            {"report_id": "r1", "index": 1}
+        ]
+        client.get_collection().find_one.return_value = _report(("CVE-2", "zlib"))
+
+        vuln = client.get_by_hash(HASH)
+
+        assert vuln.vulnerabilityID == "CVE-2"
+        assert vuln.hash == HASH
+        client.get_collection().find_one.assert_called_once_with(
+            {"_id": "r1"}, client._finding_projection(1)
+        )
+        assert client._finding_projection(1)["data.report.vulnerabilities"] == {
+            "$slice": [1, 1]
+        }
+
+    def test_get_by_hash_unknown(self, client):
+        """Test an unknown hash does not touch the reports."""
+        client.get_hash_client().find_all.return_value = []
+
+        assert client.get_by_hash("missing") is None
+        client.get_collection().find_one.assert_not_called()
+        client.get_collection().find.assert_not_called()
+
+    def test_get_by_hash_stale_entry(self, client):
+        """Test a moved finding is still found in its report."""
+        client.get_hash_client().find_all.return_value = [
+            {"report_id": "r1", "index": 0}
+        ]
+        client.get_collection().find_one.return_value = _report(("CVE-1", "openssl"))
+        client.get_collection().find.return_value = [
+            _report(("CVE-1", "openssl"), ("CVE-2", "zlib"))
+        ]
+
+        vuln = client.get_by_hash(HASH)
+
+        assert vuln.vulnerabilityID == "CVE-2"
+        client.get_collection().find.assert_called_once_with(
+            {"_id": {"$in": ["r1"]}}, {"_id": 0}
+        )
+
+    def test_get_by_hash_later_entry(self, client):
+        """Test a hash whose first report is gone resolves through the next entry."""
+        client.get_hash_client().find_all.return_value = [
+            {"report_id": "gone", "index": 0},
+            {"report_id": "r2", "index": 1},
+        ]
+        client.get_collection().find_one.side_effect = [
+            None,
+            _report(("CVE-2", "zlib")),
+        ]
+
+        vuln = client.get_by_hash(HASH)
+
+        assert vuln.hash == HASH
+        client.get_collection().find_one.assert_called_with(
+            {"_id": "r2"}, client._finding_projection(1)
+        )
+        client.get_collection().find.assert_not_called()
+
+
+class TestGetByHashWithoutLookup:
+
+    """Test get_by_hash before the hash lookup was rebuilt."""
+
+    def test_scans_the_reports(self):
+        """Test the hash is found by looking through every report."""
+        with patch("app.core.old_vulnerabilityClient.DatabaseClient.__init__"):
+            client = VulnerabilityClient()
+        client.get_collection = Mock(return_value=Mock())
+        client.get_collection().find.return_value = [
+            _report(("CVE-1", "openssl")),
+            _report(("CVE-2", "zlib")),
+        ]
+        client.get_hash_client = Mock()
+
+        vuln = client.get_by_hash(HASH)
+
+        assert vuln.vulnerabilityID == "CVE-2"
+        client.get_collection().find.assert_called_once_with({}, {"_id": 0})
+        client.get_hash_client.assert_not_called()
+
+
+@pytest.mark.usefixtures("hashes_built")
+class TestAsyncVulnerabilityClientGetByHash:
+
+    """Test cases for AsyncVulnerabilityClient.get_by_hash."""
+
+    @pytest.mark.asyncio
+    async def test_get_by_hash(self):
+        """Test async get_by_hash resolves the hash through the lookup."""
+        with patch(
+            "app.core.old_vulnerabilityClient.AsyncDatabaseClient.__init__",
+            return_value=None,
+        ):
+            client = AsyncVulnerabilityClient()
+        collection = MagicMock()
+        collection.find_one = AsyncMock(return_value=_report(("CVE-2", "zlib")))
+        client.get_collection = Mock(return_value=collection)
+        hashes = Mock()
+        hashes.find_all = AsyncMock(return_value=[{"report_id": "r1", "index": 3}])
+        client.get_hash_client = Mock(return_value=hashes)
+
+        vuln = await client.get_by_hash(HASH)
+
+        assert vuln.hash == HASH
+        collection.find_one.assert_awaited_once_with(
+            {"_id": "r1"}, client._finding_projection(3)
+        )
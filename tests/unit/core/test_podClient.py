@@ -1,11 +1,11 @@
 """Unit tests for PodClient."""
 
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import mongomock
 import pytest
 
-from app.core.podClient import PodClient
+from app.core.podClient import AsyncPodClient, PodClient
 from app.models.pod import Pod
 
 
@@ -168,3 +168,79 @@ class TestPodClient:
 
         assert isinstance(result, Pod)
         assert isinstance(item["_id"], str)  # Should be converted to string
+
+    def test_get_summary(self, mock_client):
+        """Test get_summary counts pods and distinct namespaces/clusters."""
+        mock_client.get_collection = Mock(
+            return_value=mongomock.MongoClient()["shield_test"]["pods"]
+        )
+        mock_client.get_collection().insert_many(
+            [
+                {"name": "pod1", "namespace": "ns1", "cluster": "cluster1"},
+                {"name": "pod2", "namespace": "ns1", "cluster": "cluster1"},
+                {"name": "pod3", "namespace": "ns2", "cluster": "cluster2"},
+            ]
+        )
+
+        summary = mock_client.get_summary()
+
+        assert summary["total"] == 3
+        assert sorted(summary["namespaces"]) == ["ns1", "ns2"]
+        assert sorted(summary["clusters"]) == ["cluster1", "cluster2"]
+
+    def test_get_summary_empty(self, mock_client):
+        """Test get_summary on an empty result."""
+        mock_client.get_collection = Mock(
+            return_value=mongomock.MongoClient()["shield_test"]["pods"]
+        )
+
+        summary = mock_client.get_summary(cluster="missing")
+
+        assert summary == {"total": 0, "namespaces": [], "clusters": []}
+
+
+class TestAsyncPodClient:
+
+    """Test cases for AsyncPodClient."""
+
+    @pytest.fixture
+    def mock_collection(self):
+        """Create a mock async collection."""
+        return MagicMock()
+
+    @pytest.fixture
+    def async_client(self, mock_collection):
+        """Create an AsyncPodClient backed by a mock collection."""
+        with patch("app.core.podClient.AsyncDatabaseClient.__init__", return_value=None):
+            client = AsyncPodClient()
+        client.get_collection = Mock(return_value=mock_collection)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_get_by_namespace(self, async_client, mock_collection):
+        """Test async get_by_namespace queries by cluster and namespace."""
+        mock_collection.find.return_value.__aiter__.return_value = [
+            {"name": "pod1", "namespace": "ns1", "cluster": "cluster1"}
+        ]
+
+        result = await async_client.get_by_namespace("cluster1", "ns1")
+
+        assert len(result) == 1
+        assert isinstance(result[0], Pod)
+        mock_collection.find.assert_called_once_with(
+            {"namespace": "ns1", "cluster": "cluster1"}, {"_id": 0}
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_by_name(self, async_client, mock_collection):
+        """Test async get_by_name returns a single pod."""
+        mock_collection.find_one = AsyncMock(
+            return_value={"name": "pod1", "namespace": "ns1", "cluster": "cluster1"}
+        )
+
+        result = await async_client.get_by_name("cluster1", "ns1", "pod1")
+
+        assert result.name == "pod1"
+        mock_collection.find_one.assert_awaited_once_with(
+            {"name": "pod1", "namespace": "ns1", "cluster": "cluster1"}, {"_id": 0}
+        )
@@ -1,11 +1,11 @@
 """Unit tests for SbomClient."""
 
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 import mongomock
 import pytest
 
-from app.core.sbomClient import SbomClient
+from app.core.sbomClient import AsyncSbomClient, SbomClient
 from app.models.sbom import SBOM
 
 
@@ -46,7 +46,7 @@ class TestSbomClient:
         assert len(result) == 2
         assert isinstance(result[0], SBOM)
         assert result[0].uid == "sbom1"
-        mock_collection.find.assert_called_once_with({}, {"_id": 0})
+        mock_collection.find.assert_called_once_with({}, SbomClient.PROJECTION)
 
     def test_get_all_with_namespace_filter(self, mock_client):
         """Test get_all with namespace filter."""
@@ -60,7 +60,7 @@ class TestSbomClient:
 
         assert len(result) == 1
         mock_collection.find.assert_called_once_with(
-            {"_namespace": "test-ns"}, {"_id": 0}
+            {"_namespace": "test-ns"}, SbomClient.PROJECTION
         )
 
     def test_get_all_with_cluster_filter(self, mock_client):
@@ -75,7 +75,7 @@ class TestSbomClient:
 
         assert len(result) == 1
         mock_collection.find.assert_called_once_with(
-            {"_cluster": "test-cluster"}, {"_id": 0}
+            {"_cluster": "test-cluster"}, SbomClient.PROJECTION
         )
 
     def test_get_by_uid_found(self, mock_client):
@@ -92,7 +92,7 @@ class TestSbomClient:
         assert isinstance(result, SBOM)
         assert result.uid == "test-sbom"
         mock_collection.find_one.assert_called_once_with(
-            {"_uid": "test-sbom"}, {"_id": 0}
+            {"_uid": "test-sbom"}, SbomClient.PROJECTION
         )
 
     def test_get_by_uid_not_found(self, mock_client):
@@ -148,3 +148,26 @@ class TestSbomClient:
 
         # Verify we're using SBOM (all caps) not Sbom
         assert result.__class__.__name__ == "SBOM"
+
+
+class TestAsyncSbomClient:
+
+    """Test cases for AsyncSbomClient."""
+
+    @pytest.mark.asyncio
+    async def test_get_all(self):
+        """Test async get_all iterates the cursor and formats documents."""
+        with patch("app.core.sbomClient.AsyncDatabaseClient.__init__", return_value=None):
+            client = AsyncSbomClient()
+        mock_collection = MagicMock()
+        mock_collection.find.return_value.__aiter__.return_value = [
+            {"_uid": "sbom1", "_namespace": "ns1", "_cluster": "cluster1"},
+            {"_uid": "sbom2", "_namespace": "ns2", "_cluster": "cluster1"},
+        ]
+        client.get_collection = Mock(return_value=mock_collection)
+
+        result = await client.get_all(cluster="cluster1")
+
+        assert [sbom.uid for sbom in result] == ["sbom1", "sbom2"]
+        assert all(isinstance(sbom, SBOM) for sbom in result)
+        mock_collection.find.assert_called_once_with({"_cluster": "cluster1"}, SbomClient.PROJECTION)
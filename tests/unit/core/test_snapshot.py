@@ -0,0 +1,203 @@
+"""Tests for the in-memory vulnerability snapshot."""
+
+import asyncio
+import time
+from unittest.mock import Mock, patch
+
+import mongomock
+import pytest
+
+from app.core.snapshot import SnapshotManager, VulnerabilitySnapshot
+from app.core.versions import collection_versions
+from app.core.vulnerabilityClient import InvalidCursorError, VulnerabilityClient
+
+FILTERS = [
+    {},
+    {"namespace": "ns1"},
+    {"cluster": "c2"},
+    {"severity": "CRITICAL"},
+    {"severity": "MISSING"},
+    {"fixed": True},
+    {"fixed": False, "min_score": 5.0},
+    {"resource": "openssl", "namespace": "ns2"},
+]
+
+
+@pytest.fixture
+def client():
+    """A client over a mongomock collection with reports across clusters."""
+    client = VulnerabilityClient()
+    client.get_collection = Mock(
+        return_value=mongomock.MongoClient()["shield"]["vulnerabilityreports"]
+    )
+    severities = ["CRITICAL", "HIGH", "LOW"]
+    client.get_collection().insert_many(
+        [
+            {
+                "_uid": f"uid-{report}",
+                "_cluster": f"c{report % 2 + 1}",
+                "_namespace": f"ns{report % 3 + 1}",
+                "data": {
+                    "report": {
+                        "vulnerabilities": [
+                            {
+                                "vulnerabilityID": f"CVE-{(report + i) % 4}",
+                                "severity": severities[(report + i) % 3],
+                                "score": float((report * 3 + i) % 10),
+                                "fixedVersion": "1.0" if i % 2 else "",
+                                "resource": ["openssl", "zlib"][i % 2],
+                            }
+                            for i in range(report % 4)
+                        ]
+                    }
+                },
+            }
+            for report in range(9)
+        ]
+    )
+    return client
+
+
+def walk(get_page, limit, **filters):
+    """Every page of a flattened listing as (ids, next_cursor) pairs."""
+    pages, cursor = [], None
+    while True:
+        page = get_page(limit=limit, cursor=cursor, **filters)
+        pages.append(
+            ([(v.uid, v.vulnerabilityID) for v in page.items], page.next_cursor)
+        )
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+class TestVulnerabilitySnapshot:
+
+    """Test the snapshot answers exactly like the MongoDB queries."""
+
+    @pytest.mark.parametrize("filters", FILTERS)
+    @pytest.mark.parametrize("limit", [1, 2, 5, 100])
+    def test_pages_match_database(self, client, filters, limit):
+        """Test pages and their cursors are identical to get_flattened_page."""
+        snapshot = VulnerabilitySnapshot.load(client)
+
+        assert walk(snapshot.page, limit, **filters) == walk(
+            client.get_flattened_page, limit, **filters
+        )
+
+    def test_database_cursor_resumes_in_snapshot(self, client):
+        """Test a cursor from a database page continues in the snapshot."""
+        snapshot = VulnerabilitySnapshot.load(client)
+        cursor = client.get_flattened_page(limit=3, severity="LOW").next_cursor
+
+        assert snapshot.page(limit=4, cursor=cursor, severity="LOW") == (
+            client.get_flattened_page(limit=4, cursor=cursor, severity="LOW")
+        )
+
+    def test_invalid_cursor(self, client):
+        """Test a malformed cursor raises InvalidCursorError."""
+        snapshot = VulnerabilitySnapshot.load(client)
+
+        with pytest.raises(InvalidCursorError):
+            snapshot.page(cursor="not-a-cursor")
+
+    @pytest.mark.parametrize("scope", [{}, {"namespace": "ns2"}, {"cluster": "c1"}])
+    def test_severity_counts_match_database(self, client, scope):
+        """Test severity counts equal the aggregation results."""
+        snapshot = VulnerabilitySnapshot.load(client)
+
+        assert snapshot.severity_counts(**scope) == client.get_severity_counts(**scope)
+
+    @pytest.mark.parametrize("by", ["cluster", "namespace", "severity", "resource"])
+    @pytest.mark.parametrize("filters", FILTERS)
+    def test_group_counts_match_database(self, client, by, filters):
+        """Test group-bys equal the aggregation results, most frequent first."""
+        snapshot = VulnerabilitySnapshot.load(client)
+
+        assert snapshot.group_counts(by, **filters) == client.get_group_counts(
+            by, **filters
+        )
+
+    def test_dictionary_encoding(self, client):
+        """Test string columns hold codes into sorted dictionaries."""
+        snapshot = VulnerabilitySnapshot.load(client)
+
+        assert snapshot.dictionaries["severity"] == ["CRITICAL", "HIGH", "LOW"]
+        assert len(snapshot.codes["severity"]) == len(snapshot) == 12
+        assert [
+            snapshot.dictionaries["cluster"][code] for code in snapshot.codes["cluster"]
+        ] == [row.cluster for row in snapshot.page().items]
+        assert not hasattr(snapshot, "rows")
+
+
+class TestSnapshotManager:
+
+    """Test the snapshot is refreshed and dropped when reports change."""
+
+    @pytest.fixture(autouse=True)
+    def watching(self):
+        """Pretend the change stream watcher runs."""
+        collection_versions.start()
+        yield
+        collection_versions.stop()
+
+    @pytest.mark.asyncio
+    async def test_rebuilds_after_change(self):
+        """Test a change drops the snapshot until the rebuild finishes."""
+        manager = SnapshotManager()
+        snapshots = iter(["first", "second"])
+        with patch.object(
+            VulnerabilitySnapshot, "load", side_effect=lambda client: next(snapshots)
+        ):
+            task = asyncio.create_task(manager.run(refresh=60, debounce=0.01))
+            while manager.current() is None:
+                await asyncio.sleep(0.001)
+            assert manager.current() == "first"
+
+            manager.mark_stale()
+            assert manager.current() is None
+            while manager.current() is None:
+                await asyncio.sleep(0.001)
+            assert manager.current() == "second"
+
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        assert manager.current() is None
+
+    @pytest.mark.asyncio
+    async def test_publishes_despite_changes_while_loading(self):
+        """Test a load is served if reports changed during it, then redone."""
+        manager = SnapshotManager()
+        loop = asyncio.get_running_loop()
+        loads = []
+
+        def load(client):
+            loads.append(len(loads))
+            if len(loads) == 1:
+                loop.call_soon_threadsafe(manager.mark_stale)
+                time.sleep(0.05)
+            return f"load {len(loads)}"
+
+        with patch.object(VulnerabilitySnapshot, "load", side_effect=load):
+            task = asyncio.create_task(manager.run(refresh=60, debounce=0.05))
+            while manager.current() is None:
+                await asyncio.sleep(0.001)
+            assert manager.current() == "load 1"
+            stale = collection_versions.token(["vulnerabilityreports"])
+            while manager.current() == "load 1":
+                await asyncio.sleep(0.001)
+            assert manager.current() == "load 2"
+            assert collection_versions.token(["vulnerabilityreports"]) != stale
+
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    def test_not_served_without_watcher(self, monkeypatch):
+        """Test nothing is served while changes go unnoticed."""
+        manager = SnapshotManager()
+        monkeypatch.setattr(manager, "_snapshot", "loaded")
+        collection_versions.stop()
+
+        assert manager.current() is None
@@ -1,7 +1,9 @@
 from datetime import datetime
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
-from app.core.userClient import UserClient
+import pytest
+
+from app.core.userClient import AsyncUserClient, UserClient
 from app.models.user import User
 
 
@@ -443,3 +445,93 @@ class TestUserClient:
         assert user.email == "test@example.com"
         assert user.role == "Developer"
         assert user.status == "active"
+
+
+class TestAsyncUserClient:
+
+    """Test cases for AsyncUserClient."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.sample_user_data = {
+            "id": "user123",
+            "email": "test@example.com",
+            "fullname": "Test User",
+            "role": "Developer",
+            "namespaces": ["cluster-dev:development"],
+            "createdAt": datetime.utcnow(),
+            "lastLogin": None,
+            "status": "active",
+            "mfaEnabled": False,
+            "oktaIntegration": False,
+        }
+        with patch("app.core.userClient.AsyncDatabaseClient.__init__", return_value=None):
+            self.client = AsyncUserClient()
+        self.mock_collection = MagicMock()
+        self.client.get_collection = Mock(return_value=self.mock_collection)
+
+    @pytest.mark.asyncio
+    async def test_get_all_with_filters(self):
+        """Test async get_all builds the query and paginates."""
+        self.mock_collection.count_documents = AsyncMock(return_value=1)
+        cursor = self.mock_collection.find.return_value.sort.return_value
+        cursor.skip.return_value.limit.return_value.__aiter__.return_value = [
+            self.sample_user_data
+        ]
+
+        users, total = await self.client.get_all(role="Developer", page=2, limit=10)
+
+        assert total == 1
+        assert users[0].email == "test@example.com"
+        self.mock_collection.count_documents.assert_awaited_once_with(
+            {"role": "Developer"}
+        )
+        cursor.skip.assert_called_once_with(10)
+
+    @pytest.mark.asyncio
+    async def test_create(self):
+        """Test async create inserts a normalised document."""
+        self.mock_collection.insert_one = AsyncMock()
+
+        user = await self.client.create(
+            {
+                "email": "New@Example.com",
+                "fullname": "New User",
+                "role": "Developer",
+                "namespaces": ["cluster-dev:development"],
+            }
+        )
+
+        assert user.email == "new@example.com"
+        inserted_doc = self.mock_collection.insert_one.call_args[0][0]
+        assert inserted_doc["status"] == "active"
+
+    @pytest.mark.asyncio
+    async def test_update_not_found(self):
+        """Test async update returns None when no user matches."""
+        self.mock_collection.update_one = AsyncMock(
+            return_value=Mock(matched_count=0)
+        )
+
+        assert await self.client.update("missing", {"fullname": "Name"}) is None
+
+    @pytest.mark.asyncio
+    async def test_get_stats(self):
+        """Test async get_stats awaits both aggregations."""
+        stats_cursor = Mock()
+        stats_cursor.to_list = AsyncMock(
+            return_value=[{"_id": None, "total": 3, "active": 2, "inactive": 1}]
+        )
+        role_cursor = Mock()
+        role_cursor.to_list = AsyncMock(
+            return_value=[{"_id": "Developer", "count": 3}]
+        )
+        self.mock_collection.aggregate = AsyncMock(
+            side_effect=[stats_cursor, role_cursor]
+        )
+
+        stats = await self.client.get_stats()
+
+        assert stats.total == 3
+        assert stats.active == 2
+        assert stats.byRole == {"Developer": 3}
@@ -0,0 +1,47 @@
+"""Unit tests for collection version tokens."""
+
+from app.core.versions import CollectionVersions
+
+
+class TestCollectionVersions:
+
+    """Test cases for CollectionVersions."""
+
+    def test_no_token_without_tracking(self):
+        """Test no token is handed out before the watcher starts."""
+        versions = CollectionVersions()
+
+        assert versions.token(["pods"]) is None
+        versions.start()
+        assert versions.token(["pods"]) is not None
+        versions.stop()
+        assert versions.token(["pods"]) is None
+
+    def test_token_changes_with_collection_versions(self):
+        """Test only changes to the read collections change the token."""
+        versions = CollectionVersions()
+        versions.start()
+        token = versions.token(["pods"], "/pods/")
+
+        versions.bump("namespaces")
+        assert versions.token(["pods"], "/pods/") == token
+        versions.bump("pods")
+        assert versions.token(["pods"], "/pods/") != token
+
+    def test_token_depends_on_key(self):
+        """Test different queries of the same collections get different tokens."""
+        versions = CollectionVersions()
+        versions.start()
+
+        assert versions.token(["pods"], "a") != versions.token(["pods"], "b")
+
+    def test_restart_invalidates_tokens(self):
+        """Test tokens from before a restart of the watcher never match."""
+        versions = CollectionVersions()
+        versions.start()
+        token = versions.token(["pods"])
+
+        versions.stop()
+        versions.start()
+
+        assert versions.token(["pods"]) != token
@@ -1,8 +1,19 @@
 """Tests for vulnerabilityClient module."""
 
-from unittest.mock import Mock
-
-from app.core.vulnerabilityClient import VulnerabilityClient
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import bson
+import mongomock
+import pytest
+from bson.raw_bson import RawBSONDocument
+
+from app.core.vulnerabilityClient import (
+    FLATTEN_PROJECTION,
+    LIST_PROJECTION,
+    AsyncVulnerabilityClient,
+    InvalidCursorError,
+    VulnerabilityClient,
+)
 from app.models.vulnerability import Vulnerability
 
 
@@ -123,7 +134,7 @@ class TestVulnerabilityClient:
         assert result[0].vulnerabilityID == "CVE-2023-1234"
 
         # Verify the MongoDB query
-        mock_collection.find_one.assert_called_once_with({"_uid": test_uid}, {"_id": 0})
+        mock_collection.find_one.assert_called_once_with({"_uid": test_uid}, FLATTEN_PROJECTION)
 
     def test_get_by_uid_not_found(self):
         """Test get_by_uid method when vulnerability is not found."""
@@ -138,7 +149,7 @@ class TestVulnerabilityClient:
 
         assert result is None
         mock_collection.find_one.assert_called_once_with(
-            {"_uid": "nonexistent"}, {"_id": 0}
+            {"_uid": "nonexistent"}, FLATTEN_PROJECTION
         )
 
     def test_get_all_method(self):
@@ -202,7 +213,7 @@ class TestVulnerabilityClient:
         assert result[1]["vulnerabilities"][0]["vulnerabilityID"] == "CVE-2023-0002"
 
         # Verify the MongoDB query
-        mock_collection.find.assert_called_once_with({}, {"_id": 0})
+        mock_collection.find.assert_called_once_with({}, LIST_PROJECTION)
 
     def test_get_all_empty_collection(self):
         """Test get_all method with empty collection."""
@@ -220,3 +231,429 @@ class TestVulnerabilityClient:
 
         assert len(result) == 0
         assert isinstance(result, list)
+
+    def test_get_severity_counts(self):
+        """Test get_severity_counts counts findings, not reports."""
+        client = VulnerabilityClient()
+        collection = mongomock.MongoClient()["shield_test"]["vulnerabilityreports"]
+        collection.insert_many(
+            [
+                {
+                    "_uid": "uid1",
+                    "_cluster": "cluster1",
+                    "data": {
+                        "report": {
+                            "vulnerabilities": [
+                                {"severity": "CRITICAL"},
+                                {"severity": "HIGH"},
+                                {"severity": "HIGH"},
+                            ]
+                        }
+                    },
+                },
+                {
+                    "_uid": "uid2",
+                    "_cluster": "cluster2",
+                    "data": {"report": {"vulnerabilities": [{"severity": "LOW"}]}},
+                },
+            ]
+        )
+        client.get_collection = Mock(return_value=collection)
+
+        assert client.get_severity_counts() == {
+            "total": 4,
+            "CRITICAL": 1,
+            "HIGH": 2,
+            "MEDIUM": 0,
+            "LOW": 1,
+            "UNKNOWN": 0,
+        }
+        assert client.get_severity_counts(cluster="cluster2")["total"] == 1
+
+    def test_count_vulnerabilities(self):
+        """Test count_vulnerabilities sums array sizes with optional breakdown."""
+        client = VulnerabilityClient()
+        collection = mongomock.MongoClient()["shield_test"]["vulnerabilityreports"]
+        collection.insert_many(
+            [
+                {
+                    "_uid": "uid1",
+                    "_namespace": "ns1",
+                    "data": {
+                        "report": {
+                            "vulnerabilities": [
+                                {"severity": "CRITICAL"},
+                                {"severity": "HIGH"},
+                            ]
+                        }
+                    },
+                },
+                {"_uid": "uid2", "_namespace": "ns1", "data": {"report": {}}},
+                {
+                    "_uid": "uid3",
+                    "_namespace": "ns2",
+                    "data": {"report": {"vulnerabilities": [{"severity": "HIGH"}]}},
+                },
+            ]
+        )
+        client.get_collection = Mock(return_value=collection)
+
+        assert client.count_vulnerabilities() == {"total": 3}
+        assert client.count_vulnerabilities(namespace="ns1", by_severity=True) == {
+            "total": 2,
+            "CRITICAL": 1,
+            "HIGH": 1,
+            "MEDIUM": 0,
+            "LOW": 0,
+            "UNKNOWN": 0,
+        }
+        assert client.count_vulnerabilities(namespace="missing") == {"total": 0}
+
+    def test_get_flattened_page_walks_all_findings(self):
+        """Test keyset pages resume inside and across reports without gaps."""
+        client = VulnerabilityClient()
+        collection = mongomock.MongoClient()["shield_test"]["vulnerabilityreports"]
+        collection.insert_many(
+            [
+                {
+                    "_uid": uid,
+                    "data": {
+                        "report": {
+                            "vulnerabilities": [
+                                {"vulnerabilityID": f"{uid}-{i}"} for i in range(count)
+                            ]
+                        }
+                    },
+                }
+                for uid, count in [("b", 3), ("a", 2), ("c", 0), ("d", 1)]
+            ]
+        )
+        client.get_collection = Mock(return_value=collection)
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = client.get_flattened_page(limit=2, cursor=cursor)
+            seen.extend(v.vulnerabilityID for v in page.items)
+            pages += 1
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert seen == ["a-0", "a-1", "b-0", "b-1", "b-2", "d-0"]
+        assert pages == 3
+
+    def test_get_flattened_page_invalid_cursor(self):
+        """Test a malformed cursor raises InvalidCursorError."""
+        client = VulnerabilityClient()
+        client.get_collection = Mock()
+
+        with pytest.raises(InvalidCursorError):
+            client.get_flattened_page(cursor="not-a-cursor")
+
+
+    @pytest.fixture
+    def findings_client(self):
+        """A client over a mongomock collection with mixed findings."""
+        client = VulnerabilityClient()
+        client.get_collection = Mock(
+            return_value=mongomock.MongoClient()["shield"]["vulnerabilityreports"]
+        )
+        client.get_collection().insert_many(
+            [
+                {
+                    "_uid": "a",
+                    "data": {
+                        "report": {
+                            "vulnerabilities": [
+                                {
+                                    "vulnerabilityID": "CVE-1",
+                                    "severity": "CRITICAL",
+                                    "score": 9.8,
+                                    "fixedVersion": "1.2.3",
+                                    "resource": "openssl",
+                                },
+                                {
+                                    "vulnerabilityID": "CVE-2",
+                                    "severity": "LOW",
+                                    "score": 2.0,
+                                    "resource": "openssl",
+                                },
+                                {
+                                    "vulnerabilityID": "CVE-3",
+                                    "severity": "CRITICAL",
+                                    "score": 9.1,
+                                    "fixedVersion": "",
+                                    "resource": "zlib",
+                                },
+                            ]
+                        }
+                    },
+                },
+                {
+                    "_uid": "b",
+                    "data": {
+                        "report": {
+                            "vulnerabilities": [
+                                {"vulnerabilityID": "CVE-4", "severity": "LOW"}
+                            ]
+                        }
+                    },
+                },
+            ]
+        )
+        return client
+
+    def test_get_flattened_severity_filters_findings(self, findings_client):
+        """Test only findings of the requested severity are returned."""
+        result = findings_client.get_flattened(severity="CRITICAL")
+
+        assert [v.vulnerabilityID for v in result] == ["CVE-1", "CVE-3"]
+
+    def test_get_flattened_finding_predicates(self, findings_client):
+        """Test fixed, min_score and resource narrow the findings."""
+        assert [
+            v.vulnerabilityID for v in findings_client.get_flattened(fixed=True)
+        ] == ["CVE-1"]
+        assert [
+            v.vulnerabilityID for v in findings_client.get_flattened(fixed=False)
+        ] == ["CVE-2", "CVE-3", "CVE-4"]
+        assert [
+            v.vulnerabilityID
+            for v in findings_client.get_flattened(min_score=9.0, resource="zlib")
+        ] == ["CVE-3"]
+
+    def test_get_all_severity_filters_findings(self, findings_client):
+        """Test report listings only carry the matching findings."""
+        result = findings_client.get_all(severity="LOW")
+
+        assert [r["uid"] for r in result] == ["a", "b"]
+        assert result[0]["vulnerabilities"] == [{"vulnerabilityID": "CVE-2"}]
+
+    def test_projections_skip_unrendered_fields(self, findings_client):
+        """Test only the fields the formatters read are fetched."""
+        findings_client.get_collection().update_many(
+            {}, {"$set": {"data.report.summary": {"criticalCount": 1}}}
+        )
+
+        report = next(findings_client._find_reports({}, [], projection=LIST_PROJECTION))
+        findings = report["data"]["report"]["vulnerabilities"]
+        assert "summary" not in report["data"]["report"]
+        assert all(set(finding) == {"vulnerabilityID"} for finding in findings)
+
+        report = next(findings_client._find_reports({}, [{"$eq": [1, 1]}]))
+        assert "summary" not in report["data"]["report"]
+        assert "severity" in report["data"]["report"]["vulnerabilities"][0]
+
+    def test_get_flattened_page_fields(self, findings_client):
+        """Test fields= only fetches the requested findings fields."""
+        page = findings_client.get_flattened_page(
+            severity="CRITICAL", fields=("severity",), limit=1
+        )
+
+        assert [(v.vulnerabilityID, v.severity, v.score) for v in page.items] == [
+            ("CVE-1", "CRITICAL", 0.0)
+        ]
+        assert page.next_cursor is not None
+
+    def test_raw_bson_documents(self, findings_client, monkeypatch):
+        """Test MONGODB_RAW_BSON reads lazily decoded documents."""
+        collection = findings_client.get_collection()
+        lazy = Mock(wraps=collection)
+        collection_with_options = Mock(return_value=lazy)
+        monkeypatch.setenv("MONGODB_RAW_BSON", "true")
+        monkeypatch.setattr(collection, "with_options", collection_with_options)
+
+        result = findings_client.get_flattened(severity="CRITICAL")
+
+        assert [v.vulnerabilityID for v in result] == ["CVE-1", "CVE-3"]
+        codec_options = collection_with_options.call_args.kwargs["codec_options"]
+        assert codec_options.document_class is RawBSONDocument
+
+    def test_format_raw_bson_documents(self, findings_client):
+        """Test the formatters read RawBSONDocument reports like dicts."""
+        report = findings_client.get_collection().find_one({}, FLATTEN_PROJECTION)
+        raw = RawBSONDocument(bson.encode(report))
+
+        assert findings_client._format_flatten(raw) == findings_client._format_flatten(
+            report
+        )
+        assert findings_client._format(raw) == findings_client._format(report)
+
+    def test_get_flattened_page_with_filter(self, findings_client):
+        """Test pagination walks the filtered findings."""
+        page = findings_client.get_flattened_page(severity="CRITICAL", limit=1)
+        assert [v.vulnerabilityID for v in page.items] == ["CVE-1"]
+
+        page = findings_client.get_flattened_page(
+            severity="CRITICAL", limit=1, cursor=page.next_cursor
+        )
+        assert [v.vulnerabilityID for v in page.items] == ["CVE-3"]
+        assert page.next_cursor is None
+
+
+    def test_get_affected(self, findings_client):
+        """Test get_affected returns only the requested vulnerability per report."""
+        findings_client.get_collection().insert_one(
+            {
+                "_uid": "c",
+                "_namespace": "ns2",
+                "data": {
+                    "metadata": {"uid": "pod-c"},
+                    "report": {
+                        "vulnerabilities": [
+                            {"vulnerabilityID": "CVE-1", "resource": "openssl"},
+                            {"vulnerabilityID": "CVE-9", "resource": "curl"},
+                        ]
+                    },
+                },
+            }
+        )
+
+        affected = findings_client.get_affected("CVE-1")
+        assert [(v.uid, v.vulnerabilityID) for v in affected] == [
+            ("a", "CVE-1"),
+            ("c", "CVE-1"),
+        ]
+        assert affected[1].pod_id == "pod-c"
+
+        assert [v.uid for v in findings_client.get_affected("CVE-1", namespace="ns2")] == [
+            "c"
+        ]
+        assert findings_client.get_affected("CVE-404") == []
+
+
+class TestAsyncVulnerabilityClient:
+
+    """Test class for AsyncVulnerabilityClient."""
+
+    @pytest.fixture
+    def mock_collection(self):
+        """Create a mock async collection."""
+        return MagicMock()
+
+    @pytest.fixture
+    def async_client(self, mock_collection):
+        """Create an AsyncVulnerabilityClient backed by a mock collection."""
+        with patch("app.core.vulnerabilityClient.AsyncDatabaseClient.__init__", return_value=None):
+            client = AsyncVulnerabilityClient()
+        client.get_collection = Mock(return_value=mock_collection)
+        return client
+
+    @pytest.fixture
+    def report(self):
+        """A vulnerability report with two findings."""
+        return {
+            "_uid": "uid1",
+            "_cluster": "cluster1",
+            "_namespace": "ns1",
+            "data": {
+                "metadata": {"uid": "pod1"},
+                "report": {
+                    "vulnerabilities": [
+                        {"vulnerabilityID": "CVE-2023-0001", "severity": "HIGH"},
+                        {"vulnerabilityID": "CVE-2023-0002", "severity": "LOW"},
+                    ]
+                },
+            },
+        }
+
+    @pytest.mark.asyncio
+    async def test_get_flattened(self, async_client, mock_collection, report):
+        """Test async get_flattened expands every finding of every report."""
+        mock_collection.find.return_value.__aiter__.return_value = [report]
+
+        result = await async_client.get_flattened(namespace="ns1")
+
+        assert [v.vulnerabilityID for v in result] == ["CVE-2023-0001", "CVE-2023-0002"]
+        assert all(isinstance(v, Vulnerability) for v in result)
+        mock_collection.find.assert_called_once_with({"_namespace": "ns1"}, FLATTEN_PROJECTION)
+
+    @pytest.mark.asyncio
+    async def test_get_flattened_severity_filter(self, async_client, mock_collection, report):
+        """Test async get_flattened filters findings in an aggregation."""
+        report["data"]["report"]["vulnerabilities"].pop()
+        cursor = MagicMock()
+        cursor.__aiter__.return_value = [report]
+        mock_collection.aggregate = AsyncMock(return_value=cursor)
+
+        result = await async_client.get_flattened(severity="HIGH")
+
+        assert [v.vulnerabilityID for v in result] == ["CVE-2023-0001"]
+        mock_collection.find.assert_not_called()
+        pipeline = mock_collection.aggregate.await_args.args[0]
+        assert pipeline[0] == {
+            "$match": {"data.report.vulnerabilities": {"$elemMatch": {"severity": "HIGH"}}}
+        }
+        assert pipeline[-2]["$set"]["data.report.vulnerabilities"]["$filter"]["cond"] == {
+            "$and": [{"$eq": ["$$this.severity", "HIGH"]}]
+        }
+        assert pipeline[-1] == {"$project": FLATTEN_PROJECTION}
+
+    @pytest.mark.asyncio
+    async def test_get_affected(self, async_client, mock_collection, report):
+        """Test async get_affected matches on the multikey vulnerabilityID path."""
+        cursor = MagicMock()
+        cursor.__aiter__.return_value = [report]
+        mock_collection.aggregate = AsyncMock(return_value=cursor)
+
+        await async_client.get_affected("CVE-2023-0001")
+
+        pipeline = mock_collection.aggregate.await_args.args[0]
+        assert pipeline[0] == {
+            "$match": {"data.report.vulnerabilities.vulnerabilityID": "CVE-2023-0001"}
+        }
+
+    @pytest.mark.asyncio
+    async def test_get_by_uid(self, async_client, mock_collection, report):
+        """Test async get_by_uid flattens the matching report."""
+        mock_collection.find_one = AsyncMock(return_value=report)
+
+        result = await async_client.get_by_uid("uid1")
+
+        assert len(result) == 2
+        mock_collection.find_one.assert_awaited_once_with({"_uid": "uid1"}, FLATTEN_PROJECTION)
+
+    @pytest.mark.asyncio
+    async def test_get_severity_counts(self, async_client, mock_collection):
+        """Test async get_severity_counts runs the aggregation pipeline."""
+        cursor = Mock()
+        cursor.to_list = AsyncMock(
+            return_value=[{"_id": "HIGH", "count": 2}, {"_id": "LOW", "count": 1}]
+        )
+        mock_collection.aggregate = AsyncMock(return_value=cursor)
+
+        counts = await async_client.get_severity_counts(namespace="ns1")
+
+        assert counts["total"] == 3
+        assert counts["HIGH"] == 2
+        assert counts["CRITICAL"] == 0
+        pipeline = mock_collection.aggregate.call_args[0][0]
+        assert pipeline[0] == {"$match": {"_namespace": "ns1"}}
+        assert pipeline[1] == {"$unwind": "$data.report.vulnerabilities"}
+
+    @pytest.mark.asyncio
+    async def test_get_flattened_page(self, async_client, mock_collection, report):
+        """Test async get_flattened_page stops at the limit and returns a cursor."""
+        sorted_cursor = mock_collection.find.return_value.sort.return_value
+        sorted_cursor.__aiter__.return_value = [report]
+
+        first = await async_client.get_flattened_page(limit=1)
+        assert [v.vulnerabilityID for v in first.items] == ["CVE-2023-0001"]
+        assert first.next_cursor is not None
+
+        second = await async_client.get_flattened_page(
+            limit=1, cursor=first.next_cursor
+        )
+        assert [v.vulnerabilityID for v in second.items] == ["CVE-2023-0002"]
+        assert second.next_cursor is None
+        mock_collection.find.assert_called_with({"_uid": {"$gte": "uid1"}}, FLATTEN_PROJECTION)
+        mock_collection.find.return_value.sort.assert_called_with("_uid", 1)
+
+    @pytest.mark.asyncio
+    async def test_iter_flattened(self, async_client, mock_collection, report):
+        """Test async iter_flattened yields findings while iterating the cursor."""
+        mock_collection.find.return_value.__aiter__.return_value = [report, report]
+
+        result = [v.vulnerabilityID async for v in async_client.iter_flattened()]
+
+        assert result == ["CVE-2023-0001", "CVE-2023-0002"] * 2
@@ -0,0 +1,160 @@
+"""Unit tests for VulnerabilityHashClient."""
+
+import hashlib
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import mongomock
+import pytest
+
+from app.core.vulnerabilityHashClient import (
+    AsyncVulnerabilityHashClient,
+    VulnerabilityHashClient,
+    finding_hash,
+)
+
+
+def _report(report_id, pod_id, *findings):
+    return {
+        "_id": report_id,
+        "data": {
+            "metadata": {"uid": pod_id},
+            "report": {
+                "vulnerabilities": [
+                    {"vulnerabilityID": vuln_id, "resource": resource}
+                    for vuln_id, resource in findings
+                ]
+            },
+        },
+    }
+
+
+class TestVulnerabilityHashClient:
+
+    """Test cases for VulnerabilityHashClient."""
+
+    @pytest.fixture
+    def client(self):
+        """A client over mongomock hash and report collections."""
+        with patch("app.core.vulnerabilityHashClient.DatabaseClient.__init__"):
+            client = VulnerabilityHashClient()
+        database = mongomock.MongoClient()["shield_test"]
+        client.get_collection = Mock(return_value=database["vulnerability_hashes"])
+        client.get_reports_collection = Mock(
+            return_value=database["vulnerabilityreports"]
+        )
+        client.get_state_client = Mock()
+        return client
+
+    def test_finding_hash(self):
+        """Test the hash matches the one the old endpoint has always used."""
+        expected = hashlib.md5(b"CVE-1-pod1-openssl").hexdigest()
+
+        assert finding_hash("CVE-1", "pod1", "openssl") == expected
+
+    def test_sync_report(self, client):
+        """Test every finding gets an entry pointing at its array position."""
+        client.sync_report(_report("r1", "pod1", ("CVE-1", "openssl"), ("CVE-2", "zlib")))
+
+        entry = client.find(finding_hash("CVE-2", "pod1", "zlib"))
+        assert entry["report_id"] == "r1"
+        assert entry["index"] == 1
+
+    def test_find_all(self, client):
+        """Test every report with a hash is found, oldest entry first."""
+        client.sync_report(_report("r1", "pod1", ("CVE-1", "openssl")))
+        client.sync_report(_report("r2", "pod1", ("CVE-2", "zlib"), ("CVE-1", "openssl")))
+
+        entries = client.find_all(finding_hash("CVE-1", "pod1", "openssl"))
+
+        assert [(entry["report_id"], entry["index"]) for entry in entries] == [
+            ("r1", 0),
+            ("r2", 1),
+        ]
+
+    def test_sync_report_replaces_entries(self, client):
+        """Test findings removed from a report lose their entries."""
+        client.sync_report(_report("r1", "pod1", ("CVE-1", "openssl"), ("CVE-2", "zlib")))
+        client.sync_report(_report("r1", "pod1", ("CVE-2", "zlib")))
+
+        assert client.find(finding_hash("CVE-1", "pod1", "openssl")) is None
+        assert client.find(finding_hash("CVE-2", "pod1", "zlib"))["index"] == 0
+
+    def test_rebuild_drops_deleted_reports(self, client):
+        """Test rebuild indexes all reports and removes entries of deleted ones."""
+        client.get_collection().insert_one(
+            {
+                "hash": "stale",
+                "report_id": "gone",
+                "index": 0,
+                "updatedAt": datetime(2020, 1, 1),
+            }
+        )
+        client.get_reports_collection().insert_many(
+            [
+                _report("r1", "pod1", ("CVE-1", "openssl")),
+                _report("r2", "pod2", ("CVE-1", "openssl"), ("CVE-3", "curl")),
+            ]
+        )
+
+        assert client.rebuild() == 3
+        client.get_state_client().mark_built.assert_called_once_with("vulnerability_hashes")
+        assert client.find("stale") is None
+        assert client.find(finding_hash("CVE-3", "pod2", "curl"))["report_id"] == "r2"
+
+    def test_apply_change(self, client):
+        """Test change stream events update and remove entries."""
+        report = _report("r1", "pod1", ("CVE-1", "openssl"))
+        client.apply_change(
+            {"operationType": "insert", "documentKey": {"_id": "r1"}, "fullDocument": report}
+        )
+        assert client.find(finding_hash("CVE-1", "pod1", "openssl")) is not None
+
+        client.apply_change({"operationType": "delete", "documentKey": {"_id": "r1"}})
+        assert client.find(finding_hash("CVE-1", "pod1", "openssl")) is None
+
+
+class TestAsyncVulnerabilityHashClient:
+
+    """Test cases for AsyncVulnerabilityHashClient."""
+
+    @pytest.fixture
+    def mock_collection(self):
+        """Create a mock async collection."""
+        return MagicMock()
+
+    @pytest.fixture
+    def async_client(self, mock_collection):
+        """Create an AsyncVulnerabilityHashClient backed by a mock collection."""
+        with patch(
+            "app.core.vulnerabilityHashClient.AsyncDatabaseClient.__init__",
+            return_value=None,
+        ):
+            client = AsyncVulnerabilityHashClient()
+        client.get_collection = Mock(return_value=mock_collection)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_find(self, async_client, mock_collection):
+        """Test async find is a point query on the hash."""
+        mock_collection.find_one = AsyncMock(return_value={"report_id": "r1", "index": 0})
+
+        entry = await async_client.find("abc")
+
+        assert entry["report_id"] == "r1"
+        mock_collection.find_one.assert_awaited_once_with({"hash": "abc"}, {"_id": 0})
+
+    @pytest.mark.asyncio
+    async def test_sync_report(self, async_client, mock_collection):
+        """Test async sync_report replaces the entries of a report."""
+        mock_collection.delete_many = AsyncMock()
+        mock_collection.insert_many = AsyncMock()
+
+        count = await async_client.sync_report(
+            _report("r1", "pod1", ("CVE-1", "openssl"))
+        )
+
+        assert count == 1
+        mock_collection.delete_many.assert_awaited_once_with({"report_id": "r1"})
+        entries = mock_collection.insert_many.await_args.args[0]
+        assert entries[0]["hash"] == finding_hash("CVE-1", "pod1", "openssl")
@@ -0,0 +1,239 @@
+"""Unit tests for VulnerabilitySummaryClient."""
+
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import mongomock
+import pytest
+
+from app.core.derivedStateClient import SUMMARIES, DerivedStateClient
+from app.core.vulnerabilitySummaryClient import (
+    AsyncVulnerabilitySummaryClient,
+    VulnerabilitySummaryClient,
+)
+
+
+def _report(report_id, namespace, severities, repository="library/nginx"):
+    return {
+        "_id": report_id,
+        "_cluster": "cluster1",
+        "_namespace": namespace,
+        "data": {
+            "report": {
+                "artifact": {"repository": repository, "tag": "1.25"},
+                "vulnerabilities": [{"severity": severity} for severity in severities],
+            }
+        },
+    }
+
+
+class TestVulnerabilitySummaryClient:
+
+    """Test cases for VulnerabilitySummaryClient."""
+
+    @pytest.fixture
+    def client(self):
+        """A client over mongomock summary and report collections."""
+        with patch("app.core.vulnerabilitySummaryClient.DatabaseClient.__init__"):
+            client = VulnerabilitySummaryClient()
+        database = mongomock.MongoClient()["shield_test"]
+        client.get_collection = Mock(return_value=database["vulnerability_summaries"])
+        client.get_reports_collection = Mock(
+            return_value=database["vulnerabilityreports"]
+        )
+        with patch("app.core.derivedStateClient.DatabaseClient.__init__"):
+            state = DerivedStateClient()
+        state.get_collection = Mock(return_value=database["derived_state"])
+        client.get_state_client = Mock(return_value=state)
+        return client
+
+    def test_get_severity_counts_without_summaries(self, client):
+        """Test None signals that nothing has been summarised."""
+        assert client.get_severity_counts() is None
+
+    def test_sync_report_adds_counts(self, client):
+        """Test new reports are added to their namespace summary."""
+        client.sync_report(_report("r1", "ns1", ["HIGH", "LOW"]))
+        client.sync_report(_report("r2", "ns1", ["HIGH"]))
+        client.sync_report(_report("r3", "ns2", ["CRITICAL"]))
+
+        assert client.get_severity_counts(namespace="ns1") == {
+            "total": 3,
+            "CRITICAL": 0,
+            "HIGH": 2,
+            "MEDIUM": 0,
+            "LOW": 1,
+            "UNKNOWN": 0,
+        }
+        assert client.get_severity_counts(cluster="cluster1")["total"] == 4
+
+    def test_sync_report_replaces_counts(self, client):
+        """Test a changed report replaces its previous contribution."""
+        client.sync_report(_report("r1", "ns1", ["HIGH", "LOW"]))
+        client.sync_report(_report("r1", "ns1", ["CRITICAL"]))
+
+        counts = client.get_severity_counts(namespace="ns1")
+        assert counts["total"] == 1
+        assert counts["CRITICAL"] == 1
+        assert counts["HIGH"] == 0
+
+    def test_remove_report(self, client):
+        """Test deleting the last report of a namespace drops its summary."""
+        client.sync_report(_report("r1", "ns1", ["HIGH"]))
+        client.apply_change({"operationType": "delete", "documentKey": {"_id": "r1"}})
+
+        assert client.get_severity_counts() is None
+        assert client.get_collection().count_documents({}) == 0
+
+    def test_applying_a_change_twice_counts_once(self, client):
+        """Test replaying a change, e.g. from a second replica, changes nothing."""
+        change = {
+            "operationType": "insert",
+            "documentKey": {"_id": "r1"},
+            "fullDocument": _report("r1", "ns1", ["HIGH", "LOW"]),
+        }
+        client.apply_change(change)
+        client.apply_change(change)
+        client.sync_report(_report("r2", "ns1", ["HIGH", "LOW"]))
+        client.remove_report("r2")
+        client.remove_report("r2")
+
+        assert client.get_severity_counts(namespace="ns1")["total"] == 2
+        [image] = client.get_image_counts()
+        assert image["reports"] == 1
+
+    def test_image_counts(self, client):
+        """Test images are counted once, with the number of reports using them."""
+        client.sync_report(_report("r1", "ns1", ["HIGH", "LOW"]))
+        client.sync_report(_report("r2", "ns2", ["HIGH", "LOW"]))
+
+        [image] = client.get_image_counts(repository="library/nginx")
+        assert image["reports"] == 2
+        assert image["total"] == 2
+
+    def test_rebuild_matches_incremental(self, client):
+        """Test a rebuild produces the same counts as incremental updates."""
+        reports = [
+            _report("r1", "ns1", ["HIGH", "LOW"]),
+            _report("r2", "ns1", ["HIGH"]),
+            _report("r3", "ns2", ["CRITICAL"], repository="library/alpine"),
+        ]
+        for report in reports:
+            client.sync_report(report)
+        incremental = client.get_severity_counts(), client.get_severity_counts(
+            namespace="ns2"
+        )
+
+        client.get_reports_collection().insert_many(reports)
+        client.get_collection().insert_one(
+            {"kind": "namespace", "cluster": "gone", "namespace": "gone", "total": 9}
+        )
+
+        assert client.rebuild() == 3
+        assert (
+            client.get_severity_counts(),
+            client.get_severity_counts(namespace="ns2"),
+        ) == incremental
+        assert len(client.get_image_counts()) == 2
+
+    def test_rebuild_is_recorded(self, client):
+        """Test summaries count as built only once a rebuild has finished."""
+        state = client.get_state_client()
+        client.sync_report(_report("r1", "ns1", ["HIGH"]))
+        assert state.get_built() == set()
+
+        client.get_reports_collection().insert_one(_report("r1", "ns1", ["HIGH"]))
+        client.rebuild()
+
+        assert state.get_built() == {SUMMARIES}
+
+
+class TestAsyncVulnerabilitySummaryClient:
+
+    """Test cases for AsyncVulnerabilitySummaryClient."""
+
+    @pytest.fixture
+    def mock_collection(self):
+        """Create a mock async collection."""
+        return MagicMock()
+
+    @pytest.fixture
+    def async_client(self, mock_collection):
+        """Create an AsyncVulnerabilitySummaryClient backed by a mock collection."""
+        with patch(
+            "app.core.vulnerabilitySummaryClient.AsyncDatabaseClient.__init__",
+            return_value=None,
+        ):
+            client = AsyncVulnerabilitySummaryClient()
+        client.get_collection = Mock(return_value=mock_collection)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_get_severity_counts(self, async_client, mock_collection):
+        """Test async get_severity_counts sums the namespace summaries."""
+        cursor = Mock()
+        cursor.to_list = AsyncMock(
+            return_value=[
+                {
+                    "_id": None,
+                    "reports": 1,
+                    "total": 2,
+                    "CRITICAL": 1,
+                    "HIGH": 1,
+                    "MEDIUM": 0,
+                    "LOW": 0,
+                    "UNKNOWN": 0,
+                }
+            ]
+        )
+        mock_collection.aggregate = AsyncMock(return_value=cursor)
+
+        counts = await async_client.get_severity_counts(cluster="cluster1")
+
+        assert counts["total"] == 2
+        pipeline = mock_collection.aggregate.await_args.args[0]
+        assert pipeline[0] == {"$match": {"kind": "namespace", "cluster": "cluster1"}}
+
+    @pytest.mark.asyncio
+    async def test_apply_change_delete(self, async_client, mock_collection):
+        """Test a delete event recounts the summaries the report was part of."""
+        mock_collection.find_one = AsyncMock(
+            return_value={
+                "_id": "r1",
+                "kind": "report",
+                "cluster": "cluster1",
+                "namespace": "ns1",
+                "repository": "library/nginx",
+                "tag": "1.25",
+                "digest": "",
+                "total": 1,
+                "CRITICAL": 0,
+                "HIGH": 1,
+                "MEDIUM": 0,
+                "LOW": 0,
+                "UNKNOWN": 0,
+            }
+        )
+        cursor = Mock()
+        cursor.to_list = AsyncMock(return_value=[])
+        mock_collection.aggregate = AsyncMock(return_value=cursor)
+        mock_collection.delete_one = AsyncMock()
+        mock_collection.delete_many = AsyncMock()
+
+        await async_client.apply_change(
+            {"operationType": "delete", "documentKey": {"_id": "r1"}}
+        )
+
+        mock_collection.delete_one.assert_awaited_once_with({"_id": "r1"})
+        namespace_pipeline = mock_collection.aggregate.await_args_list[0].args[0]
+        assert namespace_pipeline[0] == {
+            "$match": {
+                "kind": "report",
+                "cluster": "cluster1",
+                "namespace": "ns1",
+            }
+        }
+        # No report is left, so both summaries are dropped
+        assert [call.args[0]["kind"] for call in mock_collection.delete_many.await_args_list] == [
+            "namespace",
+            "image",
+        ]
@@ -0,0 +1,224 @@
+"""Unit tests for the change stream watcher."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pymongo.errors import AutoReconnect, OperationFailure
+
+from app.core import watcher
+from app.core.derivedStateClient import STATE_COLLECTION, SUMMARIES
+from app.core.versions import collection_versions
+
+
+class FakeStream:
+
+    """A change stream yielding ``changes``, then failing with ``error``."""
+
+    def __init__(self, changes, error=None):
+        self.changes = list(changes)
+        self.error = error
+        self.alive = True
+        self.resume_token = None
+        self.position = 0
+
+    async def __aenter__(self):
+        """Open the stream."""
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Close the stream."""
+        return False
+
+    async def try_next(self):
+        if self.position < len(self.changes):
+            self.resume_token = {"_data": self.position}
+            self.position += 1
+            return self.changes[self.position - 1]
+        if self.error:
+            raise self.error
+        self.alive = False
+        return None
+
+
+class FakeState:
+
+    """Derived state kept in memory instead of ``derived_state``."""
+
+    def __init__(self, token=None):
+        self.token = token
+        self.built = {"vulnerability_summaries"}
+        self.cleared = 0
+
+    async def get_resume_token(self):
+        return self.token
+
+    async def save_resume_token(self, token):
+        self.token = token
+
+    async def clear_built(self, name=None):
+        self.cleared += 1
+        self.built.clear()
+
+    async def get_built(self):
+        return set(self.built)
+
+
+def change(operation, collection="vulnerabilityreports", document_id="r1"):
+    event = {"operationType": operation, "ns": {"db": "shield", "coll": collection}}
+    if operation in watcher.DOCUMENT_OPERATIONS:
+        event["documentKey"] = {"_id": document_id}
+    return event
+
+
+@pytest.fixture
+def derived():
+    """Mocked derived-data clients sharing one database."""
+    database = MagicMock()
+    clients = [MagicMock(apply_change=AsyncMock()) for _ in range(2)]
+    clients[0].get_reports_collection.return_value.database = database
+    with (
+        patch.object(watcher, "AsyncVulnerabilityHashClient", return_value=clients[0]),
+        patch.object(watcher, "AsyncVulnerabilitySummaryClient", return_value=clients[1]),
+    ):
+        yield database, clients
+
+
+async def run(database, streams, sleeps, state=None):
+    """Run the watcher over ``streams`` until it would open one more."""
+    pending = iter(streams)
+
+    async def watch(pipeline, **kwargs):
+        stream = next(pending)
+        if isinstance(stream, Exception):
+            raise stream
+        # A stream opened without a token starts from the current position
+        stream.resume_token = kwargs["resume_after"] or {"_data": "now"}
+        return stream
+
+    database.watch = AsyncMock(side_effect=watch)
+
+    async def sleep(delay):
+        sleeps.append(delay)
+        if len(sleeps) == len(streams):
+            raise asyncio.CancelledError
+
+    state = state or FakeState()
+    with (
+        patch.object(watcher, "AsyncDerivedStateClient", return_value=state),
+        patch.object(watcher.asyncio, "sleep", sleep),
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await watcher.watch_collections(retry_delay=1)
+    return state
+
+
+class TestWatchCollections:
+
+    """Test the watcher survives odd events and broken streams."""
+
+    @pytest.mark.asyncio
+    async def test_non_document_events_are_ignored(self, derived):
+        """Test a drop event reaches no derived client and does not stop the watcher."""
+        database, clients = derived
+        stream = FakeStream([change("drop"), change("insert"), change("update", "pods")])
+
+        await run(database, [stream], [])
+
+        for client in clients:
+            client.apply_change.assert_awaited_once()
+            assert client.apply_change.await_args.args[0]["operationType"] == "insert"
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_error_with_backoff(self, derived):
+        """Test a broken stream is reopened after the last change, with growing delays."""
+        database, clients = derived
+        streams = [
+            FakeStream([change("insert")], error=AutoReconnect("gone")),
+            FakeStream([], error=AutoReconnect("still gone")),
+            FakeStream([change("delete")], error=AutoReconnect("again")),
+        ]
+        sleeps = []
+
+        state = await run(database, streams, sleeps, FakeState(token={"_data": 7}))
+
+        tokens = [call.kwargs["resume_after"] for call in database.watch.await_args_list]
+        assert tokens == [{"_data": 7}, {"_data": 0}, {"_data": 0}]
+        assert state.token == {"_data": 0}
+        # Resuming misses nothing, so the derived data stays usable
+        assert state.cleared == 0
+        # Opening a stream resets the delay
+        assert sleeps == [1, 1, 1]
+        assert clients[1].apply_change.await_count == 2
+        assert not collection_versions.watching
+
+    @pytest.mark.asyncio
+    async def test_without_token_derived_data_is_unused(self, derived):
+        """Test a first start drops the build markers: earlier changes may be missing."""
+        database, _ = derived
+        seen = []
+
+        async def try_next():
+            seen.append(collection_versions.current(SUMMARIES))
+            stream.alive = False
+
+        stream = FakeStream([])
+        stream.try_next = try_next
+
+        state = await run(database, [stream], [])
+
+        assert database.watch.await_args.kwargs["resume_after"] is None
+        assert state.cleared == 1
+        assert seen == [False]
+        assert state.token == {"_data": "now"}
+
+    @pytest.mark.asyncio
+    async def test_backoff_grows_while_unavailable(self, derived):
+        """Test failures to open the stream wait longer each time."""
+        database, _ = derived
+        failure = OperationFailure("not a replica set", code=40573)
+        sleeps = []
+
+        await run(database, [failure, failure, failure], sleeps)
+
+        assert sleeps == [1, 2, 4]
+
+    @pytest.mark.asyncio
+    async def test_lost_resume_point_starts_over(self, derived):
+        """Test a token the server cannot resume from is dropped with the markers."""
+        database, _ = derived
+        streams = [
+            FakeStream([change("insert")], error=AutoReconnect("gone")),
+            OperationFailure("history lost", code=286),
+            FakeStream([]),
+        ]
+
+        state = await run(database, streams, [], FakeState(token={"_data": 7}))
+
+        tokens = [call.kwargs["resume_after"] for call in database.watch.await_args_list]
+        assert tokens == [{"_data": 7}, {"_data": 0}, None]
+        assert state.cleared == 1
+
+
+class TestApply:
+
+    """Test how single changes are applied."""
+
+    @pytest.fixture(autouse=True)
+    def watching(self):
+        """Pretend the change stream is open."""
+        collection_versions.start()
+        yield
+        collection_versions.stop()
+
+    @pytest.mark.asyncio
+    async def test_build_markers(self):
+        """Test a finished rebuild makes its collection usable, a new one not."""
+        marker = change("replace", STATE_COLLECTION, SUMMARIES)
+        marker["fullDocument"] = {"_id": SUMMARIES, "builtAt": "now"}
+
+        await watcher._apply(marker, [])
+        assert collection_versions.current(SUMMARIES)
+
+        await watcher._apply(change("delete", STATE_COLLECTION, SUMMARIES), [])
+        assert not collection_versions.current(SUMMARIES)
@@ -0,0 +1,27 @@
+"""Unit tests for Image models."""
+from app.models.image import Image, ImagePod, ImageVulnerabilities
+from app.models.vulnerability import Vulnerability
+
+
+class TestImage:
+
+    """Test cases for Image models."""
+
+    def test_image_defaults(self):
+        """Test creating an Image with no fields."""
+        image = Image()
+
+        assert image.repository == ""
+        assert image.pods == []
+        assert image.severity_counts == {}
+
+    def test_image_vulnerabilities(self):
+        """Test ImageVulnerabilities carries pods and findings."""
+        image = ImageVulnerabilities(
+            repository="library/nginx",
+            pods=[ImagePod(cluster="c1", namespace="ns1", pod_id="pod1")],
+            vulnerabilities=[Vulnerability(vulnerabilityID="CVE-1")],
+        )
+
+        assert image.pods[0].pod_id == "pod1"
+        assert image.vulnerabilities[0].vulnerabilityID == "CVE-1"